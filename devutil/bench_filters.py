@@ -0,0 +1,97 @@
+"""
+Compares filters pushed down to the database with fetching all rows
+and filtering them in python, like clients had to do before.
+
+For every filter function on columns, a number of courses is created
+and queried both ways. The script prints the average time per query.
+The database is taken from ``DIGICUBES_DATABASE_URL`` and defaults to
+an in memory sqlite database.
+
+    python devutil/bench_filters.py [courses] [repeats]
+"""
+import asyncio
+import os
+import sys
+from datetime import date, timedelta
+from time import perf_counter
+
+sys.path.insert(0, os.path.abspath("."))
+
+os.environ.setdefault("DIGICUBES_DATABASE_URL", "sqlite://:memory:")
+
+from digicubes_rest.server.ressource.filters import (  # pylint: disable=wrong-import-position
+    compile_plan)
+from digicubes_rest.storage import (  # pylint: disable=wrong-import-position
+    create_schema, init_orm, shutdown_orm)
+from digicubes_rest.storage.models import Course, School  # pylint: disable=wrong-import-position
+
+START = date(2020, 1, 1)
+FROM, UNTIL = date(2020, 3, 1), date(2020, 3, 31)
+IDS = (3, 17, 42, 99, 512)
+
+# The filter parameter and the equivalent python filter
+CASES = {
+    "gt": ("from_date,8,2020-03-01", lambda c: c.from_date > FROM),
+    "gte": ("from_date,9,2020-03-01", lambda c: c.from_date >= FROM),
+    "lt": ("from_date,10,2020-03-01", lambda c: c.from_date < FROM),
+    "lte": ("from_date,11,2020-03-01", lambda c: c.from_date <= FROM),
+    "in": ("id,12," + ",".join(str(i) for i in IDS), lambda c: c.id in IDS),
+    "isnull": ("until_date,13,true", lambda c: c.until_date is None),
+    "range": (
+        "from_date,14,2020-03-01,2020-03-31",
+        lambda c: c.from_date is not None and FROM <= c.from_date <= UNTIL,
+    ),
+}
+
+
+async def populate(count: int) -> None:
+    school = await School.create(name="Benchmark")
+    await Course.bulk_create(
+        [
+            Course(
+                name=f"Course {i}",
+                school=school,
+                from_date=START + timedelta(days=i % 365),
+                until_date=None if i % 10 == 0 else START + timedelta(days=i % 365 + 90),
+            )
+            for i in range(count)
+        ]
+    )
+
+
+async def measure(query, repeats: int):
+    start = perf_counter()
+    for _ in range(repeats):
+        result = await query()
+    return (perf_counter() - start) / repeats, len(result)
+
+
+async def run(count: int, repeats: int) -> None:
+    await init_orm()
+    await create_schema()
+    try:
+        await populate(count)
+        print(f"{count} courses, {repeats} repeats")
+        print(f"{'function':8} {'rows':>6} {'pushed down':>14} {'fetch all':>14}")
+        for name, (param, predicate) in CASES.items():
+            plan = compile_plan(Course, f=param)
+
+            async def fetch_all(predicate=predicate):
+                return [course for course in await Course.all() if predicate(course)]
+
+            pushed, rows = await measure(plan.apply, repeats)
+            fetched, expected = await measure(fetch_all, repeats)
+            assert rows == expected, f"{name}: {rows} != {expected}"
+            print(f"{name:8} {rows:6d} {pushed * 1e3:11.2f} ms {fetched * 1e3:11.2f} ms")
+    finally:
+        await shutdown_orm()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    asyncio.get_event_loop().run_until_complete(run(count, repeats))
+
+
+if __name__ == "__main__":
+    main()
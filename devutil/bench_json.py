@@ -0,0 +1,76 @@
+"""
+Compares the serialization of a response with the json backends.
+
+A ``UserListModel`` with a number of users is sent with
+``ResponseModel.send_json`` for every installed backend and with
+pydantic's ``json()``, like it has been done before. The script prints
+the average time per response and the size of the body.
+
+    python devutil/bench_json.py [users] [repeats]
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath("."))
+
+from digicubes_rest.model import UserListModel, UserModel  # pylint: disable=wrong-import-position
+from digicubes_rest.model.json_backend import (  # pylint: disable=wrong-import-position
+    BACKENDS, JsonBackend)
+
+START = datetime(2020, 1, 1, 8, 0)
+
+
+def create_users(count: int) -> UserListModel:
+    return UserListModel(
+        __root__=[
+            UserModel(
+                id=i + 1,
+                login=f"user{i}",
+                first_name="Jürgen",
+                last_name=f"Müller {i}",
+                email=f"user{i}@digicubes.org",
+                created_at=START + timedelta(minutes=i),
+                modified_at=START + timedelta(minutes=i, seconds=30),
+                is_active=True,
+                is_verified=i % 2 == 0,
+            )
+            for i in range(count)
+        ]
+    )
+
+
+def measure(send, repeats: int):
+    start = perf_counter()
+    for _ in range(repeats):
+        body = send()
+    return (perf_counter() - start) / repeats, len(body)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    users = create_users(count)
+    resp = SimpleNamespace()
+
+    def send_text():
+        return users.json(exclude_none=True, exclude_unset=True).encode("utf-8")
+
+    def send_json():
+        users.send_json(resp)
+        return resp.content
+
+    print(f"{count} users, {repeats} repeats")
+    print(f"{'backend':8} {'bytes':>8} {'time':>12}")
+    elapsed, size = measure(send_text, repeats)
+    print(f"{'json()':8} {size:8d} {elapsed * 1e3:9.2f} ms")
+    for backend in sorted(BACKENDS):
+        JsonBackend.configure(backend)
+        elapsed, size = measure(send_json, repeats)
+        print(f"{backend:8} {size:8d} {elapsed * 1e3:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Measures the per request overhead of the middleware stack.
+
+The middlewares are wrapped around a minimal ASGI app, which is
+called directly, without a server and without network. The script
+prints the average time per request for the bare app and for the
+app wrapped by the middlewares.
+
+    python devutil/bench_middleware.py [requests]
+"""
+import asyncio
+import os
+import sys
+from time import perf_counter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath("."))
+
+from starlette.requests import Request  # pylint: disable=wrong-import-position
+from starlette.responses import PlainTextResponse  # pylint: disable=wrong-import-position
+
+from digicubes_rest.server.middleware import (  # pylint: disable=wrong-import-position
+    SettingsMiddleware, UpdateTokenMiddleware)
+from digicubes_rest.server.ressource.util import (  # pylint: disable=wrong-import-position
+    create_bearer_token, decode_bearer_token)
+
+SECRET = "secret"
+SETTINGS = {"token_refresh_threshold": 300}
+PAYLOAD = decode_bearer_token(create_bearer_token(1, SECRET).bearer_token, SECRET)
+
+
+async def endpoint(scope, receive, send):
+    request = Request(scope, receive)
+    # Like needs_bearer_token does
+    request.state.token_payload = PAYLOAD
+    assert request.state.settings is SETTINGS
+    await PlainTextResponse("Hello World")(scope, receive, send)
+
+
+async def bare_endpoint(scope, receive, send):
+    await PlainTextResponse("Hello World")(scope, receive, send)
+
+
+def build_stack():
+    api = SimpleNamespace(secret_key=SECRET)
+    app = UpdateTokenMiddleware(endpoint, settings=SETTINGS, api=api)
+    return SettingsMiddleware(app, settings=SETTINGS, api=api)
+
+
+async def run(app, count: int) -> float:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"authorization", b"Bearer token")],
+        "query_string": b"",
+    }
+
+    def make_receive():
+        messages = [
+            {"type": "http.request", "body": b"", "more_body": False},
+            {"type": "http.disconnect"},
+        ]
+
+        async def receive():
+            return messages.pop(0) if len(messages) > 1 else messages[0]
+
+        return receive
+
+    async def send(message):
+        pass
+
+    start = perf_counter()
+    for _ in range(count):
+        await app(dict(scope), make_receive(), send)
+    return (perf_counter() - start) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    loop = asyncio.get_event_loop()
+    bare = loop.run_until_complete(run(bare_endpoint, count))
+    stack = loop.run_until_complete(run(build_stack(), count))
+    print(f"bare app:          {bare * 1e6:8.1f} us/request")
+    print(f"with middlewares:  {stack * 1e6:8.1f} us/request")
+    print(f"overhead:          {(stack - bare) * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
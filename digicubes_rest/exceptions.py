@@ -42,6 +42,20 @@ class TokenExpired(DigiCubeError):
     """
 
 
+class TokenRevoked(DigiCubeError):
+    """
+    The bearer token has been revoked. A fresh login
+    is needed.
+    """
+
+
+class ServerBusy(DigiCubeError):
+    """
+    The server is busy and does not accept more
+    work of this kind right now.
+    """
+
+
 class BadPassword(DigiCubeError):
     """Wrong password"""
 
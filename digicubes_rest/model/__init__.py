@@ -1,4 +1,5 @@
 from .authentification import BearerTokenData, LoginData, PasswordData
+from .bootstrap import BootstrapModel
 from .org_model import (RightListModel, RightModel, RoleListModel, RoleModel,
                         UserListModel, UserModel, UserModelCreate)
 from .padination_model import LinksModel, PagedUserModel, PaginationModel
@@ -15,6 +16,7 @@ __all__ = [
     UserModel,
     UserModelCreate,
     VerificationInfo,
+    BootstrapModel,
     CourseModel,
     CourseListModel,
     SchoolModel,
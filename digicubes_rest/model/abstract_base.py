@@ -1,14 +1,50 @@
+from typing import Any
+
 from pydantic import BaseModel
+from pydantic.utils import ROOT_KEY, GetterDict
 from responder import Response
 
+from .json_backend import JsonBackend
+
+
+class PartialGetterDict(GetterDict):
+    """
+    Reads the attributes of orm instances. The columns of a partial
+    instance, that have not been selected with ``only()``, are
+    missing. Otherwise the class attributes of the fields, e.g. the
+    ``name`` of the ``NamedMixin``, would be read.
+    """
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        obj = self._obj
+        if getattr(obj, "_partial", False):
+            meta = obj._meta  # pylint: disable=protected-access
+            if key in meta.db_fields and key not in obj.__dict__:
+                return default
+        return getattr(obj, key, default)
+
 
 class ResponseModel(BaseModel):
-    def send_json(self, resp: Response, status_code=200, include=None, exclude=None) -> None:
-        resp.status_code = status_code
-        resp.mimetype = "application/json"
-        resp.text = self.json(
+    class Config:
+        getter_dict = PartialGetterDict
+
+    def dumps(self, include=None, exclude=None, exclude_unset=True) -> bytes:
+        """
+        Serializes the model with the configured :py:class:`JsonBackend`.
+        With the default backend, the bytes are the same as the
+        ones of ``json(exclude_none=True, exclude_unset=True)``.
+        """
+        data = self.dict(
             exclude_none=True,
-            exclude_unset=True,
+            exclude_unset=exclude_unset,
             include=include,
             exclude=exclude,
         )
+        if self.__custom_root_type__:
+            data = data[ROOT_KEY]
+        return JsonBackend.dumps(data, default=self.__json_encoder__)
+
+    def send_json(self, resp: Response, status_code=200, include=None, exclude=None) -> None:
+        resp.status_code = status_code
+        resp.content = self.dumps(include=include, exclude=exclude)
+        resp.mimetype = "application/json"
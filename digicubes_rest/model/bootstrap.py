@@ -0,0 +1,14 @@
+from typing import Dict, List, Optional
+
+from .abstract_base import ResponseModel
+from .org_model import RoleModel, UserModel
+from .school_model import SchoolModel
+
+
+class BootstrapModel(ResponseModel):
+    user: UserModel
+    roles: List[RoleModel] = []
+    rights: List[str] = []
+    schools: Dict[str, List[SchoolModel]] = {}
+    schools_next: Dict[str, str] = {}
+    home_routes: Dict[str, Optional[str]] = {}
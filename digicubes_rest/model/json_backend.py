@@ -0,0 +1,77 @@
+"""
+Serialization of the response bodies.
+
+Every response goes through :py:meth:`JsonBackend.dumps`. The default
+backend is the stdlib ``json`` module with its default settings. It
+produces exactly the bytes of pydantic's ``json()``: ``", "`` and
+``": "`` as separators and ``\\uXXXX`` escapes for non ASCII characters.
+
+If `orjson <https://github.com/ijl/orjson>`_ is installed, it can be
+selected with ``DIGICUBES_JSON_BACKEND=orjson``. It is faster, but
+writes compact separators and UTF-8 instead of escapes. The parsed
+documents are the same, the bytes are not. Dates and datetimes are
+written in ISO 8601 format by both backends. Everything else, that is
+not json by itself, is converted by the ``default`` function, e.g. the
+encoder of the pydantic model.
+"""
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from pydantic.json import pydantic_encoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+Encoder = Callable[[Any], Any]
+
+
+def _dumps_json(data: Any, default: Encoder) -> bytes:
+    # Same settings as pydantic's json()
+    return json.dumps(data, default=default).encode("utf-8")
+
+
+def _dumps_orjson(data: Any, default: Encoder) -> bytes:
+    # Like the stdlib, numeric keys are written as strings
+    return orjson.dumps(data, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+
+BACKENDS: Dict[str, Callable[[Any, Encoder], bytes]] = {"json": _dumps_json}
+if orjson is not None:
+    BACKENDS["orjson"] = _dumps_orjson
+DEFAULT_BACKEND = "json"
+
+
+class JsonBackend:
+    """
+    Selects the json library, that serializes the responses.
+    """
+
+    name = DEFAULT_BACKEND
+    _dumps = staticmethod(BACKENDS[DEFAULT_BACKEND])
+
+    @classmethod
+    def configure(cls, backend: Optional[str] = None) -> None:
+        """
+        Sets the backend by its name. Without a name, the stdlib
+        backend is used.
+
+        :raises ValueError: If the backend is unknown or not installed.
+        """
+        backend = backend or DEFAULT_BACKEND
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown or missing json backend '{backend}'")
+        cls.name = backend
+        cls._dumps = staticmethod(BACKENDS[backend])
+        logger.info("Using json backend %s", backend)
+
+    @classmethod
+    def dumps(cls, data: Any, default: Encoder = pydantic_encoder) -> bytes:
+        """
+        Serializes the data to json.
+        """
+        return cls._dumps(data, default)
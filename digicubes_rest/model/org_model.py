@@ -12,6 +12,8 @@ from tortoise.exceptions import (IntegrityError, MultipleObjectsReturned,
 from digicubes_rest.exceptions import (ConstraintViolation,
                                        MutltipleObjectsError)
 from digicubes_rest.storage.models.org import Right, Role, User
+from digicubes_rest.storage.pools import ApiKeyPool, RightsPool, StatsPool, UserPool
+from digicubes_rest.storage.rights_version import bump_right, bump_role, bump_users
 
 from .abstract_base import ResponseModel
 
@@ -27,6 +29,18 @@ RIGHT = TypeVar("RIGHT", bound="RightModel")
 RIGHTS = TypeVar("RIGHTS", bound="RightListModel")
 
 
+def _require_name(model: ResponseModel) -> None:
+    """
+    The name of roles and rights is optional, so that projected
+    responses without the name validate. Creating an instance
+    needs it, though.
+
+    :raises ConstraintViolation: If the name is missing.
+    """
+    if not model.name:
+        raise ConstraintViolation(f"{model.__class__.__name__} needs a name")
+
+
 class UserModelCreate(ResponseModel):
     first_name: Optional[constr(strip_whitespace=True, max_length=User.FIRST_NAME_LENGHT)]
     last_name: Optional[constr(strip_whitespace=True, max_length=User.LAST_NAME_LENGHT)]
@@ -97,17 +111,21 @@ class UserModel(ResponseModel):
 
     async def set_password(self, password: str):
         db_user = await User.get(id=self.id)
-        db_user.password = password
+        await db_user.set_password(password)
         await db_user.save()
+        UserPool.invalidate(self.id)
 
     async def delete(self) -> None:
         await User.filter(id=self.id).only("id").delete()
+        RightsPool.remove_user(self.id)
+        UserPool.invalidate(self.id)
 
     async def update(self):
         db_user = await User.get(id=self.id)
         self.modified_at = datetime.utcnow()
         db_user.update_from_dict(self.dict(exclude_unset=True, exclude_none=True))
         await db_user.save()
+        UserPool.invalidate(self.id)
 
     async def refresh(self):
         self.update_from_obj(await self.get(id=self.id))
@@ -122,11 +140,17 @@ class UserModel(ResponseModel):
     async def add_role(self, role: ROLE) -> USER:
         db_user = await User.get(id=self.id).only("id").prefetch_related("roles")
         await db_user.roles.add(await Role.get(id=role.id))
+        RightsPool.add_user_role(self.id, role.id)
+        await bump_users(self.id)
+        StatsPool.invalidate(Role)
         return self
 
     async def remove_role(self, role: ROLE) -> USER:
         db_user = await User.get(id=self.id).only("id").prefetch_related("roles")
         await db_user.roles.remove(await Role.get(id=role.id))
+        RightsPool.remove_user_role(self.id, role.id)
+        await bump_users(self.id)
+        StatsPool.invalidate(Role)
         return self
 
 
@@ -152,7 +176,7 @@ class RoleModel(ResponseModel):
     id: Optional[PositiveInt]
     created_at: Optional[datetime]
     modified_at: Optional[datetime]
-    name: constr(strip_whitespace=True, max_length=Role.NAME_LENGTH)
+    name: Optional[constr(strip_whitespace=True, max_length=Role.NAME_LENGTH)]
     description: Optional[constr(strip_whitespace=True, max_length=Role.DESCRIPTION_LENGTH)]
     home_route: Optional[constr(strip_whitespace=True, max_length=Role.HOME_ROUTE_LENGTH)]
 
@@ -162,6 +186,7 @@ class RoleModel(ResponseModel):
     @staticmethod
     async def create(**kwargs) -> ROLE:
         role = RoleModel(**kwargs)
+        _require_name(role)
         try:
             db_role = await Role.create(**role.dict(exclude_unset=True, exclude_none=True))
             return RoleModel.from_orm(db_role)
@@ -176,6 +201,7 @@ class RoleModel(ResponseModel):
     async def orm_create_from_obj(data) -> ROLE:
         try:
             role = RoleModel.parse_obj(data)
+            _require_name(role)
             role.id = None
             role.created_at = datetime.utcnow()
             role.modified_at = datetime.utcnow()
@@ -197,7 +223,9 @@ class RoleModel(ResponseModel):
             raise MutltipleObjectsError(f"Multiple roles return for filter {kwargs}") from error
 
     async def delete(self) -> None:
+        await bump_role(self.id)
         await Role.filter(id=self.id).only("id").delete()
+        RightsPool.remove_role(self.id)
 
     async def get_user(self) -> UserModel:
         role = await Role.get(id=self.id).only("id").prefetch_related("users")
@@ -221,12 +249,18 @@ class RoleModel(ResponseModel):
 
     async def add_right(self, right: RIGHT) -> ROLE:
         db_role = await Role.get(id=self.id).only("id").prefetch_related("rights")
-        await db_role.rights.add(await Right.get(id=right.id))
+        db_right = await Right.get(id=right.id)
+        await db_role.rights.add(db_right)
+        RightsPool.add_role_right(self.id, db_right.name)
+        await bump_role(self.id)
         return self
 
     async def remove_right(self, right: RIGHT) -> ROLE:
         db_role = await Role.get(id=self.id).only("id").prefetch_related("rights")
-        await db_role.rights.remove(await Right.get(id=right.id))
+        db_right = await Right.get(id=right.id)
+        await db_role.rights.remove(db_right)
+        RightsPool.remove_role_right(self.id, db_right.name)
+        await bump_role(self.id)
         return self
 
     async def get_users(self) -> USER:
@@ -239,6 +273,9 @@ class RoleModel(ResponseModel):
         """
         db_role = await Role.get(id=self.id).only("id").prefetch_related("users")
         await db_role.users.add(await User.get(id=user.id))
+        RightsPool.add_user_role(user.id, self.id)
+        await bump_users(user.id)
+        StatsPool.invalidate(Role)
         return self
 
     async def remove_user(self, user: USER) -> ROLE:
@@ -247,6 +284,9 @@ class RoleModel(ResponseModel):
         """
         db_role = await Role.get(id=self.id).only("id").prefetch_related("users")
         await db_role.users.remove(await User.get(id=user.id))
+        RightsPool.remove_user_role(user.id, self.id)
+        await bump_users(user.id)
+        StatsPool.invalidate(Role)
         return self
 
 
@@ -273,7 +313,7 @@ class RightModel(ResponseModel):
     created_at: Optional[datetime]
     modified_at: Optional[datetime]
 
-    name: constr(strip_whitespace=True, max_length=Right.NAME_LENGTH)
+    name: Optional[constr(strip_whitespace=True, max_length=Right.NAME_LENGTH)]
     description: Optional[constr(strip_whitespace=True, max_length=Right.DESCRIPTION_LENGTH)]
 
     class Config:
@@ -282,6 +322,7 @@ class RightModel(ResponseModel):
     @staticmethod
     async def create(**kwargs) -> RIGHT:
         right = RightModel(**kwargs)
+        _require_name(right)
         right.id = None  # pylint: disable=invalid-name
         right.created_at = None
         try:
@@ -294,6 +335,7 @@ class RightModel(ResponseModel):
     async def create_from_obj(data) -> RIGHT:
         try:
             right = RightModel.parse_obj(data)
+            _require_name(right)
             right.id = None
             right.created_at = datetime.utcnow()
             right.modified_at = datetime.utcnow()
@@ -319,15 +361,26 @@ class RightModel(ResponseModel):
             raise MutltipleObjectsError(f"Multiple roles return for filter {kwargs}") from error
 
     async def delete(self) -> None:
+        db_right = await Right.get_or_none(id=self.id).only("id", "name")
+        if db_right is not None:
+            await bump_right(db_right.name)
         await Right.filter(id=self.id).only("id").delete()
+        if db_right is not None:
+            RightsPool.remove_right(db_right.name)
+            ApiKeyPool.invalidate_right(db_right.name)
 
     async def update(self, **kwargs):
         db_right = await Right.get(id=self.id)
+        old_name = db_right.name
         right = RightModel(**kwargs)
         right.id = None
         right.created_at = None
         db_right.update_from_dict(right.dict(exclude_unset=True, exclude_none=True))
         await db_right.save()
+        RightsPool.rename_right(old_name, db_right.name)
+        ApiKeyPool.invalidate_right(old_name)
+        if db_right.name != old_name:
+            await bump_right(db_right.name)
 
     async def refresh(self):
         self.update_from_obj(await self.get(id=self.id))
@@ -337,13 +390,17 @@ class RightModel(ResponseModel):
         return [RoleModel.from_orm(r) for r in right.roles]
 
     async def add_role(self, role: ROLE) -> RIGHT:
-        db_right = await Right.get(id=self.id).only("id").prefetch_related("roles")
+        db_right = await Right.get(id=self.id).only("id", "name").prefetch_related("roles")
         await db_right.roles.add(await Role.get(id=role.id))
+        RightsPool.add_role_right(role.id, db_right.name)
+        await bump_role(role.id)
         return self
 
     async def remove_role(self, role: ROLE) -> RIGHT:
-        db_right = await Right.get(id=self.id).only("id").prefetch_related("roles")
+        db_right = await Right.get(id=self.id).only("id", "name").prefetch_related("roles")
         await db_right.roles.remove(await Role.get(id=role.id))
+        RightsPool.remove_role_right(role.id, db_right.name)
+        await bump_role(role.id)
         return self
 
 
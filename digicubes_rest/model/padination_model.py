@@ -1,19 +1,25 @@
-from typing import List
+from typing import List, Optional
 
-from pydantic import BaseModel, Field, PositiveInt
+from pydantic import BaseModel, Field, NonNegativeInt
 
 from .abstract_base import ResponseModel
 from .org_model import UserModel
 
 
 class PaginationModel(BaseModel):
-    count: PositiveInt = 0
-    limit: PositiveInt = 0
-    offset: PositiveInt = 0
+    count: NonNegativeInt = 0
+    limit: NonNegativeInt = 0
+    offset: NonNegativeInt = 0
+    total: Optional[NonNegativeInt] = None
 
 
 class LinksModel(BaseModel):
     anchor_self: str = Field("", alias="self")
+    next: Optional[str]
+    prev: Optional[str]
+
+    class Config:
+        allow_population_by_field_name = True
 
 
 class PagedUserModel(ResponseModel):
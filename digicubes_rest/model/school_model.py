@@ -53,7 +53,7 @@ class SchoolIn(ResponseModel):
 
 class SchoolModel(SchoolIn):
     id: PositiveInt
-    created_at: datetime
+    created_at: Optional[datetime]
     modified_at: Optional[datetime]
 
     @staticmethod
@@ -163,7 +163,7 @@ class CourseIn(ResponseModel):
 
 class CourseModel(CourseIn):
     id: PositiveInt
-    created_at: datetime
+    created_at: Optional[datetime]
     modified_at: Optional[datetime]
 
     @staticmethod
@@ -257,7 +257,7 @@ class UnitIn(ResponseModel):
 
 class UnitModel(UnitIn):
     id: PositiveInt
-    created_at: datetime
+    created_at: Optional[datetime]
     modified_at: Optional[datetime]
 
     @staticmethod
@@ -10,12 +10,20 @@ import responder
 from dotenv import load_dotenv
 
 from digicubes_rest.model import UserModel, VerificationInfo
+from digicubes_rest.model.json_backend import JsonBackend
 from digicubes_rest.model.setup import setup_base_model
 from digicubes_rest.server import ressource as endpoint
-from digicubes_rest.server.middleware import SettingsMiddleware
+from digicubes_rest.server.middleware import SettingsMiddleware, UpdateTokenMiddleware
+from digicubes_rest.server.ratelimit import RateLimits
 from digicubes_rest.server.ressource import util
+from digicubes_rest.server.ressource.signing import TokenSigner
 from digicubes_rest.storage import (create_schema, init_orm, models,
                                     shutdown_orm)
+from digicubes_rest.storage.hashing import HashPool
+from digicubes_rest.storage.pools import (ActiveCoursesPool, ApiKeyPool, CountPool,
+                                          RevocationPool, RightsPool, StatsPool, TokenPool,
+                                          UserPool)
+from digicubes_rest.storage.write_buffer import WriteBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -36,19 +44,113 @@ class DigiCubeServer:
         self.address = "0.0.0.0"
         secret_key = os.environ.get("DIGICUBES_SECRET", "b3j6casjk7d8szeuwz00hdhuw4ohwDu9o")
 
+        settings = {
+            "default_count": 10,
+            "max_count": 100,
+            "token_cache_size": int(os.environ.get("DIGICUBES_TOKEN_CACHE_SIZE", 1024)),
+            "user_cache_size": int(os.environ.get("DIGICUBES_USER_CACHE_SIZE", 512)),
+            "user_cache_ttl": float(os.environ.get("DIGICUBES_USER_CACHE_TTL", 60)),
+            "count_cache_ttl": float(os.environ.get("DIGICUBES_COUNT_CACHE_TTL", 10)),
+            "stats_cache_ttl": float(os.environ.get("DIGICUBES_STATS_CACHE_TTL", 60)),
+            "json_backend": os.environ.get("DIGICUBES_JSON_BACKEND", None),
+            "active_courses_cache_size": int(
+                os.environ.get("DIGICUBES_ACTIVE_COURSES_CACHE_SIZE", 1024)
+            ),
+            "count_estimate_threshold": int(
+                os.environ.get("DIGICUBES_COUNT_ESTIMATE_THRESHOLD", 0)
+            ),
+            "unindexed_sort_limit": int(os.environ.get("DIGICUBES_UNINDEXED_SORT_LIMIT", 1000)),
+            "unindexed_sort": os.environ.get("DIGICUBES_UNINDEXED_SORT", "reject").lower(),
+            "rights_in_token": os.environ.get("DIGICUBES_RIGHTS_IN_TOKEN", "false").lower()
+            in ("1", "true", "yes"),
+            "hash_workers": int(os.environ.get("DIGICUBES_HASH_WORKERS", 2)),
+            "hash_concurrency": int(os.environ.get("DIGICUBES_HASH_CONCURRENCY", 4)),
+            "hash_max_queue": int(os.environ.get("DIGICUBES_HASH_MAX_QUEUE", 32)),
+            "login_rate_address": float(os.environ.get("DIGICUBES_LOGIN_RATE_ADDRESS", 1.0)),
+            "login_burst_address": int(os.environ.get("DIGICUBES_LOGIN_BURST_ADDRESS", 20)),
+            "login_rate_login": float(os.environ.get("DIGICUBES_LOGIN_RATE_LOGIN", 0.1)),
+            "login_burst_login": int(os.environ.get("DIGICUBES_LOGIN_BURST_LOGIN", 5)),
+            "trusted_proxies": os.environ.get("DIGICUBES_TRUSTED_PROXIES", "").split(","),
+            "token_refresh_threshold": float(
+                os.environ.get("DIGICUBES_TOKEN_REFRESH_THRESHOLD", 300)
+            ),
+            "token_algorithm": os.environ.get("DIGICUBES_TOKEN_ALGORITHM", "HS256"),
+            "token_private_key": os.environ.get("DIGICUBES_TOKEN_PRIVATE_KEY", None),
+            "token_key_id": os.environ.get("DIGICUBES_TOKEN_KEY_ID", None),
+            "apikey_cache_ttl": float(os.environ.get("DIGICUBES_APIKEY_CACHE_TTL", 300)),
+            "apikey_negative_ttl": float(os.environ.get("DIGICUBES_APIKEY_NEGATIVE_TTL", 10)),
+            "revocation_prune_interval": float(
+                os.environ.get("DIGICUBES_REVOCATION_PRUNE_INTERVAL", 600)
+            ),
+            "revocation_sync_interval": float(
+                os.environ.get("DIGICUBES_REVOCATION_SYNC_INTERVAL", 10)
+            ),
+            "write_buffer_interval": float(os.environ.get("DIGICUBES_WRITE_BUFFER_INTERVAL", 5)),
+            "write_buffer_flush_size": int(
+                os.environ.get("DIGICUBES_WRITE_BUFFER_FLUSH_SIZE", 100)
+            ),
+            "write_buffer_max_size": int(os.environ.get("DIGICUBES_WRITE_BUFFER_MAX_SIZE", 1000)),
+        }
+
         async def onStartup():
             """
             Initialise the database during startup of the webserver.
             """
+            TokenSigner.load(
+                settings["token_algorithm"],
+                key_file=settings["token_private_key"],
+                kid=settings["token_key_id"],
+            )
+            JsonBackend.configure(settings["json_backend"])
+            TokenPool.configure(maxsize=settings["token_cache_size"])
+            UserPool.configure(maxsize=settings["user_cache_size"], ttl=settings["user_cache_ttl"])
+            CountPool.configure(
+                ttl=settings["count_cache_ttl"],
+                estimate_threshold=settings["count_estimate_threshold"],
+            )
+            StatsPool.configure(ttl=settings["stats_cache_ttl"])
+            ActiveCoursesPool.configure(maxsize=settings["active_courses_cache_size"])
+            ApiKeyPool.configure(
+                ttl=settings["apikey_cache_ttl"], negative_ttl=settings["apikey_negative_ttl"]
+            )
+            HashPool.configure(
+                max_workers=settings["hash_workers"],
+                max_concurrency=settings["hash_concurrency"],
+                max_queue=settings["hash_max_queue"],
+            )
+            RateLimits.configure(
+                address_rate=settings["login_rate_address"],
+                address_burst=settings["login_burst_address"],
+                login_rate=settings["login_rate_login"],
+                login_burst=settings["login_burst_login"],
+                trusted_proxies=settings["trusted_proxies"],
+            )
             await init_orm()
             await create_schema()
             await setup_base_model()
+            await RightsPool.load()
+            await RevocationPool.load()
+            RevocationPool.start(
+                interval=settings["revocation_prune_interval"],
+                sync_interval=settings["revocation_sync_interval"],
+            )
+            WriteBuffer.configure(
+                interval=settings["write_buffer_interval"],
+                flush_size=settings["write_buffer_flush_size"],
+                max_size=settings["write_buffer_max_size"],
+            )
+            WriteBuffer.start()
 
         async def onShutdown():
             """
             Shutdown the database during startup of the webserver.
             """
+            await RevocationPool.stop()
+            # Write pending bookkeeping data, before the
+            # connections are closed.
+            await WriteBuffer.stop()
             await shutdown_orm()
+            HashPool.shutdown()
 
         # Now setup responder
         self.api = responder.API(secret_key=secret_key)
@@ -56,11 +158,8 @@ class DigiCubeServer:
         self.api.add_event_handler("shutdown", onShutdown)
 
         # Adding a middleware to add the api to the request state
-        settings = {
-            "default_count": 10,
-            "max_count": 100,
-        }
         self.api.add_middleware(SettingsMiddleware, settings=settings, api=self.api)
+        self.api.add_middleware(UpdateTokenMiddleware, settings=settings, api=self.api)
 
         # Add all the routes to the api
         endpoint.add_routes(self.api)
@@ -96,6 +195,7 @@ class DigiCubeServer:
                     user.is_verified = False
                     user.is_active = True
                     await user.save()
+                    UserPool.invalidate(user.id)
 
                     payload = {}
                     payload["user_id"] = user.id
@@ -116,10 +216,18 @@ class DigiCubeServer:
                         resp.status_code = 404
                         resp.text = f"No user with id {user_id} found"
                     else:
+                        # The flags are checked on login and have to
+                        # be written right away.
                         user.is_verified = True
                         user.is_active = True
-                        await user.save()
-                        credentials = self.createBearerToken(user_id=user.id)
+                        await user.save(update_fields=["is_verified", "is_active"])
+                        UserPool.invalidate(user.id)
+                        await WriteBuffer.record(
+                            models.User, user.id, "verified_at", datetime.utcnow()
+                        )
+                        credentials = self.createBearerToken(
+                            user_id=user.id, **await util.rights_claims(req, user.id)
+                        )
                         response_data = VerificationInfo(
                             user=UserModel.from_orm(user),
                             token=credentials.bearer_token,
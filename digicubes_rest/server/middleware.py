@@ -1,45 +1,90 @@
 """
 Middleware classes to be added to the responder server.
+
+The middlewares are plain ASGI applications. They neither
+wrap the response nor spawn tasks, so they add next to no
+overhead and streaming responses pass through unchanged.
 """
 import logging
+from time import time
+from typing import Optional
 
-from starlette.middleware.base import BaseHTTPMiddleware
+from .ressource.util import create_bearer_token
 
 logger = logging.getLogger(__name__)
 
 
-class UpdateTokenMiddleware(BaseHTTPMiddleware):
+class UpdateTokenMiddleware:
     """
     This middleware component refreshes the authorization
-    token during evry request and adds the new token
-    to the header fields of the resonse.
+    token and adds the new token to the header fields of
+    the resonse.
+
+    A new token is only issued, if the remaining lifetime of
+    the current token drops below the ``token_refresh_threshold``
+    setting (in seconds). The middleware never decodes the token
+    itself. It uses the claims, :py:class:`needs_bearer_token`
+    stored in the request state. Requests without verified
+    claims are left untouched.
     """
 
+    issued = 0
+    skipped = 0
+
     def __init__(self, app, settings, api=None):
-        super().__init__(app)
+        self.app = app
         self.settings = settings
         self.api = api
+        self.threshold = settings.get("token_refresh_threshold", 300)
         logger.info("Added update token middleware.")
 
-    async def dispatch(self, request, call_next):
-        response = await call_next(request)
-        # Now pimp the response
-        auth_header = request.headers.get("authorization", None)
-        if auth_header:
-            # Check if the format is valid
-            auth = auth_header.split(" ")
-            if len(auth) == 2 and auth[0] == "Bearer":
-                current_token = auth[1]
-                digicubes_server = self.api.digicube
-                info = digicubes_server.decodeBearerToken(current_token)
-                new_token = digicubes_server.createBearerToken(info["user_id"])
-                # storing the new token in the response
-                response.headers["x-digicubes-token"] = new_token
-
-        return response
-
-
-class SettingsMiddleware(BaseHTTPMiddleware):
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Returns the number of issued and skipped tokens.
+        """
+        return {"issued": cls.issued, "skipped": cls.skipped}
+
+    def refresh_token(self, payload: dict) -> Optional[str]:
+        """
+        Returns a new token for the claims or ``None``, if the
+        current token is still valid long enough.
+        """
+        remaining = payload.get("exp", 0) - time()
+        if remaining >= self.threshold:
+            UpdateTokenMiddleware.skipped += 1
+            return None
+
+        claims = {k: v for k, v in payload.items() if k not in ("user_id", "exp", "iat", "jti")}
+        data = create_bearer_token(payload["user_id"], self.api.secret_key, **claims)
+        UpdateTokenMiddleware.issued += 1
+        return data.bearer_token
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # The state is shared with all inner layers. The handler
+        # stores the verified claims in it.
+        state = scope.setdefault("state", {})
+
+        async def send_with_token(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                payload = state.get("token_payload", None)
+                if payload is not None:
+                    new_token = self.refresh_token(payload)
+                    if new_token is not None:
+                        # storing the new token in the response
+                        headers = list(message.get("headers", []))
+                        headers.append((b"x-digicubes-token", new_token.encode("latin-1")))
+                        message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_token)
+
+
+class SettingsMiddleware:
     """
     Middleware to inject settings into the request state.
     This way all requests have access to the configuration
@@ -47,18 +92,17 @@ class SettingsMiddleware(BaseHTTPMiddleware):
     """
 
     def __init__(self, app, settings=None, api=None):
-        super().__init__(app)
+        self.app = app
         self.api = api
         self.settings = settings if settings is not None else {}
         logger.info("Added settings middleware.")
 
-    async def dispatch(self, request, call_next):
+    async def __call__(self, scope, receive, send):
         """Adding the settings to the request state."""
-        if self.api is not None:
-            request.state.api = self.api
-
-        if self.settings is not None:
-            request.state.settings = self.settings
+        if scope["type"] in ("http", "websocket"):
+            state = scope.setdefault("state", {})
+            if self.api is not None:
+                state["api"] = self.api
+            state["settings"] = self.settings
 
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
@@ -0,0 +1,225 @@
+"""
+Rate limiting for unauthenticated, expensive endpoints.
+
+Login and registration hash passwords and are open to everyone.
+Both are protected by token buckets, one per client address and
+one per login name and address. A request, that exceeds one of the
+limits, is answered with ``429 Too Many Requests`` and a ``Retry-After``
+header before any expensive work is done.
+
+Behind a reverse proxy, the client address is taken from the
+``X-Forwarded-For`` header, if the proxy is configured as trusted.
+"""
+import ipaddress
+import logging
+import math
+from time import monotonic
+from typing import Hashable, Iterable, List, Optional, Union
+
+from responder import Request, Response
+
+from digicubes_rest.storage.pools.lru import LRU
+
+logger = logging.getLogger(__name__)
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+class RateLimiter:
+    """
+    Token bucket rate limiter.
+
+    Every key owns a bucket of ``burst`` tokens, which is refilled
+    with ``rate`` tokens per second. Every request takes one token.
+    The buckets are kept in an LRU. An evicted bucket starts full
+    again, so ``maxsize`` should be well above the number of clients
+    seen within ``burst / rate`` seconds.
+    """
+
+    __slots__ = ["rate", "burst", "_buckets", "allowed", "limited"]
+
+    def __init__(self, rate: float, burst: int, maxsize: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = LRU(maxsize=maxsize)
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, key: Hashable) -> float:
+        """
+        Takes a token from the bucket of ``key``. Returns ``0``, if
+        the request is allowed, or the number of seconds until the
+        next token is available.
+        """
+        now = monotonic()
+        try:
+            tokens, last = self._buckets[key]
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+        except KeyError:
+            tokens = self.burst
+
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            self.allowed += 1
+            return 0.0
+
+        self._buckets[key] = (tokens, now)
+        self.limited += 1
+        return (1 - tokens) / self.rate
+
+    def peek(self, key: Hashable) -> float:
+        """
+        Like :py:meth:`acquire`, but doesn't take a token.
+        """
+        try:
+            tokens, last = self._buckets[key]
+        except KeyError:
+            return 0.0
+
+        tokens = min(self.burst, tokens + (monotonic() - last) * self.rate)
+        if tokens >= 1:
+            return 0.0
+        self.limited += 1
+        return (1 - tokens) / self.rate
+
+    def reset(self) -> None:
+        """
+        Removes all buckets and resets the counters.
+        """
+        self._buckets.clear()
+        self.allowed = 0
+        self.limited = 0
+
+    def stats(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "buckets": len(self._buckets),
+            "rate": self.rate,
+            "burst": self.burst,
+        }
+
+
+class RateLimits:
+    """
+    The limits for login and registration.
+    """
+
+    by_address = RateLimiter(rate=1.0, burst=20)
+    by_login = RateLimiter(rate=0.1, burst=5)
+    trusted_proxies: List[Network] = []
+
+    @classmethod
+    def configure(
+        cls,
+        address_rate: float = 1.0,
+        address_burst: int = 20,
+        login_rate: float = 0.1,
+        login_burst: int = 5,
+        trusted_proxies: Iterable[str] = (),
+    ) -> None:
+        """
+        Sets rate (tokens per second) and burst of the limiters
+        per client address and per login name. The trusted proxies
+        are addresses or networks like ``10.0.0.0/8``.
+        """
+        cls.by_address = RateLimiter(rate=address_rate, burst=address_burst)
+        cls.by_login = RateLimiter(rate=login_rate, burst=login_burst)
+        cls.trusted_proxies = [
+            ipaddress.ip_network(proxy.strip(), strict=False)
+            for proxy in trusted_proxies
+            if proxy.strip()
+        ]
+
+    @classmethod
+    def check_address(cls, req: Request, resp: Response) -> bool:
+        """
+        Checks the limit of the client address. If exceeded, the
+        response is set to 429 and ``False`` is returned.
+        """
+        return cls._check(cls.by_address, cls.address(req), resp)
+
+    @classmethod
+    def check_login(cls, login: str, req: Request, resp: Response, charge: bool = True) -> bool:
+        """
+        Checks the limit of the login name for the client address.
+        If exceeded, the response is set to 429 and ``False`` is
+        returned. Without ``charge``, no token is taken. Use
+        :py:meth:`failed_login` to take it, if the login failed.
+
+        The bucket belongs to the login name *and* the address, so
+        nobody can lock a user out by failing to log in as that user.
+        """
+        return cls._check(cls.by_login, cls._login_key(login, req), resp, charge)
+
+    @classmethod
+    def failed_login(cls, login: str, req: Request) -> None:
+        """
+        Takes a token from the bucket of the login name.
+        """
+        cls.by_login.acquire(cls._login_key(login, req))
+
+    @classmethod
+    def address(cls, req: Request) -> Optional[str]:
+        """
+        Returns the address of the client. See :py:func:`client_address`.
+        """
+        return client_address(req, cls.trusted_proxies)
+
+    @classmethod
+    def _login_key(cls, login: str, req: Request) -> Hashable:
+        return (str(login).lower(), cls.address(req))
+
+    @classmethod
+    def _check(
+        cls, limiter: RateLimiter, key: Hashable, resp: Response, charge: bool = True
+    ) -> bool:
+        retry_after = limiter.acquire(key) if charge else limiter.peek(key)
+        if retry_after > 0:
+            logger.info("Rate limit exceeded for %s", key)
+            too_many_requests(resp, retry_after)
+            return False
+        return True
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {"by_address": cls.by_address.stats(), "by_login": cls.by_login.stats()}
+
+
+def _is_trusted(address: str, trusted_proxies: Iterable[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted_proxies)
+
+
+def client_address(req: Request, trusted_proxies: Iterable[Network] = ()) -> Optional[str]:
+    """
+    Returns the address of the client, or ``None`` if unknown.
+
+    If the request comes from a trusted proxy, the ``X-Forwarded-For``
+    header is read from right to left. The first address, that is not
+    a trusted proxy, is the client. Addresses left of it may be forged
+    by the client and are ignored.
+    """
+    client = req._starlette.client  # pylint: disable=protected-access
+    address = client.host if client is not None else None
+    if address is None or not _is_trusted(address, trusted_proxies):
+        return address
+
+    forwarded = req.headers.get("x-forwarded-for", "")
+    for hop in reversed([hop.strip() for hop in forwarded.split(",") if hop.strip()]):
+        address = hop
+        if not _is_trusted(hop, trusted_proxies):
+            break
+    return address
+
+
+def too_many_requests(resp: Response, retry_after: float) -> None:
+    """
+    Answers with ``429 Too Many Requests``.
+    """
+    resp.status_code = 429
+    resp.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    resp.text = "Too many requests"
@@ -2,12 +2,15 @@
 import logging
 from typing import List
 
-from digicubes_rest.storage.models import Right
+from digicubes_rest.storage.pools import RightsPool
 
 from .course import course_blueprint
 from .info import info_blueprint
+from .jwks import jwks_blueprint
 from .login import login_blueprint
 from .me import me_blueprint
+from .me_bootstrap import me_bootstrap_blueprint
+from .me_courses import me_courses_blueprint
 from .me_rights import me_rights_blueprint
 from .me_roles import me_roles_blueprint
 from .me_schools import me_schools_blueprint
@@ -26,6 +29,7 @@ from .school_courses import school_course_blueprint
 from .school_students import school_students_blueprint
 from .school_teacher import school_teacher_blueprint
 from .schools import schools_blueprint
+from .stats import stats_blueprint
 from .unit import unit_blueprint
 from .units import units_blueprint
 from .user import user_blueprint
@@ -81,15 +85,18 @@ def add_routes(api):
     renew_token_blueprint.register(api)
     login_blueprint.register(api)
     info_blueprint.register(api)
+    jwks_blueprint.register(api)
     password_blueprint.register(api)
+    stats_blueprint.register(api)
 
     # Adding all routes dealing with the current user (me)
     me_blueprint.register(api)
     me_roles_blueprint.register(api)
     me_rights_blueprint.register(api)
     me_schools_blueprint.register(api)
+    me_bootstrap_blueprint.register(api)
+    me_courses_blueprint.register(api)
 
 
 async def get_user_rights(user_id: int) -> List[str]:
-    rights = await Right.filter(roles__users__id=1).distinct().values("name")
-    return [right["name"] for right in rights]
+    return list(await RightsPool.get_user_rights(user_id))
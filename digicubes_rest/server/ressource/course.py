@@ -6,6 +6,7 @@ from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import CourseModel
 from digicubes_rest.storage import models
+from digicubes_rest.storage.pools import ActiveCoursesPool, CountPool, StatsPool
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -39,14 +40,17 @@ class CourseRessource(BasicRessource):
     @needs_bearer_token()
     async def on_get(self, req: Request, resp: Response, *, course_id: int):
         """
-        Get a single school
+        Get a single course
+
+        Related ressources can be included with the ``include``
+        parameter, e.g. ``include=school,units``.
 
         :param int course_id: The id of the requested course.
         """
         try:
-            query = self.only(req, models.Course.get(id=course_id))
-            course = await query
-            CourseModel.from_orm(course).send_json(resp)
+            await self.send_instance(req, resp, models.Course.get(id=course_id), CourseModel)
+        except DoesNotExist:
+            error_response(resp, 404, f"Course with id {course_id} not found.")
         except Exception as error:
             error_response(resp, 500, str(error))
 
@@ -87,7 +91,8 @@ class CourseRessource(BasicRessource):
             course.id = int(course_id)
             logger.debug(data)
             await course.save()
-            CourseModel.from_orm(course).send_json(resp)
+            ActiveCoursesPool.invalidate()
+            self.send_json(req, resp, CourseModel.from_orm(course))
 
         except DoesNotExist:
             error_response(resp, 404, f"No course with id {course_id} found.")
@@ -109,8 +114,10 @@ class CourseRessource(BasicRessource):
             logger.debug("Trying to delete course %d", course_id)
             course = await models.Course.get(id=course_id)
             await course.delete()
-            # filter_fields = self.get_filter_fields(req)
-            CourseModel.from_orm(course).send_json(resp)
+            CountPool.invalidate(models.Course, models.Unit)
+            StatsPool.invalidate(models.Course, models.Unit)
+            ActiveCoursesPool.invalidate()
+            self.send_json(req, resp, CourseModel.from_orm(course))
         except DoesNotExist:
             error_response(resp, 404, f"Course with id {course_id} does not exist.")
 
@@ -0,0 +1,456 @@
+"""
+Filter engine for collection ressources.
+
+A filter request consists of the parameters ``f`` (filter), ``o``
+(ordering), ``c`` (columns), ``s`` (specials) and ``p`` (page).
+The parameters are validated against the fields of the requested
+model and compiled into a :py:class:`FilterPlan`. Plans only
+depend on the parameter strings, so they are cached and shared
+between requests.
+
+Only indexed columns can be used as filter attributes. A filter
+on any other column would scan the whole table. The same holds for
+the ordering: sorting by a column without an index sorts all
+matching rows for every request. This is only accepted for small
+results, see :py:func:`check_order`. Every ordering ends with the
+primary key, so rows with equal sort keys keep their order.
+
+A filter is a list of ``attribute,function,value`` entries, separated
+by colons, e.g. ``f=school_id,0,1:from_date,11,2021-06-30``. The
+function is a :py:class:`FilterFunction`. The value is converted to
+the type of the column, dates and times are given in ISO format.
+``in`` takes a comma separated list of values, ``range`` exactly two
+values and ``isnull`` ``true`` or ``false``.
+"""
+import logging
+import re
+from datetime import date, datetime
+from enum import IntEnum
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple, Type
+
+from responder import Request
+from tortoise.models import Model
+from tortoise.queryset import QuerySet
+
+from digicubes_rest.storage.pools import CountPool
+from digicubes_rest.storage.pools.lru import LRU
+
+logger = logging.getLogger(__name__)
+
+FILTER_PARAMS = ("f", "o", "c", "s", "p")
+SPECIALS = ("first", "count")
+TRUE_VALUES = ("1", "true", "yes")
+FALSE_VALUES = ("0", "false", "no")
+
+# A colon only separates two filters, if it is followed by the start
+# of a filter. So values, like times, can contain colons.
+_FILTER_SEPARATOR = re.compile(r":(?=[A-Za-z_]\w*,\d+,)")
+
+
+class FilterError(ValueError):
+    """
+    The filter parameters are malformed or refer to
+    unknown fields.
+    """
+
+
+class FilterFunction(IntEnum):
+
+    EQUAL = 0
+    IEQUAL = 1
+    STARTSWITH = 2
+    ISTARTSWITH = 3
+    ENDWITH = 4
+    IENDSWITH = 5
+    CONTAINS = 6
+    ICONTAINS = 7
+    GT = 8
+    GTE = 9
+    LT = 10
+    LTE = 11
+    IN = 12
+    ISNULL = 13
+    RANGE = 14
+
+    def __str__(self):
+        return FilterFunction.to_name(self.value)
+
+    @staticmethod
+    def to_name(i: int):
+        return [
+            None,
+            "iexact",
+            "startswith",
+            "istartswith",
+            "endswith",
+            "iendswith",
+            "contains",
+            "icontains",
+            "gt",
+            "gte",
+            "lt",
+            "lte",
+            "in",
+            "isnull",
+            "range",
+        ][i]
+
+    @property
+    def is_text(self) -> bool:
+        """
+        Whether the function matches strings. Its value is
+        used as it is.
+        """
+        return FilterFunction.IEQUAL <= self <= FilterFunction.ICONTAINS
+
+    def build(self, attribute: str):
+        return (
+            attribute
+            if self == FilterFunction.EQUAL
+            else f"{attribute}__{FilterFunction.to_name(self.value)}"
+        )
+
+
+_indexed_fields: Dict[Type[Model], FrozenSet[str]] = {}
+
+
+def indexed_fields(model: Type[Model]) -> FrozenSet[str]:
+    """
+    Returns the names of all columns of the model, that are
+    backed by an index: the primary key, unique and indexed
+    columns, foreign key columns and the leading column of
+    every composite index.
+    """
+    fields = _indexed_fields.get(model, None)
+    if fields is None:
+        meta = model._meta  # pylint: disable=protected-access
+        names = {meta.pk_attr}
+        for name in meta.db_fields:
+            field = meta.fields_map[name]
+            if field.unique or field.index or getattr(field, "reference", None) is not None:
+                names.add(name)
+        for index in (*meta.indexes, *meta.unique_together):
+            if index:
+                names.add(index[0])
+        fields = _indexed_fields[model] = frozenset(names)
+    return fields
+
+
+def projection(model: Type[Model], fields: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Returns the columns to select for the requested fields. The
+    primary key is always selected. Fields, that are no columns
+    of the model, are ignored.
+    """
+    meta = model._meta  # pylint: disable=protected-access
+    columns = {field for field in fields if field in meta.db_fields}
+    columns.add(meta.pk_attr)
+    return tuple(sorted(columns))
+
+
+def parse_bool(value: str) -> bool:
+    """
+    Parses ``true``/``false``, ``yes``/``no`` or ``1``/``0``.
+    """
+    lowered = value.lower()
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    raise ValueError(f"Not a boolean: {value}")
+
+
+def parse_value(field_type: type, value: str) -> Any:
+    """
+    Converts the value of a filter to the python type of a column.
+
+    :raises ValueError: If the value can not be converted.
+    """
+    if field_type is bool:
+        return parse_bool(value)
+    if field_type in (date, datetime):
+        return field_type.fromisoformat(value)
+    try:
+        return field_type(value)
+    except ArithmeticError as error:  # e.g. a bad Decimal
+        raise ValueError(f"Bad value {value}") from error
+
+
+def filter_value(model: Type[Model], attribute: str, function: FilterFunction, value: str) -> Any:
+    """
+    Returns the value of a filter for the lookup ``function``
+    on the column ``attribute``.
+
+    :raises ValueError: If the value does not match the column
+        or the function.
+    """
+    if function.is_text:
+        return value
+    if function == FilterFunction.ISNULL:
+        return parse_bool(value)
+
+    field_type = model._meta.fields_map[attribute].field_type  # pylint: disable=protected-access
+    if function == FilterFunction.IN:
+        return [parse_value(field_type, item) for item in value.split(",")]
+    if function == FilterFunction.RANGE:
+        bounds = value.split(",")
+        if len(bounds) != 2:
+            raise ValueError(f"A range needs two values, not {value}")
+        return [parse_value(field_type, bound) for bound in bounds]
+    return parse_value(field_type, value)
+
+
+class FilterPlan:
+    """
+    The compiled filter parameters for one model.
+    """
+
+    __slots__ = [
+        "model",
+        "filters",
+        "order",
+        "unindexed",
+        "columns",
+        "first",
+        "count",
+        "limit",
+        "offset",
+    ]
+
+    def __init__(self, model: Type[Model]):
+        self.model = model
+        self.filters: Dict[str, Any] = {}
+        self.order: Tuple[str, ...] = ()
+        # The sort keys of the order without an index
+        self.unindexed: Tuple[str, ...] = ()
+        self.columns: Tuple[str, ...] = ()
+        self.first = False
+        self.count = False
+        self.limit: Optional[int] = None
+        self.offset: Optional[int] = None
+
+    def indexed(self) -> "FilterPlan":
+        """
+        Returns a copy of the plan, that only orders by indexed columns.
+        """
+        plan = FilterPlan(self.model)
+        for name in self.__slots__:
+            setattr(plan, name, getattr(self, name))
+        plan.order = tuple(key for key in self.order if key not in self.unindexed)
+        plan.unindexed = ()
+        return plan
+
+    def where(self, query: Optional[QuerySet] = None) -> QuerySet:
+        """
+        Applies the filter criteria only.
+        """
+        if query is None:
+            query = self.model.all()
+        if self.filters:
+            query = query.filter(**self.filters)
+        return query
+
+    def apply(self, query: Optional[QuerySet] = None) -> Any:
+        """
+        Applies the plan to the query, or to all instances of the
+        model, if no query is given. Depending on the specials, the
+        result is awaitable as a list, a single instance (or ``None``)
+        or a number.
+        """
+        query = self.where(query)
+        if self.order:
+            query = query.order_by(*self.order)
+        if self.columns:
+            query = query.only(*self.columns)
+        if self.count:
+            return query.count()
+        if self.first:
+            return query.first()
+        if self.limit is not None:
+            query = query.limit(self.limit)
+        if self.offset is not None:
+            query = query.offset(self.offset)
+        return query
+
+
+def _split(value: Optional[str], separator: str = ",") -> Tuple[str, ...]:
+    if not value:
+        return ()
+    return tuple(item.strip() for item in value.split(separator) if item.strip())
+
+
+def compile_plan(
+    model: Type[Model],
+    f: Optional[str] = None,
+    o: Optional[str] = None,
+    c: Optional[str] = None,
+    s: Optional[str] = None,
+    p: Optional[str] = None,
+) -> FilterPlan:
+    # pylint: disable=invalid-name,too-many-arguments,too-many-branches
+    """
+    Parses and validates the filter parameters.
+
+    :raises FilterError: If a parameter is malformed or refers
+        to an unknown field.
+    """
+    meta = model._meta  # pylint: disable=protected-access
+    plan = FilterPlan(model)
+
+    if f:
+        filterable = indexed_fields(model)
+        for entry in _FILTER_SEPARATOR.split(f):
+            try:
+                attribute, code, value = entry.split(",", 2)
+                function = FilterFunction(int(code))
+            except ValueError as error:
+                raise FilterError(f"Bad filter {entry}") from error
+            if attribute not in filterable:
+                raise FilterError(f"Cannot filter by {attribute}")
+            try:
+                plan.filters[function.build(attribute)] = filter_value(
+                    model, attribute, function, value
+                )
+            except ValueError as error:
+                raise FilterError(f"Bad value in filter {entry}: {error}") from error
+
+    order = _split(o)
+    sortable = indexed_fields(model)
+    for key in order:
+        if key.lstrip("-") not in meta.db_fields:
+            raise FilterError(f"Cannot order by {key}")
+    plan.unindexed = tuple(key for key in order if key.lstrip("-") not in sortable)
+    plan.order = order
+
+    columns = _split(c)
+    for field in columns:
+        if field not in meta.db_fields:
+            raise FilterError(f"Unknown column {field}")
+    if columns:
+        plan.columns = projection(model, columns)
+
+    for special in _split(s):
+        if special not in SPECIALS:
+            raise FilterError(f"Unknown special {special}")
+        setattr(plan, special, True)
+
+    if p:
+        try:
+            values = [int(value) for value in p.split(":")]
+        except ValueError as error:
+            raise FilterError(f"Bad page param {p}") from error
+        if len(values) > 2 or min(values) < 0:
+            raise FilterError(f"Bad page param {p}")
+        plan.limit = values[0]
+        if len(values) == 2:
+            plan.offset = values[1]
+
+    # The primary key as tiebreaker, in the direction of the
+    # last key, so the index can be scanned in one direction.
+    if plan.order or plan.limit is not None:
+        keys = [key.lstrip("-") for key in plan.order]
+        if meta.pk_attr not in keys:
+            descending = bool(plan.order) and plan.order[-1].startswith("-")
+            plan.order += (f"-{meta.pk_attr}" if descending else meta.pk_attr,)
+
+    return plan
+
+
+class FilterPlans:
+    """
+    Cache of compiled filter plans.
+    """
+
+    _plans = LRU(maxsize=256)
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def configure(cls, maxsize: int = 256) -> None:
+        cls._plans = LRU(maxsize=maxsize)
+
+    @classmethod
+    def get(cls, model: Type[Model], *params: Optional[str]) -> FilterPlan:
+        """
+        Returns the plan for the model and the filter parameters
+        ``f``, ``o``, ``c``, ``s`` and ``p``.
+
+        :raises FilterError: If the parameters are invalid.
+            Invalid parameters are not cached.
+        """
+        key = (model, *params)
+        try:
+            plan = cls._plans[key]
+            cls.hits += 1
+            return plan
+        except KeyError:
+            pass
+
+        plan = compile_plan(model, *params)
+        cls.misses += 1
+        cls._plans[key] = plan
+        return plan
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._plans.clear()
+        cls.hits = 0
+        cls.misses = 0
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            "plans": len(cls._plans),
+            "maxsize": cls._plans.maxsize,
+            "hits": cls.hits,
+            "misses": cls.misses,
+        }
+
+
+async def check_order(plan: FilterPlan, max_rows: int, degrade: bool = False) -> FilterPlan:
+    """
+    Checks the ordering of the plan. An ordering by columns
+    without an index is only accepted, if the filters of the plan
+    match at most ``max_rows`` rows. Otherwise these columns are
+    dropped from the ordering, if ``degrade`` is set, or the plan
+    is rejected.
+
+    :raises FilterError: If the plan is rejected.
+    """
+    if not plan.unindexed:
+        return plan
+
+    total, _ = await CountPool.count(plan.where())
+    if total <= max_rows:
+        return plan
+    if degrade:
+        logger.debug("Ignoring unindexed sort keys %s of %s", plan.unindexed, plan.model)
+        return plan.indexed()
+    keys = ", ".join(plan.unindexed)
+    raise FilterError(f"Cannot order {total} rows by {keys}. Use an indexed column.")
+
+
+def filter_plan(model: Type[Model], req: Request) -> FilterPlan:
+    """
+    Returns the plan for the filter parameters of the request.
+
+    :raises FilterError: If the parameters are invalid.
+    """
+    return FilterPlans.get(model, *(req.params.get(name, None) for name in FILTER_PARAMS))
+
+
+async def checked_filter_plan(model: Type[Model], req: Request) -> FilterPlan:
+    """
+    Returns the plan for the filter parameters of the request with
+    the ordering checked according to the settings
+    ``unindexed_sort_limit`` and ``unindexed_sort``.
+
+    :raises FilterError: If the parameters are invalid or the
+        ordering is rejected.
+    """
+    settings = req.state.settings
+    return await check_order(
+        filter_plan(model, req),
+        int(settings["unindexed_sort_limit"]),
+        settings["unindexed_sort"] == "degrade",
+    )
@@ -1,4 +1,5 @@
 import logging
+from typing import Dict, Optional
 
 from responder.core import Request, Response
 
@@ -11,6 +12,14 @@ info_blueprint = BluePrint()
 route = info_blueprint.route
 
 
+async def get_home_routes() -> Dict[str, Optional[str]]:
+    """
+    Returns the home route for every role.
+    """
+    roles = await Role.all().only("id", "name", "home_route")
+    return {role.name: role.home_route for role in roles}
+
+
 # @needs_bearer_token()
 @route("/info/")
 class InfoRessource(BasicRessource):
@@ -19,11 +28,7 @@ class InfoRessource(BasicRessource):
         what = req.params.get("w", None)
 
         if what == "home_routes":
-            routes = {}
-            for role in await Role.all():
-                routes[role.name] = role.home_route
-
-            resp.media = {"home_routes": routes}
+            resp.media = {"home_routes": await get_home_routes()}
 
         else:
             resp.status_code = 404  # File not found
@@ -0,0 +1,23 @@
+import logging
+
+from responder.core import Request, Response
+
+from .signing import TokenSigner
+from .util import BasicRessource, BluePrint
+
+logger = logging.getLogger(__name__)
+jwks_blueprint = BluePrint()
+route = jwks_blueprint.route
+
+
+@route("/.well-known/jwks.json")
+class JwksRessource(BasicRessource):
+    """
+    The public keys used to sign bearer tokens. Other
+    services can verify tokens with these keys.
+    """
+
+    async def on_get(self, req: Request, resp: Response) -> None:
+        # pylint: disable=C0111,unused-argument
+        resp.media = TokenSigner.jwks()
+        resp.headers["Cache-Control"] = "public, max-age=3600"
@@ -7,10 +7,13 @@ from datetime import datetime
 from responder.core import Request, Response
 from tortoise.exceptions import DoesNotExist
 
-from digicubes_rest.exceptions import BadPassword
+from digicubes_rest.exceptions import BadPassword, ServerBusy
+from digicubes_rest.server.ratelimit import RateLimits, too_many_requests
 from digicubes_rest.storage.models import User
+from digicubes_rest.storage.write_buffer import WriteBuffer
 
-from .util import BasicRessource, BluePrint, create_bearer_token
+from .util import (BasicRessource, BluePrint, create_bearer_token,
+                   rights_claims)
 
 logger = logging.getLogger(__name__)
 login_blueprint = BluePrint()
@@ -31,10 +34,17 @@ class LoginRessource(BasicRessource):
 
     async def on_post(self, req: Request, resp: Response):
         # pylint: disable=C0111
+        if not RateLimits.check_address(req, resp):
+            return
+
         try:
             data = await req.media()
             login = data["login"]
             password = data["password"]
+            # Only failed attempts are charged, see below.
+            if not RateLimits.check_login(login, req, resp, charge=False):
+                return
+
             logger.debug("User %s tries to login with password: %s", login, password)
             try:
                 user = await User.get_or_none(login=login, is_verified=True, is_active=True)
@@ -43,6 +53,7 @@ class LoginRessource(BasicRessource):
                         "No user with login found %s. Or not verified or not active",
                         login,
                     )
+                    RateLimits.failed_login(login, req)
                     resp.status_code = 401
                     resp.text = f"User with login {login} not found or wrong password."
                     return
@@ -53,25 +64,32 @@ class LoginRessource(BasicRessource):
             # user = await User.get(login=login)
             logger.debug("Got user. Checking password")
 
-            if not user.verify_password(password):
+            if not await user.check_password(password):
                 logger.debug("Wrong password")
                 raise BadPassword()
 
-            # Remember the date, when the user logged in last
-            user.last_login_at = datetime.utcnow()
-            await user.save()
+            # Remember the date, when the user logged in last. This is
+            # pure bookkeeping and may be written a little later.
+            await WriteBuffer.record(User, user.id, "last_login_at", datetime.utcnow())
 
             # Create the authentication token.
-            data = create_bearer_token(user.id, req.state.api.secret_key)
+            data = create_bearer_token(
+                user.id, req.state.api.secret_key, **await rights_claims(req, user.id)
+            )
             data.send_json(resp)
 
+        except ServerBusy:
+            too_many_requests(resp, 1)
+
         except BadPassword:
             logger.debug("Wrong password")
+            RateLimits.failed_login(login, req)
             resp.status_code = 401
             resp.text = f"User with login {login} provided wrong password."
 
         except DoesNotExist:
             logger.debug("No user found")
+            RateLimits.failed_login(login, req)
             resp.status_code = 401
             resp.text = f"User with login {login} not found or wrong password."
 
@@ -4,8 +4,11 @@ import logging
 from responder.core import Request, Response
 from tortoise.exceptions import IntegrityError
 
+from digicubes_rest.exceptions import ServerBusy
 from digicubes_rest.model import UserModel
+from digicubes_rest.server.ratelimit import too_many_requests
 from digicubes_rest.storage.models import User
+from digicubes_rest.storage.pools import UserPool
 
 from .util import BasicRessource, BluePrint, error_response, needs_bearer_token
 
@@ -22,7 +25,7 @@ class MeRessource(BasicRessource):
 
     ALLOWED_METHODS = "GET, PUT"
 
-    @needs_bearer_token()
+    @needs_bearer_token(api_key=False)
     async def on_post(self, req: Request, resp: Response):
         """
         Method not allowed. Returns a list of allowed methods in the ``Allow``
@@ -33,7 +36,7 @@ class MeRessource(BasicRessource):
         resp.headers["Allow"] = self.ALLOWED_METHODS
         resp.status_code = 405
 
-    @needs_bearer_token()
+    @needs_bearer_token(api_key=False)
     async def on_get(self, req: Request, resp: Response) -> None:
         """
         Get a user
@@ -41,12 +44,12 @@ class MeRessource(BasicRessource):
         :param int user_id: The id of the user.
         """
         try:
-            user = await UserModel.get(id=self.current_user.id)
-            user.send_json(resp)
+            user = await self.only(req, User.get(id=self.current_user.id))
+            UserModel.from_orm(user).send_json(resp)
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
 
-    @needs_bearer_token()
+    @needs_bearer_token(api_key=False)
     async def on_put(self, req: Request, resp: Response) -> None:
         """
         Updates a user. If the user does not exist, a 404 status is returned.
@@ -54,27 +57,29 @@ class MeRessource(BasicRessource):
         :param int user_id: The id of the user
         """
         try:
-            user = await User.get(self.current_user.id)
+            user = await User.get(id=self.current_user.id)
             data = await req.media()
-            password = data.get("password", None)
+            password = data.pop("password", None)
 
             # Because password is not a standard field
-            # it cannot be set via the update() method
-            # and needs a special treatment. The setter
-            # of the user takes care of it.
+            # it cannot be set via the update_from_dict() method
+            # and needs a special treatment.
             if password is not None:
-                user.password = data.pop("password")
-            user.update(data)
+                await user.set_password(password)
+            user.update_from_dict(data)
             await user.save()
-            # filter_fields = self.get_filter_fields(req)
-            UserModel.from_orm(user).send_json(resp)
+            UserPool.invalidate(user.id)
+            self.send_json(req, resp, UserModel.from_orm(user))
         except IntegrityError as error:
             error_response(resp, 405, str(error))
 
+        except ServerBusy:
+            too_many_requests(resp, 1)
+
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
 
-    @needs_bearer_token()
+    @needs_bearer_token(api_key=False)
     async def on_delete(self, req: Request, resp: Response) -> None:
         """
         Method not allowed. Returns a list of allowed methods in the ``Allow``
@@ -0,0 +1,97 @@
+# pylint: disable=C0111
+import asyncio
+import logging
+
+from responder.core import Request, Response
+
+from digicubes_rest.model import BootstrapModel, RoleModel, SchoolModel, UserModel
+from digicubes_rest.storage.models import Role, School
+
+from .info import get_home_routes
+from .pagination import keyset_page
+from .user_schools import SCHOOL_SPACES
+from .util import (BasicRessource, BluePrint, error_response, get_user_rights,
+                   needs_bearer_token, send_etagged)
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+me_bootstrap_blueprint = BluePrint()
+route = me_bootstrap_blueprint.route
+
+
+@route("/me/bootstrap/")
+class MeBootstrapRessource(BasicRessource):
+    """
+    Everything a client needs at the start of a session in one
+    request: the current user, the roles and rights, the schools
+    of every space and the home routes.
+
+    Like ``/me/{space}/schools/``, at most ``max_count`` schools are
+    sent per space. If a space has more, ``schools_next`` holds the
+    link to the next page of ``/me/{space}/schools/``.
+    """
+
+    ALLOWED_METHODS = "GET"
+
+    @needs_bearer_token(api_key=False)
+    async def on_get(self, req: Request, resp: Response) -> None:
+        """
+        Get the current user together with the roles, the rights,
+        the schools of every space and the home routes of all roles.
+
+        The parts are queried concurrently. The response carries an
+        ``ETag``. If it matches ``If-None-Match``, the status 304 is
+        sent without a body.
+        """
+        try:
+            # The current user has already been loaded by the authentication.
+            user_id = self.current_user.id
+            limit = int(req.state.settings["max_count"])
+            roles, rights, home_routes, *pages = await asyncio.gather(
+                Role.filter(users=user_id),
+                get_user_rights(self.current_user),
+                get_home_routes(),
+                *(
+                    keyset_page(School.filter(**{relation: user_id}), ("id",), limit)
+                    for relation in SCHOOL_SPACES.values()
+                ),
+            )
+
+            bootstrap = BootstrapModel(
+                user=UserModel.from_orm(self.current_user),
+                roles=[RoleModel.from_orm(role) for role in roles],
+                rights=sorted(rights),
+                schools={
+                    space: [SchoolModel.from_orm(school) for school in items]
+                    for space, (items, _, _) in zip(SCHOOL_SPACES, pages)
+                },
+                schools_next={
+                    space: f"/me/{space}/schools/?count={limit}&cursor={next_cursor}"
+                    for space, (_, next_cursor, _) in zip(SCHOOL_SPACES, pages)
+                    if next_cursor is not None
+                },
+                home_routes=home_routes,
+            )
+            send_etagged(req, resp, bootstrap.dumps(exclude_unset=False))
+
+        except Exception as error:  # pylint: disable=W0703
+            error_response(resp, 500, str(error))
+
+    def method_not_allowed(self, resp: Response) -> None:
+        """
+        Generalized 'method-not-allowed' response.
+        """
+        resp.text = ""
+        resp.status_code = 405
+        resp.headers["Allow"] = self.ALLOWED_METHODS
+
+    @needs_bearer_token(api_key=False)
+    async def on_put(self, req: Request, resp: Response) -> None:
+        self.method_not_allowed(resp)
+
+    @needs_bearer_token(api_key=False)
+    async def on_post(self, req: Request, resp: Response) -> None:
+        self.method_not_allowed(resp)
+
+    @needs_bearer_token(api_key=False)
+    async def on_delete(self, req: Request, resp: Response) -> None:
+        self.method_not_allowed(resp)
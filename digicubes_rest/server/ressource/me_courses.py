@@ -0,0 +1,39 @@
+# pylint: disable=C0111
+import logging
+
+from responder.core import Request, Response
+
+from digicubes_rest.model import CourseModel
+from digicubes_rest.storage.pools import ActiveCoursesPool
+
+from .util import BasicRessource, BluePrint, error_response, needs_bearer_token
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+me_courses_blueprint = BluePrint()
+route = me_courses_blueprint.route
+
+
+@route("/me/courses/active/")
+class MeActiveCoursesRessource(BasicRessource):
+    """
+    Get the courses of the current user, that are running today.
+    These are the courses, the user is student or teacher of.
+    """
+
+    ALLOWED_METHODS = "GET"
+
+    @needs_bearer_token(api_key=False)
+    async def on_get(self, req: Request, resp: Response) -> None:
+        """
+        Get the running courses of the current user, ordered by
+        their start. The result is cached until midnight or until
+        a course has been changed.
+        """
+        try:
+            courses = await ActiveCoursesPool.get_user_courses(self.current_user.id)
+            CourseModel.list_model([CourseModel.from_orm(course) for course in courses]).send_json(
+                resp
+            )
+
+        except Exception as error:  # pylint: disable=W0703
+            error_response(resp, 500, str(error))
@@ -16,7 +16,7 @@ class MeRightsRessource(BasicRessource):
 
     ALLOWED_METHODS = "GET"
 
-    @needs_bearer_token()
+    @needs_bearer_token(api_key=False)
     async def on_get(self, req: Request, resp: Response) -> None:
         """
         Get all rights that are associated to this user via roles.
@@ -21,7 +21,7 @@ class MeRolesRessource(BasicRessource):
     Endpoint for roles asscociated with the current user.
     """
 
-    @needs_bearer_token()
+    @needs_bearer_token(api_key=False)
     async def on_get(self, req: Request, resp: Response):
         """
         Get the roles of e certain user
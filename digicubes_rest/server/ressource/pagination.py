@@ -0,0 +1,164 @@
+"""
+Keyset pagination for collection ressources.
+
+Other than ``OFFSET`` pagination, the database seeks directly to the
+first row of the page using an index, so every page costs the same.
+The position is handed to the client as an opaque cursor, which
+holds the sort key values of the first or last row of a page.
+"""
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from responder import Request, Response
+from tortoise.models import Model
+from tortoise.query_utils import Q
+from tortoise.queryset import QuerySet
+
+NEXT = "n"
+PREV = "p"
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_EXACT_HEADER = "X-Total-Count-Exact"
+
+
+def encode_cursor(direction: str, values: Sequence[Any]) -> str:
+    """
+    Encodes the direction and the sort key values as an opaque cursor.
+    """
+    raw = json.dumps([direction, *values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, length: int) -> Tuple[str, List[Any]]:
+    """
+    Decodes a cursor created by :py:func:`encode_cursor`.
+
+    :raises ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as error:
+        raise ValueError(f"Bad cursor {cursor}") from error
+
+    if not isinstance(data, list) or len(data) != length + 1 or data[0] not in (NEXT, PREV):
+        raise ValueError(f"Bad cursor {cursor}")
+    return data[0], data[1:]
+
+
+def page_size(req: Request) -> int:
+    """
+    Returns the requested number of items per page, clamped
+    to the ``max_count`` setting.
+
+    :raises ValueError: If the count is not a number.
+    """
+    settings = req.state.settings
+    count = int(req.params.get("count", settings["default_count"]))
+    return max(1, min(count, int(settings["max_count"])))
+
+
+def _seek(keys: Sequence[str], values: Sequence[Any], lookup: str) -> Q:
+    # (k1, k2) > (v1, v2)  <=>  k1 > v1 OR (k1 = v1 AND k2 > v2)
+    conditions = []
+    for i, key in enumerate(keys):
+        equal = {k: v for k, v in zip(keys[:i], values[:i])}
+        equal[f"{key}__{lookup}"] = values[i]
+        conditions.append(Q(**equal))
+    return Q(*conditions, join_type=Q.OR)
+
+
+async def keyset_page(
+    query: QuerySet, keys: Sequence[str], limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Model], Optional[str], Optional[str]]:
+    """
+    Fetches one page of the query, ordered by ``keys``. The last key
+    has to be unique (usually ``id``) and the values of the keys have
+    to be JSON serializable. Returns the items as well as
+    the cursors for the next and the previous page, which are
+    ``None`` if there is no such page.
+
+    :raises ValueError: If the cursor is malformed.
+    """
+    direction, values = NEXT, None
+    if cursor is not None:
+        direction, values = decode_cursor(cursor, len(keys))
+
+    if direction == NEXT:
+        ordering = list(keys)
+        if values is not None:
+            query = query.filter(_seek(keys, values, "gt"))
+    else:
+        ordering = [f"-{key}" for key in keys]
+        query = query.filter(_seek(keys, values, "lt"))
+
+    items = await query.order_by(*ordering).limit(limit + 1)
+    has_more = len(items) > limit
+    items = items[:limit]
+    if direction == PREV:
+        items.reverse()
+
+    def cursor_for(new_direction: str, item: Model) -> str:
+        return encode_cursor(new_direction, [getattr(item, key) for key in keys])
+
+    # Coming from the previous page, there is a next page and vice versa.
+    if direction == NEXT:
+        has_next, has_prev = has_more, values is not None
+    else:
+        has_next, has_prev = True, has_more
+
+    next_cursor = prev_cursor = None
+    if items:
+        if has_next:
+            next_cursor = cursor_for(NEXT, items[-1])
+        if has_prev:
+            prev_cursor = cursor_for(PREV, items[0])
+    return items, next_cursor, prev_cursor
+
+
+def _relative_url(req: Request, **params) -> str:
+    url = req._starlette.url.include_query_params(**params)  # pylint: disable=protected-access
+    return f"{url.path}?{url.query}"
+
+
+def page_link(req: Request, limit: int, cursor: Optional[str]) -> Optional[str]:
+    """
+    Returns the relative url of the page at ``cursor`` with all
+    other parameters of the request, or ``None`` if there is no
+    cursor.
+    """
+    if cursor is None:
+        return None
+    return _relative_url(req, count=limit, cursor=cursor)
+
+
+def self_link(req: Request, limit: int) -> str:
+    """
+    Returns the relative url of the requested page with all
+    parameters of the request and the effective ``count``.
+    """
+    return _relative_url(req, count=limit)
+
+
+def set_link_header(resp: Response, next_link: Optional[str], prev_link: Optional[str]) -> None:
+    """
+    Adds the links to the neighbour pages as ``Link`` header (RFC 8288).
+    """
+    links = [
+        f'<{link}>; rel="{rel}"'
+        for rel, link in (("next", next_link), ("prev", prev_link))
+        if link is not None
+    ]
+    if links:
+        resp.headers["Link"] = ", ".join(links)
+
+
+def set_total_count(resp: Response, total: int, exact: bool = True) -> None:
+    """
+    Adds the total number of items as ``X-Total-Count`` header. An
+    estimated number is marked with ``X-Total-Count-Exact: false``.
+    """
+    resp.headers[TOTAL_COUNT_HEADER] = str(total)
+    if not exact:
+        resp.headers[TOTAL_COUNT_EXACT_HEADER] = "false"
@@ -4,8 +4,11 @@ import logging
 from responder import Request, Response
 from tortoise.exceptions import DoesNotExist, IntegrityError
 
+from digicubes_rest.exceptions import ServerBusy
 from digicubes_rest.model import PasswordData
+from digicubes_rest.server.ratelimit import too_many_requests
 from digicubes_rest.storage.models import User
+from digicubes_rest.storage.pools import UserPool
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_int_parameter)
@@ -30,8 +33,9 @@ class PasswordRessource(BasicRessource):
             data = await req.media()
             password = data["password"]
             user = await User.get(id=user_id)
-            user.password = password
+            await user.set_password(password)
             await user.save()
+            UserPool.invalidate(user_id)
             password_data = PasswordData(
                 user_id=user.id,
                 user_login=user.login,
@@ -50,6 +54,9 @@ class PasswordRessource(BasicRessource):
             logger.error("Database error while setting password. %s", str(error))
             error_response(resp, 405, str(error))
 
+        except ServerBusy:
+            too_many_requests(resp, 1)
+
         except Exception as error:  # pylint: disable=W0703
             logger.exception("Error while setting password")
             error_response(resp, 500, str(error))
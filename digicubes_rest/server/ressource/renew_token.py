@@ -1,10 +1,13 @@
 # pylint: disable=C0111
 import logging
+from datetime import datetime, timezone
 
 from responder import Request, Response
 
+from digicubes_rest.storage.pools import RevocationPool, TokenPool
+
 from .util import (BasicRessource, BluePrint, create_bearer_token,
-                   needs_bearer_token)
+                   needs_bearer_token, rights_claims)
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 renew_token_blueprint = BluePrint()
@@ -14,20 +17,51 @@ route = renew_token_blueprint.route
 @route("/token/")
 class RenewTokenRessource(BasicRessource):
     """
-    Creates a new token with the default lifespan
+    Creates a new token with the default lifespan or
+    revokes the current token.
     """
 
-    @needs_bearer_token()
+    @needs_bearer_token(api_key=False)
     async def on_post(self, req: Request, resp: Response):
         # pylint: disable=C0111
         assert req.state.api is not None, "No API attribute found in request state."
 
         try:
             user = self.current_user
-            data = create_bearer_token(user.id, req.state.api.secret_key)
+            data = create_bearer_token(
+                user.id, req.state.api.secret_key, **await rights_claims(req, user.id)
+            )
             data.send_json(resp)
 
         except Exception as error:  # pylint: disable=broad-except
             logger.error("Unexpected error %s", error)
             resp.status_code = 500
             resp.text = str(error)
+
+    @needs_bearer_token(api_key=False)
+    async def on_delete(self, req: Request, resp: Response):
+        """
+        Revokes the token used for this request, e.g. on logout.
+        The token is not accepted anymore, even if it has not
+        expired yet.
+        """
+        try:
+            payload = req.state.token_payload
+            jti = payload.get("jti", None)
+            if jti is None:
+                resp.status_code = 400
+                resp.text = "Token has no id and can not be revoked"
+                return
+
+            expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+            await RevocationPool.revoke(jti, expires_at)
+            TokenPool.remove(req.headers["Authorization"].split(" ")[1])
+            # Don't hand out a fresh token for a revoked one
+            req.state.token_payload = None
+            resp.status_code = 204
+            resp.text = ""
+
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error("Unexpected error %s", error)
+            resp.status_code = 500
+            resp.text = str(error)
@@ -8,6 +8,8 @@ from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import RightModel
 from digicubes_rest.storage.models import Right
+from digicubes_rest.storage.pools import ApiKeyPool, CountPool, RightsPool
+from digicubes_rest.storage.rights_version import bump_right
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -35,10 +37,10 @@ class RightRessource(BasicRessource):
         """
         logger.debug("GET /rights/%s/", right_id)
         try:
-            right = await Right.get(id=right_id)
+            right = await self.only(req, Right.get(id=right_id))
             RightModel.from_orm(right).send_json(resp)
         except DoesNotExist:
-            resp.status = 404
+            resp.status_code = 404
         except Exception as error:  # pylint: disable=broad-except
             error_response(resp, 500, error)
 
@@ -53,9 +55,12 @@ class RightRessource(BasicRessource):
         logger.debug("DELETE /rights/%s/", right_id)
         try:
             right = await Right.get(id=right_id)
+            await bump_right(right.name)
             await right.delete()
-            # filter_fields = self.get_filter_fields(req)
-            RightModel.from_orm(right).send_json(resp)
+            CountPool.invalidate(Right)
+            RightsPool.remove_right(right.name)
+            ApiKeyPool.invalidate_right(right.name)
+            self.send_json(req, resp, RightModel.from_orm(right))
         except DoesNotExist:
             logger.info("Right with id %s not found in the database.", right_id)
             error_response(resp, 404, f"Right with id {right_id} does not exist.")
@@ -71,10 +76,14 @@ class RightRessource(BasicRessource):
         data = await req.media()
         try:
             right = await Right.get(id=right_id)
+            old_name = right.name
             right.update(data)
             await right.save()
-            # filter_fields = self.get_filter_fields(req)
-            RightModel.from_orm(right).send_json(resp)
+            RightsPool.rename_right(old_name, right.name)
+            ApiKeyPool.invalidate_right(old_name)
+            if right.name != old_name:
+                await bump_right(right.name)
+            self.send_json(req, resp, RightModel.from_orm(right))
 
         except DoesNotExist:
             error_response(resp, 404, f"No right with id {right_id} found.")
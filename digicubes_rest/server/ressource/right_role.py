@@ -4,11 +4,12 @@ This is the module doc
 import logging
 
 from responder.core import Request, Response
-from tortoise.exceptions import DoesNotExist
-from tortoise.query_utils import Prefetch
 
 from digicubes_rest.model import RoleModel
+from digicubes_rest.storage.associations import associate, dissociate
 from digicubes_rest.storage.models import Right, Role
+from digicubes_rest.storage.pools import RightsPool
+from digicubes_rest.storage.rights_version import bump_role
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -18,18 +19,6 @@ right_role_blueprint = BluePrint()
 route = right_role_blueprint.route
 
 
-def find_role(right: Right, role_id: int) -> bool:
-    """
-    Find a role in the list of associated roles for
-    the provided right. The role we are looking for
-    is specified by its id.
-    """
-    for role in right.roles:
-        if role.id is role_id:
-            return role
-    return None
-
-
 @route("/right/{right_id}/role/{role_id}")
 class RightRoleRessource(BasicRessource):
     """
@@ -50,28 +39,18 @@ class RightRoleRessource(BasicRessource):
         :param int role_id: The id of the role that has to be assiociated with the right.
         """
         try:
-            # Prefetching roles for the right specified by its ID.
-            # Requesting only role fields specified by the filter
-            # criterias from ther request header or all, if no
-            # filter was specified.
-            # TODO: Maybe reverse the query, as we are looking for a specific
-            # role. So start with 'await Role.get(...)'. Tis iliminates the need
-            # for an extra search operation (aka find_role)
-            right = await Right.get(id=right_id).prefetch_related(
-                Prefetch("roles", queryset=self.only(req, Role.filter(id=role_id)))
-            )
-            role = find_role(right, role_id)
-
+            # The role is requested through the association table. Only
+            # the requested fields of this single role are loaded.
+            role = await self.only(req, Role.get_or_none(id=role_id, rights=right_id))
             if role is not None:
                 RoleModel.from_orm(role).send_json(resp)
                 return
 
             resp.status_code = 404
-            resp.text = f"No role with id '{role_id}' found for right '{right.name} [{right.id}]'."
-
-        except DoesNotExist:
-            resp.status_code = 404
-            resp.text = f"No right with id '{right_id}' found."
+            if await Right.exists(id=right_id):
+                resp.text = f"No role with id '{role_id}' found for right '{right_id}'."
+            else:
+                resp.text = f"No right with id '{right_id}' found."
 
         except Exception as error:  # pylint: disable=broad-except
             error_response(resp, 500, error)
@@ -100,17 +79,15 @@ class RightRoleRessource(BasicRessource):
         :param int role_id: The database id of the role
         """
         try:
-            right = await Right.get(id=right_id).prefetch_related("roles")
-
-            if find_role(right, role_id) is None:
-                role = await Role.get(id=role_id)
-                await right.roles.add(role)
+            right = await Right.get_or_none(id=right_id).only("id", "name")
+            if right is None or not await Role.exists(id=role_id):
+                error_response(resp, 404, f"Role (id={role_id}) or right (id={right_id}) not found")
+            elif await associate(Right, "roles", right_id, role_id):
+                RightsPool.add_role_right(role_id, right.name)
+                await bump_role(role_id)
                 resp.status_code = 200  # Role added. Great.
             else:
                 resp.status_code = 304  # Role already related. Not modified
-        except DoesNotExist as error:
-            resp.status_code = 404
-            resp.text = str(error)
 
         except Exception as error:  # pylint: disable=broad-except
             error_response(resp, 500, error)
@@ -131,22 +108,16 @@ class RightRoleRessource(BasicRessource):
         If an unknown exception occurs, a status of 500 is send back.
         """
         try:
-            right = await Right.get(id=right_id).prefetch_related("roles")
-            role = find_role(right, role_id)
-            if role is not None:
-                await right.roles.remove(role)
+            right = await Right.get_or_none(id=right_id).only("id", "name")
+            if right is not None and await dissociate(Right, "roles", right_id, role_id):
+                RightsPool.remove_role_right(role_id, right.name)
+                await bump_role(role_id)
                 resp.status_code = 200
+            elif right is None or not await Role.exists(id=role_id):
+                error_response(resp, 404, f"Role (id={role_id}) or right (id={right_id}) not found")
             else:
                 resp.status_code = 304  # Not Modified
 
-        except DoesNotExist as error:
-            error_response(
-                resp,
-                404,
-                f"Role (id={role_id}) or right (id={right_id}) not found",
-                error,
-            )
-
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
 
@@ -7,7 +7,9 @@ from responder.core import Request, Response
 from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import RoleModel
-from digicubes_rest.storage.models import Right
+from digicubes_rest.storage.models import Right, Role
+from digicubes_rest.storage.pools import RightsPool
+from digicubes_rest.storage.rights_version import bump_right
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -35,14 +37,11 @@ class RightRolesRessource(BasicRessource):
         :param int right_id: The id of the right.
         """
         try:
-            right = await Right.get(id=right_id).prefetch_related("roles")
-            # filter_fields = self.get_filter_fields(req)
-            RoleModel.list_model([
-                RoleModel.from_orm(role) for role in right.roles
-            ]).send_json(resp)
-            return
-        except DoesNotExist:
-            error_response(resp, 404, f"Right with id {right_id} not found.")
+            if not await Right.exists(id=right_id):
+                error_response(resp, 404, f"Right with id {right_id} not found.")
+                return
+
+            await self.send_page(req, resp, Role.filter(rights=right_id), RoleModel)
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
@@ -56,7 +55,9 @@ class RightRolesRessource(BasicRessource):
         """
         try:
             right = await Right.get(id=right_id).prefetch_related("roles")
+            await bump_right(right.name)
             await right.roles.clear()
+            RightsPool.remove_right(right.name)
             return
         except DoesNotExist:
             error_response(resp, 404, f"Right with id {right_id} not found.")
@@ -1,9 +1,12 @@
 import logging
 
+from pydantic import ValidationError
 from responder.core import Request, Response
 
+from digicubes_rest.exceptions import ConstraintViolation
 from digicubes_rest.model import RightModel
 from digicubes_rest.storage.models import Right
+from digicubes_rest.storage.pools import ApiKeyPool, CountPool, RightsPool
 
 from .util import BasicRessource, BluePrint, error_response, needs_bearer_token
 
@@ -26,10 +29,7 @@ class RightsRessource(BasicRessource):
         Get a list of all rights
         """
         try:
-            query = self.only(req, Right.all())
-            RightModel.list_model([
-                RightModel.from_orm(right) for right in await query
-            ]).send_json(resp)
+            await self.send_page(req, resp, Right.all(), RightModel)
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
@@ -40,6 +40,9 @@ class RightsRessource(BasicRessource):
         Deletes all rights.
         """
         await Right.all().delete()
+        CountPool.invalidate(Right)
+        await RightsPool.reload()
+        ApiKeyPool.invalidate_all()
 
     @needs_bearer_token()
     async def on_post(self, req: Request, resp: Response) -> None:
@@ -47,7 +50,13 @@ class RightsRessource(BasicRessource):
         Create new right ressource.
         """
         data = await req.media()
-        right = await RightModel.orm_create_from_obj(data)
+        try:
+            right = await RightModel.create_from_obj(data)
+        except (ConstraintViolation, ValidationError) as error:
+            error_response(resp, 400, str(error))
+            return
+
+        CountPool.invalidate(Right)
         right.send_json(resp, status_code=201)
 
     @needs_bearer_token()
@@ -8,9 +8,11 @@ from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import RoleModel
 from digicubes_rest.storage import models
+from digicubes_rest.storage.pools import CountPool, RightsPool, StatsPool
+from digicubes_rest.storage.rights_version import bump_role
 
 from .util import (BasicRessource, BluePrint, error_response,
-                   needs_bearer_token, needs_int_parameter)
+                   needs_bearer_token, needs_int_parameter, only)
 
 logger = logging.getLogger(__name__)
 role_blueprint = BluePrint()
@@ -40,9 +42,12 @@ class RoleRessource(BasicRessource):
         """
         try:
             logger.debug("GET /roles/%s/", role_id)
-            role = await models.Role.get(id=role_id)
+            role = await self.only(req, models.Role.get(id=role_id))
             RoleModel.from_orm(role).send_json(resp)
 
+        except DoesNotExist:
+            error_response(resp, 404, f"Role with id {role_id} not found.")
+
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
 
@@ -56,9 +61,12 @@ class RoleRessource(BasicRessource):
         """
         try:
             role = await models.Role.get(id=role_id)
+            await bump_role(role_id)
             await role.delete()
-            # filter_fields = self.get_filter_fields(req)
-            RoleModel.from_orm(role).send_json(resp)
+            CountPool.invalidate(models.Role)
+            StatsPool.invalidate(models.Role)
+            RightsPool.remove_role(role_id)
+            self.send_json(req, resp, RoleModel.from_orm(role))
         except DoesNotExist:
             error_response(resp, 404, f"Role with id {role_id} does not exist.")
 
@@ -95,8 +103,7 @@ class RoleRessource(BasicRessource):
             role = await models.Role.get(id=role_id)
             role.update(data)
             await role.save()
-            # filter_fields = self.get_filter_fields(req)
-            RoleModel.from_orm(role).send_json(resp)
+            self.send_json(req, resp, RoleModel.from_orm(role))
             resp.status_code = 200
 
         except DoesNotExist:
@@ -110,7 +117,7 @@ class RoleRessource(BasicRessource):
 async def get_role_by_name(req: Request, resp: Response, *, data):
     # pylint: disable=unused-variable
     if req.method == "get":
-        role = await models.Role.get_or_none(name=data)
+        role = await only(req, models.Role.get_or_none(name=data))
         if role is None:
             resp.status_code = 404
             resp.text = f"Role with name {data} not found."
@@ -4,10 +4,12 @@ This is the module doc
 import logging
 
 from responder.core import Request, Response
-from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import RightModel
-from digicubes_rest.storage.models import Role
+from digicubes_rest.storage.associations import associate, dissociate
+from digicubes_rest.storage.models import Right, Role
+from digicubes_rest.storage.pools import RightsPool
+from digicubes_rest.storage.rights_version import bump_role
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -17,18 +19,6 @@ role_right_blueprint = BluePrint()
 route = role_right_blueprint.route
 
 
-def _find_right(role: Role, right_id: int) -> bool:
-    """
-    Find a right in the list of associated rights for
-    the provided role. The right we are looking for
-    is specified by its id.
-    """
-    for right in role.rights:
-        if right.id is right_id:
-            return right
-    return None
-
-
 @route("/role/{role_id}/right/{right_id}")
 class RoleRightRessource(BasicRessource):
     """
@@ -49,19 +39,18 @@ class RoleRightRessource(BasicRessource):
         :param int right_id: The id of the right
         """
         try:
-            role = await Role.get(id=role_id).prefetch_related("rights")
-            right = _find_right(role, right_id)
+            # The right is requested through the association table. Only
+            # the requested fields of this single right are loaded.
+            right = await self.only(req, Right.get_or_none(id=right_id, roles=role_id))
             if right is not None:
-                # filter_fields = self.get_filter_fields(req)
                 RightModel.from_orm(right).send_json(resp)
                 return
 
             resp.status_code = 404
-            resp.text = f"No role with id '{role_id}' found for right '{right.name} [{right.id}]'."
-
-        except DoesNotExist:
-            resp.status_code = 404
-            resp.text = f"No right with id '{right_id}' found."
+            if await Role.exists(id=role_id):
+                resp.text = f"No right with id '{right_id}' found for role '{role_id}'."
+            else:
+                resp.text = f"No role with id '{role_id}' found."
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
@@ -90,18 +79,16 @@ class RoleRightRessource(BasicRessource):
         :param int role_id: The database id of the role
         """
         try:
-            role = await Role.get(id=role_id).prefetch_related("rights")
-            right = _find_right(role, right_id)
-            if right is None:
-                await role.right.add(right)
+            right = await Right.get_or_none(id=right_id).only("id", "name")
+            if right is None or not await Role.exists(id=role_id):
+                error_response(resp, 404, f"Role (id={role_id}) or right (id={right_id}) not found")
+            elif await associate(Role, "rights", role_id, right_id):
+                RightsPool.add_role_right(role_id, right.name)
+                await bump_role(role_id)
                 resp.status_code = 200
             else:
                 resp.status_code = 304
 
-        except DoesNotExist as error:
-            resp.status_code = 404
-            resp.text = str(error)
-
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
 
@@ -113,22 +100,16 @@ class RoleRightRessource(BasicRessource):
         Removing a right from a role.
         """
         try:
-            role = await Role.get(id=role_id).prefetch_related("rights")
-            right = _find_right(role, right_id)
-            if right is not None:
-                await role.rights.remove(right)
+            right = await Right.get_or_none(id=right_id).only("id", "name")
+            if right is not None and await dissociate(Role, "rights", role_id, right_id):
+                RightsPool.remove_role_right(role_id, right.name)
+                await bump_role(role_id)
                 resp.status_code = 200
+            elif right is None or not await Role.exists(id=role_id):
+                error_response(resp, 404, f"Role (id={role_id}) or right (id={right_id}) not found")
             else:
                 resp.status_code = 304  # Not Modified
 
-        except DoesNotExist as error:
-            error_response(
-                resp,
-                404,
-                f"Role (id={role_id}) or right (id={right_id}) not found",
-                error,
-            )
-
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
 
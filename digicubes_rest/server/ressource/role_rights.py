@@ -7,7 +7,9 @@ from responder.core import Request, Response
 from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import RightModel
-from digicubes_rest.storage.models import Role
+from digicubes_rest.storage.models import Right, Role
+from digicubes_rest.storage.pools import RightsPool
+from digicubes_rest.storage.rights_version import bump_role
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -32,11 +34,11 @@ class RoleRightsRessource(BasicRessource):
         Get all rights associated to a role
         """
         try:
-            role = await Role.get(id=role_id).prefetch_related("rights")
-            # filter_fields = self.get_filter_fields(req)
-            RightModel.list_model(
-                [RightModel.from_orm(right) for right in role.rights]
-            ).send_json(resp)
+            if not await Role.exists(id=role_id):
+                error_response(resp, 404, f"Role with id {role_id} not found.")
+                return
+
+            await self.send_page(req, resp, Right.filter(roles=role_id), RightModel)
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
@@ -51,6 +53,8 @@ class RoleRightsRessource(BasicRessource):
         try:
             role = await Role.get(id=role_id).prefetch_related("rights")
             await role.rights.clear()
+            RightsPool.clear_role_rights(role_id)
+            await bump_role(role_id)
             return
         except DoesNotExist:
             error_response(resp, 404, f"Role with id {role_id} not found.")
@@ -1,10 +1,13 @@
 # pylint: disable=missing-docstring
 import logging
 
+from pydantic import ValidationError
 from responder.core import Request, Response
 
+from digicubes_rest.exceptions import ConstraintViolation
 from digicubes_rest.model import RoleModel
 from digicubes_rest.storage import models
+from digicubes_rest.storage.pools import CountPool, RightsPool, StatsPool
 
 from .util import BasicRessource, BluePrint, error_response, needs_bearer_token
 
@@ -27,10 +30,7 @@ class RolesRessource(BasicRessource):
         Get all roles
         """
         try:
-            query = self.only(models.Role.all())
-            RoleModel.list_model([RoleModel.from_orm(role) for role in await query]).send_json(
-                resp
-            )
+            await self.send_page(req, resp, models.Role.all(), RoleModel)
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
 
@@ -41,6 +41,9 @@ class RolesRessource(BasicRessource):
         """
         try:
             await models.Role.all().delete()
+            CountPool.invalidate(models.Role)
+            StatsPool.invalidate(models.Role)
+            await RightsPool.reload()
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
@@ -54,8 +57,12 @@ class RolesRessource(BasicRessource):
             logger.debug("POST /roles/")
             data = await req.media()
             role = await RoleModel.orm_create_from_obj(data)
+            CountPool.invalidate(models.Role)
+            StatsPool.invalidate(models.Role)
             role.send_json(resp, status_code=201)
 
+        except (ConstraintViolation, ValidationError) as error:
+            error_response(resp, 400, str(error))
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
 
@@ -7,9 +7,11 @@ from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import SchoolModel, UserModel
 from digicubes_rest.storage import models
+from digicubes_rest.storage.pools import ActiveCoursesPool, CountPool, StatsPool
 
 from .util import (BasicRessource, BluePrint, error_response,
-                   needs_bearer_token, needs_int_parameter)
+                   get_filter_fields, needs_bearer_token, needs_int_parameter, only,
+                   send_page)
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -45,11 +47,16 @@ class SchoolRessource(BasicRessource):
         """
         Get a single school
 
+        Related ressources can be included with the ``include``
+        parameter, e.g. ``include=teacher,courses.units``.
+
         :param int school_id: Th id of the requested school.
         """
         try:
-            school = await models.School.get(id=school_id)
-            SchoolModel.from_orm(school).send_json(resp)
+            await self.send_instance(req, resp, models.School.get(id=school_id), SchoolModel)
+
+        except DoesNotExist:
+            error_response(resp, 404, f"School with id {school_id} not found.")
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
@@ -78,8 +85,7 @@ class SchoolRessource(BasicRessource):
             school.update_from_dict(data)
             school.modified_at = datetime.utcnow()
             await school.save()
-            # filter_fields = self.get_filter_fields(req)
-            SchoolModel.from_orm(school).send_json(resp)
+            self.send_json(req, resp, SchoolModel.from_orm(school))
 
         except DoesNotExist:
             error_response(resp, 404, f"No school with id {school_id} found.")
@@ -104,8 +110,10 @@ class SchoolRessource(BasicRessource):
                 resp.text = f"School with id {school_id} does not exist."
             else:
                 await school.delete()
-                # filter_fields = self.get_filter_fields(req)
-                SchoolModel.from_orm(school).send_json(resp)
+                CountPool.invalidate(models.School, models.Course, models.Unit)
+                StatsPool.invalidate(models.School, models.Course, models.Unit)
+                ActiveCoursesPool.invalidate()
+                self.send_json(req, resp, SchoolModel.from_orm(school))
 
         except DoesNotExist:
             error_response(resp, 404, f"School with id {school_id} does not exist.")
@@ -119,7 +127,7 @@ class SchoolRessource(BasicRessource):
 async def get_school_by_name(req: Request, resp: Response, *, school_name):
     # pylint: disable=unused-variable
     if req.method == "get":
-        school = await models.School.get_or_none(name=school_name)
+        school = await only(req, models.School.get_or_none(name=school_name))
         if school is None:
             resp.status_code = 404
             resp.text = f"School with name {school_name} not found."
@@ -134,14 +142,12 @@ async def get_school_by_name(req: Request, resp: Response, *, school_name):
 async def get_school_teacher(req: Request, resp: Response, *, school_id):
 
     if req.method == "get":
-        school = await models.School.get_or_none(id=school_id).prefetch_related("teacher")
-        if school is None:
+        if not await models.School.exists(id=school_id):
             resp.status_code = 404
             resp.text = f"School with id {school_id} not found."
         else:
-            UserModel.list_model(
-                [UserModel.from_orm(teacher) for teacher in school.teacher]
-            ).send_json(resp)
+            query = models.User.filter(teacher_schools=school_id)
+            await send_page(req, resp, query, UserModel, filter_fields=get_filter_fields(req))
     else:
         resp.status_code = 405
         resp.headers["Allow"] = "GET"
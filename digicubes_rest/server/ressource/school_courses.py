@@ -8,6 +8,7 @@ from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import CourseModel
 from digicubes_rest.storage import models
+from digicubes_rest.storage.pools import ActiveCoursesPool, CountPool, StatsPool
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -40,6 +41,9 @@ class SchoolCoursesRessource(BasicRessource):
             await models.School.get(id=school_id)
             data = await req.media()
             course_model = await CourseModel.orm_create_from_obj(school_id=school_id, data=data)
+            CountPool.invalidate(models.Course)
+            StatsPool.invalidate(models.Course)
+            ActiveCoursesPool.invalidate()
 
             logger.info(
                 "Course successfully created. %d - %s",
@@ -75,11 +79,12 @@ class SchoolCoursesRessource(BasicRessource):
         is supported.
         """
         try:
-            courses = await models.Course.filter(school_id=school_id)
-            # filter_fields = self.get_filter_fields(req)
-            CourseModel.list_model(
-                [CourseModel.from_orm(course) for course in courses]
-            ).send_json(resp)
+            if not await models.School.exists(id=school_id):
+                error_response(resp, 404, "School not found")
+                return
+
+            query = models.Course.filter(school_id=school_id)
+            await self.send_page(req, resp, query, CourseModel)
 
         except DoesNotExist:
             error_response(resp, 404, "Ressource not found")
@@ -87,3 +92,37 @@ class SchoolCoursesRessource(BasicRessource):
         except Exception as error:  # pylint: disable=W0703
             logger.exception("Something went wrong", exc_info=error)
             error_response(resp, 500, str(error))
+
+
+@route("/school/{school_id}/courses/active/")
+class SchoolActiveCoursesRessource(BasicRessource):
+    """
+    Endpoint for the courses of a school, that are running today
+    """
+
+    ALLOWED_METHODS = "GET"
+
+    @needs_int_parameter("school_id")
+    @needs_bearer_token()
+    async def on_get(self, req: Request, resp: Response, *, school_id: int):
+        """
+        Get a list of all courses of the specified school, that are
+        running today. A course is running, if today is between its
+        ``from_date`` and its ``until_date``. Missing dates are open.
+        The courses are ordered by their start.
+
+        If the school does not exist, a 404 status is returned.
+        """
+        try:
+            if not await models.School.exists(id=school_id):
+                error_response(resp, 404, "School not found")
+                return
+
+            courses = await ActiveCoursesPool.get_school_courses(school_id)
+            CourseModel.list_model([CourseModel.from_orm(course) for course in courses]).send_json(
+                resp
+            )
+
+        except Exception as error:  # pylint: disable=W0703
+            logger.exception("Something went wrong", exc_info=error)
+            error_response(resp, 500, str(error))
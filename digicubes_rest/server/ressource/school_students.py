@@ -5,7 +5,8 @@ from responder.core import Request, Response
 from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import UserModel
-from digicubes_rest.storage.models import School
+from digicubes_rest.storage.models import School, User
+from digicubes_rest.storage.pools import StatsPool
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -41,16 +42,15 @@ class SchoolStudentsRessource(BasicRessource):
     @needs_bearer_token()
     async def on_get(self, req: Request, resp: Response, *, school_id: int):
         """
-        Get the students of a certain school.
+        Get the students of a certain school. The students are
+        paginated, see :py:meth:`BasicRessource.send_page`.
         """
         try:
-            school = await School.get(id=school_id).prefetch_related("students")
-            # filter_fields = self.get_filter_fields(req)
-            UserModel(
-                __root__=[UserModel.from_orm(student) for student in school.students]
-            ).send_json(resp)
-        except DoesNotExist:
-            error_response(resp, 404, "School not found")
+            if not await School.exists(id=school_id):
+                error_response(resp, 404, "School not found")
+                return
+
+            await self.send_page(req, resp, User.filter(student_schools=school_id), UserModel)
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
@@ -80,6 +80,7 @@ class SchoolStudentsRessource(BasicRessource):
         try:
             school = await School.get(id=school_id).prefetch_related("students")
             await school.students.clear()
+            StatsPool.invalidate(School)
             return
         except DoesNotExist:
             error_response(resp, 404, f"School with id {school_id} not found")
@@ -4,6 +4,7 @@ import logging
 from responder.core import Request, Response
 
 from digicubes_rest.storage import models
+from digicubes_rest.storage.pools import StatsPool
 
 from .util import (BasicRessource, BluePrint, needs_bearer_token,
                    needs_int_parameter)
@@ -33,6 +34,7 @@ class SchoolsTeacherRessource(BasicRessource):
             return
 
         await school.teacher.add(user)
+        StatsPool.invalidate(models.School)
         resp.status_code = 200
 
     @needs_int_parameter("school_id")
@@ -52,4 +54,5 @@ class SchoolsTeacherRessource(BasicRessource):
             return
 
         await school.teacher.remove(user)
+        StatsPool.invalidate(models.School)
         resp.status_code = 200
@@ -2,12 +2,13 @@
 import logging
 
 from responder.core import Request, Response
-from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import SchoolModel, UserModel
-from digicubes_rest.storage.models import School
+from digicubes_rest.storage.models import Course, School, Unit, User
+from digicubes_rest.storage.pools import ActiveCoursesPool, CountPool, StatsPool
 
-from .util import BasicRessource, BluePrint, error_response, needs_bearer_token
+from .util import (BasicRessource, BluePrint, error_response,
+                   needs_bearer_token, needs_int_parameter, send_filtered)
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -32,6 +33,8 @@ class SchoolsRessource(BasicRessource):
             logger.debug("POST /schools/")
             data = await req.media()
             school = await SchoolModel.orm_create_from_obj(data=data)
+            CountPool.invalidate(School)
+            StatsPool.invalidate(School)
             school.send_json(resp, status_code=201)
 
         except Exception as error:  # pylint: disable=W0703
@@ -48,10 +51,7 @@ class SchoolsRessource(BasicRessource):
         Returns all schools
         """
         try:
-            query = self.only(req, School.all())
-            SchoolModel.list_model(
-                [SchoolModel.from_orm(school) for school in await query]
-            ).send_json(resp)
+            await self.send_page(req, resp, School.all(), SchoolModel)
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
@@ -76,6 +76,9 @@ class SchoolsRessource(BasicRessource):
         """
         try:
             await School.all().delete()
+            CountPool.invalidate(School, Course, Unit)
+            StatsPool.invalidate(School, Course, Unit)
+            ActiveCoursesPool.invalidate()
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
@@ -84,19 +87,10 @@ class SchoolsRessource(BasicRessource):
 @route("/schools/filter/{data}/")
 async def get_school_by_attr(req: Request, resp: Response, *, data):
     try:
-        result = await schools_blueprint.build_query_set(School, req)
-        if result is None:
-            resp.media = None
-        elif isinstance(result, int):
-            resp.media = result
-        elif isinstance(result, School):
-            SchoolModel.from_orm(result).send_json(resp)
-        else:
-            SchoolModel.list_model([SchoolModel.from_orm(school) for school in result]).send_json(
-                resp
-            )
-    except Exception:  # pylint: disable=bare-except
+        await send_filtered(req, resp, School, SchoolModel)
+    except Exception as error:  # pylint: disable=broad-except
         logger.exception("Unable to perform filter")
+        error_response(resp, 500, str(error))
 
 
 @route("/schools/{school_id}/teacher/")
@@ -104,17 +98,17 @@ class SchoolTeacherListRessource(BasicRessource):
     """
     Get all teachers of a school
     """
+    @needs_int_parameter("school_id")
     @needs_bearer_token()
-    async def on_get(req: Request, resp: Response, *, school_id):
+    async def on_get(self, req: Request, resp: Response, *, school_id: int):
         try:
-            school = await School.get(id=school_id).prefetch_related('teacher')
-            UserModel.list_model([
-                UserModel.from_orm(user) for user in school.teacher
-            ]).send_json(resp)
-
-        except DoesNotExist:
-            resp.status_code = 404
-            resp.text = f"No school with id {school_id} found."
+            if not await School.exists(id=school_id):
+                resp.status_code = 404
+                resp.text = f"No school with id {school_id} found."
+                return
+
+            await self.send_page(req, resp, User.filter(teacher_schools=school_id), UserModel)
+
         except Exception:  # pylint: disable=bare-except
             resp.status_code = 500
             resp.text = f"Could not request teachers for school with id {school_id}"
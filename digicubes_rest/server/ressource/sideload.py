@@ -0,0 +1,200 @@
+"""
+Sideloading of related ressources.
+
+With the ``include`` parameter a client requests related ressources
+together with a ressource, e.g. ``/user/1?include=roles,schools.teacher``.
+The related ressources are embedded under the name of the relation,
+nested relations are separated by dots.
+
+Every relation is fetched with one query for all instances of a
+level, so the number of queries only depends on the requested
+relations, but not on the number of related instances.
+"""
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel as PydanticModel
+from responder import Request, Response
+from tortoise.models import Model
+
+from digicubes_rest.model import (CourseModel, RightModel, RoleModel, SchoolModel, UnitModel,
+                                  UserModel)
+from digicubes_rest.model.json_backend import JsonBackend
+from digicubes_rest.storage.models import Course, Right, Role, School, Unit, User
+
+MAX_DEPTH = 3
+
+# The requested relations, a tree of relation names
+Includes = Dict[str, dict]
+
+
+def _distinct(instances: Iterable[Model]) -> List[Model]:
+    seen = set()
+    result = []
+    for instance in instances:
+        if instance.pk not in seen:
+            seen.add(instance.pk)
+            result.append(instance)
+    return result
+
+
+def _related(*names: str) -> Callable[[Model], List[Model]]:
+    def collect(instance: Model) -> List[Model]:
+        related = []
+        for name in names:
+            value = getattr(instance, name)
+            if isinstance(value, Model):
+                related.append(value)
+            elif value is not None:
+                related.extend(value)
+        return _distinct(related)
+
+    return collect
+
+
+def _user_rights(user: User) -> List[Model]:
+    return _distinct(right for role in user.roles for right in role.rights)
+
+
+class Relation(NamedTuple):
+    """
+    A relation, that can be included.
+
+    ``prefetch`` are the relations to fetch with tortoise and
+    ``collect`` returns the related instances afterwards.
+    """
+
+    target: Type[Model]
+    prefetch: Tuple[str, ...]
+    collect: Callable[[Model], List[Model]]
+    many: bool = True
+
+
+def _relation(target: Type[Model], *names: str, many: bool = True) -> Relation:
+    return Relation(target, names, _related(*names), many)
+
+
+RELATIONS: Dict[Type[Model], Dict[str, Relation]] = {
+    User: {
+        "roles": _relation(Role, "roles"),
+        "rights": Relation(Right, ("roles__rights",), _user_rights),
+        "schools": _relation(School, "student_schools", "principal_schools", "teacher_schools"),
+        "courses": _relation(Course, "courses"),
+    },
+    School: {
+        "students": _relation(User, "students"),
+        "principals": _relation(User, "principals"),
+        "teacher": _relation(User, "teacher"),
+        "courses": _relation(Course, "courses"),
+    },
+    Course: {
+        "school": _relation(School, "school", many=False),
+        "students": _relation(User, "students"),
+        "teachers": _relation(User, "teachers"),
+        "units": _relation(Unit, "units"),
+    },
+    Role: {
+        "rights": _relation(Right, "rights"),
+    },
+    Unit: {},
+    Right: {},
+}
+
+RESPONSE_MODELS: Dict[Type[Model], Type[PydanticModel]] = {
+    User: UserModel,
+    School: SchoolModel,
+    Course: CourseModel,
+    Role: RoleModel,
+    Right: RightModel,
+    Unit: UnitModel,
+}
+
+
+def parse_includes(model: Type[Model], value: Optional[str]) -> Includes:
+    """
+    Parses the ``include`` parameter into a tree of relation
+    names, e.g. ``roles,schools.teacher`` into
+    ``{"roles": {}, "schools": {"teacher": {}}}``.
+
+    :raises ValueError: If a relation is unknown or nested too deep.
+    """
+    includes: Includes = {}
+    if not value:
+        return includes
+
+    for path in value.split(","):
+        names = path.strip().split(".")
+        if len(names) > MAX_DEPTH:
+            raise ValueError(f"Include {path} is nested too deep")
+        current, tree = model, includes
+        for name in names:
+            relation = RELATIONS[current].get(name, None)
+            if relation is None:
+                raise ValueError(f"Cannot include {path}")
+            current, tree = relation.target, tree.setdefault(name, {})
+    return includes
+
+
+def includes(req: Request, model: Type[Model]) -> Includes:
+    """
+    Returns the relations requested with the ``include`` parameter.
+
+    :raises ValueError: If the parameter is invalid.
+    """
+    return parse_includes(model, req.params.get("include", None))
+
+
+async def sideload(model: Type[Model], instances: List[Model], tree: Includes) -> None:
+    """
+    Fetches the relations of the tree for the instances, one
+    query per relation and level.
+    """
+    level = [(model, instances, tree)]
+    while level:
+        next_level = []
+        for current, items, subtree in level:
+            relations = RELATIONS[current]
+            prefetch = {path for name in subtree for path in relations[name].prefetch}
+            if not items or not prefetch:
+                continue
+            await current.fetch_for_list(items, *prefetch)
+            for name, children in subtree.items():
+                if children:
+                    relation = relations[name]
+                    # Every parent holds its own instances of the related objects.
+                    related = [item for parent in items for item in relation.collect(parent)]
+                    next_level.append((relation.target, related, children))
+        level = next_level
+
+
+def dump(model: Type[Model], instance: Model, tree: Includes, include=None) -> dict:
+    """
+    Returns the instance and the included relations as dict.
+    """
+    data = (
+        RESPONSE_MODELS[model]
+        .from_orm(instance)
+        .dict(by_alias=True, exclude_none=True, exclude_unset=True, include=include)
+    )
+    for name, subtree in tree.items():
+        relation = RELATIONS[model][name]
+        related = [dump(relation.target, item, subtree) for item in relation.collect(instance)]
+        data[name] = related if relation.many else next(iter(related), None)
+    return data
+
+
+async def send_included(
+    resp: Response,
+    instance: Model,
+    tree: Includes,
+    filter_fields: Optional[List[str]] = None,
+) -> None:
+    """
+    Sends the instance together with the included relations. The
+    filter fields only apply to the instance itself.
+    """
+    model = type(instance)
+    await sideload(model, [instance], tree)
+    include = None if filter_fields is None else set(filter_fields)
+    resp.status_code = 200
+    resp.content = JsonBackend.dumps(dump(model, instance, tree, include))
+    resp.mimetype = "application/json"
@@ -0,0 +1,181 @@
+"""
+Signing and verification of bearer tokens.
+
+By default tokens are signed with HS256 and the shared secret of the
+server. Optionally, tokens can be signed with an Ed25519 (``EdDSA``) or
+a P-256 (``ES256``) private key. Every token then carries the id of the
+key in its ``kid`` header and the public keys are published as a JSON
+Web Key Set, so other services can verify tokens without knowing the
+secret and without calling this server.
+
+Asymmetric signing requires the optional ``cryptography`` package.
+"""
+import base64
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import jwt
+
+try:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+except ImportError:  # pragma: no cover
+    serialization = None
+
+logger = logging.getLogger(__name__)
+
+SYMMETRIC_ALGORITHM = "HS256"
+ASYMMETRIC_ALGORITHMS = ("EdDSA", "ES256")
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def public_jwk(public_key: Any) -> Dict[str, str]:
+    """
+    Returns the public key as a JSON Web Key with the required members only.
+    """
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        return {"crv": "Ed25519", "kty": "OKP", "x": _b64(raw)}
+
+    numbers = public_key.public_numbers()
+    return {
+        "crv": "P-256",
+        "kty": "EC",
+        "x": _b64(numbers.x.to_bytes(32, "big")),
+        "y": _b64(numbers.y.to_bytes(32, "big")),
+    }
+
+
+def thumbprint(jwk: Dict[str, str]) -> str:
+    """
+    Returns the RFC 7638 thumbprint of the key, which is used as
+    the default key id.
+    """
+    canonical = json.dumps(jwk, sort_keys=True, separators=(",", ":"))
+    return _b64(hashlib.sha256(canonical.encode("utf-8")).digest())
+
+
+class TokenSigner:
+    """
+    Signs and verifies bearer tokens.
+
+    The key material is loaded once by :py:meth:`configure`. The
+    loaded key objects are kept, so no key has to be parsed while
+    handling a request.
+    """
+
+    _algorithm = SYMMETRIC_ALGORITHM
+    _kid: Optional[str] = None
+    _private_key: Any = None
+    _public_keys: Dict[str, Any] = {}
+    _jwks: Dict[str, list] = {"keys": []}
+
+    @classmethod
+    def configure(
+        cls, algorithm: str = SYMMETRIC_ALGORITHM, private_key: bytes = None, kid: str = None
+    ) -> None:
+        """
+        Sets the signing algorithm. For asymmetric algorithms, the PEM
+        encoded, unencrypted private key has to be provided. If no
+        ``kid`` is given, the thumbprint of the public key is used.
+        """
+        if algorithm == SYMMETRIC_ALGORITHM:
+            cls.reset()
+            return
+
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"Unsupported token algorithm {algorithm}")
+
+        if serialization is None:
+            raise RuntimeError(f"Signing tokens with {algorithm} requires the cryptography package")
+
+        if private_key is None:
+            raise ValueError(f"No private key provided for token algorithm {algorithm}")
+
+        key = serialization.load_pem_private_key(private_key, password=None)
+        if algorithm == "EdDSA":
+            valid = isinstance(key, ed25519.Ed25519PrivateKey)
+        else:
+            valid = isinstance(key, ec.EllipticCurvePrivateKey) and key.curve.name == "secp256r1"
+        if not valid:
+            raise ValueError(f"The private key does not match the token algorithm {algorithm}")
+
+        public_key = key.public_key()
+        jwk = public_jwk(public_key)
+        kid = kid or thumbprint(jwk)
+        jwk.update(kid=kid, alg=algorithm, use="sig")
+
+        cls._algorithm = algorithm
+        cls._kid = kid
+        cls._private_key = key
+        cls._public_keys = {kid: public_key}
+        cls._jwks = {"keys": [jwk]}
+        logger.info("Signing tokens with %s. Key id is %s.", algorithm, kid)
+
+    @classmethod
+    def load(cls, algorithm: str = SYMMETRIC_ALGORITHM, key_file: str = None, kid: str = None):
+        """
+        Same as :py:meth:`configure`, but reads the private key from a file.
+        """
+        private_key = None
+        if key_file is not None:
+            with open(key_file, "rb") as f:
+                private_key = f.read()
+        cls.configure(algorithm, private_key, kid)
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Switches back to signing with the shared secret.
+        """
+        cls._algorithm = SYMMETRIC_ALGORITHM
+        cls._kid = None
+        cls._private_key = None
+        cls._public_keys = {}
+        cls._jwks = {"keys": []}
+
+    @classmethod
+    def algorithm(cls) -> str:
+        return cls._algorithm
+
+    @classmethod
+    def sign(cls, payload: dict, secret: str) -> str:
+        """
+        Signs the payload. The secret is only used, if no
+        asymmetric algorithm is configured.
+        """
+        if cls._private_key is None:
+            return jwt.encode(payload, secret, algorithm=SYMMETRIC_ALGORITHM)
+        return jwt.encode(
+            payload, cls._private_key, algorithm=cls._algorithm, headers={"kid": cls._kid}
+        )
+
+    @classmethod
+    def verify(cls, token: str, secret: str) -> dict:
+        """
+        Verifies the token and returns its payload.
+
+        :raises jwt.exceptions.DecodeError: If the token was signed
+            with an unknown key.
+        """
+        if cls._private_key is None:
+            return jwt.decode(token, secret, algorithms=[SYMMETRIC_ALGORITHM])
+
+        kid = jwt.get_unverified_header(token).get("kid", None)
+        key = cls._public_keys.get(kid, None)
+        if key is None:
+            raise jwt.DecodeError(f"Unknown key id {kid}")
+        return jwt.decode(token, key, algorithms=[cls._algorithm])
+
+    @classmethod
+    def jwks(cls) -> Dict[str, list]:
+        """
+        Returns the public keys as JSON Web Key Set. The set
+        is empty, if tokens are signed with the shared secret.
+        """
+        return cls._jwks
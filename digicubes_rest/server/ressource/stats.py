@@ -0,0 +1,52 @@
+# pylint: disable=C0111
+import logging
+
+from responder.core import Request, Response
+
+from digicubes_rest.storage.pools import StatsPool
+
+from .util import BasicRessource, BluePrint, error_response, needs_bearer_token
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+stats_blueprint = BluePrint()
+route = stats_blueprint.route
+
+
+@route("/stats/")
+class StatsRessource(BasicRessource):
+    """
+    Lists the names of all statistics.
+    """
+
+    @needs_bearer_token()
+    async def on_get(self, req: Request, resp: Response) -> None:
+        resp.media = sorted(StatsPool.AGGREGATES)
+
+
+@route("/stats/{name}/")
+class StatRessource(BasicRessource):
+    """
+    A statistic like ``school_students``, the number of students
+    of every school.
+    """
+
+    @needs_bearer_token()
+    async def on_get(self, req: Request, resp: Response, *, name: str) -> None:
+        """
+        Get the statistic as json object, that maps the ids to the
+        numbers of related instances. Instances without related
+        instances are omitted.
+
+        The numbers are computed by the database and cached for
+        a short time.
+        """
+        try:
+            if name not in StatsPool.AGGREGATES:
+                error_response(resp, 404, f"No statistic {name}")
+                return
+            counts = await StatsPool.get(name)
+            resp.media = {str(key): value for key, value in counts.items()}
+
+        except Exception as error:  # pylint: disable=W0703
+            logger.exception("Could not compute statistic %s", name)
+            error_response(resp, 500, str(error))
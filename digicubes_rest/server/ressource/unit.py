@@ -12,6 +12,7 @@ from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import UnitModel
 from digicubes_rest.storage import models
+from digicubes_rest.storage.pools import CountPool, StatsPool
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -39,7 +40,7 @@ class UnitRessource(BasicRessource):
         """
         logger.debug("Requesting unit with id %d", unit_id)
         # First check, if this is a valid course which exists
-        db_unit: models.Unit = await models.Unit.get_or_none(id=unit_id)
+        db_unit: models.Unit = await self.only(req, models.Unit.get_or_none(id=unit_id))
 
         # If not, send a 404 response
         if db_unit is None:
@@ -63,8 +64,9 @@ class UnitRessource(BasicRessource):
                 resp.text = f"Unit with id {unit_id} does not exist."
             else:
                 await db_unit.delete()
-                # filter_fields = self.get_filter_fields(req)
-                UnitModel.from_orm(db_unit).send_json(resp)
+                CountPool.invalidate(models.Unit)
+                StatsPool.invalidate(models.Unit)
+                self.send_json(req, resp, UnitModel.from_orm(db_unit))
 
         except DoesNotExist:
             error_response(resp, 404, f"Unit with id {unit_id} does not exist.")
@@ -95,4 +97,4 @@ class UnitRessource(BasicRessource):
             db_unit.update(data)
             db_unit.modified_at = datetime.utcnow()
             await db_unit.save()
-            UnitModel.from_orm(db_unit).send_json(resp)
+            self.send_json(req, resp, UnitModel.from_orm(db_unit))
@@ -21,6 +21,7 @@ from tortoise.exceptions import IntegrityError
 
 from digicubes_rest.model import UnitModel
 from digicubes_rest.storage import models
+from digicubes_rest.storage.pools import CountPool, StatsPool
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -31,6 +32,9 @@ logger = logging.getLogger(__name__)  # pylint: disable=C0103
 units_blueprint = BluePrint()
 route = units_blueprint.route
 
+# Units are ordered by their position within the course.
+UNIT_PAGE_KEYS = ("position", "id")
+
 
 @route("/course/{course_id}/units/")
 class UnitsRessource(BasicRessource):
@@ -85,6 +89,8 @@ class UnitsRessource(BasicRessource):
                 logger.debug("Creating new unit")
 
                 unit_model = await UnitModel.orm_create_from_obj(course_id=course_id, data=data)
+                CountPool.invalidate(models.Unit)
+                StatsPool.invalidate(models.Unit)
                 unit_model.send_json(resp, status_code=201)
 
         except IntegrityError:
@@ -111,15 +117,13 @@ class UnitsRessource(BasicRessource):
         """
         try:
             # First check, if the course exists
-            course = await models.Course.get_or_none(id=course_id)
-            if course is None:
+            if not await models.Course.exists(id=course_id):
                 resp.status_code = 404
                 resp.text = f"Course with id {course_id} not found."
                 return
 
-            units = await models.Unit.filter(course=course).order_by("position")
-            # filter_fields = self.get_filter_fields(req)
-            UnitModel.list_model([UnitModel.from_orm(unit) for unit in units]).send_json(resp)
+            query = models.Unit.filter(course_id=course_id)
+            await self.send_page(req, resp, query, UnitModel, UNIT_PAGE_KEYS)
         except Exception as error:  # pylint: disable=W0703
             logger.exception("Cannot get units for course %d", course_id)
             error_response(resp, 500, str(error))
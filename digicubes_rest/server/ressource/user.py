@@ -5,9 +5,11 @@ from responder.core import Request, Response
 from tortoise.exceptions import DoesNotExist, IntegrityError
 
 from digicubes_rest.model import UserModel
+from digicubes_rest.storage import models
+from digicubes_rest.storage.pools import CountPool, StatsPool
 
 from .util import (BasicRessource, BluePrint, error_response,
-                   needs_bearer_token, needs_int_parameter)
+                   needs_bearer_token, needs_int_parameter, only)
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -41,13 +43,14 @@ class UserRessource(BasicRessource):
         """
         Get a user
 
-        Filterfields in the request are supported.
+        Filterfields in the request are supported. Related ressources
+        can be included with the ``include`` parameter, e.g.
+        ``include=roles,rights,schools.teacher``.
 
         :param int user_id: The id of the user.
         """
         try:
-            user = await UserModel.get(id=user_id)
-            user.send_json(resp)
+            await self.send_instance(req, resp, models.User.get(id=user_id), UserModel)
         except DoesNotExist:
             error_response(resp, 404, f"User with id {user_id} does not exist")
 
@@ -78,7 +81,7 @@ class UserRessource(BasicRessource):
             # if password is not None:
             #    await user.set_password(password)
 
-            user.send_json(resp)
+            self.send_json(req, resp, user)
 
         except DoesNotExist:
             error_response(resp, 404, f"User with id {user_id} does not exist.")
@@ -100,8 +103,12 @@ class UserRessource(BasicRessource):
         """
         try:
             user = await UserModel.get(id=user_id)
+            if user is None:
+                raise DoesNotExist()
             await user.delete()
-            resp.media = self.to_json(req, user)
+            CountPool.invalidate(models.User)
+            StatsPool.invalidate(models.User)
+            self.send_json(req, resp, user)
         except DoesNotExist:
             error_response(resp, 404, f"User with id {user_id} does not exist.")
 
@@ -113,13 +120,12 @@ class UserRessource(BasicRessource):
 async def get_user_by_login(req: Request, resp: Response, *, data):
     # pylint: disable=unused-variable
     if req.method == "get":
-        user = await UserModel.get(login=data)
-        # user = await models.User.get_or_none(login=data)
+        user = await only(req, models.User.get_or_none(login=data))
         if user is None:
             resp.status_code = 404
             resp.text = f"User with login {data} not found."
         else:
-            user.send_json(resp)
+            UserModel.from_orm(user).send_json(resp)
     else:
         resp.status_code = 405
         resp.text = "Method not allowed"
@@ -3,7 +3,7 @@ import logging
 
 from responder.core import Request, Response
 
-from digicubes_rest.storage.models import Right
+from digicubes_rest.storage.pools import RightsPool
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -27,8 +27,7 @@ class UserRightsRessource(BasicRessource):
         names of the rights.
         """
         try:
-            rights = await Right.filter(roles__users__id=1).distinct().values("name")
-            resp.media = [right["name"] for right in rights]
+            resp.media = list(await RightsPool.get_user_rights(user_id))
             resp.status_code = 200
         except Exception as error:  # pylint: disable=broad-except
             error_response(resp, 500, str(error))
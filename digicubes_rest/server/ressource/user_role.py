@@ -5,7 +5,10 @@ from responder.core import Request, Response
 from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import RoleModel
+from digicubes_rest.storage.associations import associate, dissociate
 from digicubes_rest.storage.models import Role, User
+from digicubes_rest.storage.pools import RightsPool, StatsPool
+from digicubes_rest.storage.rights_version import bump_users
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -54,9 +57,8 @@ class UserRoleRessource(BasicRessource):
         :param int role_id: the id of the role
         """
         try:
-            role = await Role.get(id=role_id, users__id=user_id)
-            # filter_fields = self.get_filter_fields(req)
-            RoleModel.from_orm(role).send_json(resp)
+            role = await self.only(req, Role.get(id=role_id, users=user_id))
+            self.send_json(req, resp, RoleModel.from_orm(role))
         except DoesNotExist:
             resp.status_code = 404
 
@@ -71,18 +73,23 @@ class UserRoleRessource(BasicRessource):
         Adding a role to a user
 
         Adds a role to a user. If the specified user or the
-        specified user does not exist, a status code of 404
-        is returned.
+        specified role does not exist, a status code of 404
+        is returned. If the role already is associated to the
+        user, a status code of ``304 - Not Modified`` is returned.
 
         :param user_id: The id of the user
         :param role_id: The id of the role you want to add to the user
         """
         try:
-            user = await User.get(id=user_id).prefetch_related("roles")
-            role = await Role.get(id=role_id)
-            await user.roles.add(role)  # TODO What, if the role already is associated. Not modified
-        except DoesNotExist:
-            error_response(resp, 404, "User or role not found")
+            if not await User.exists(id=user_id) or not await Role.exists(id=role_id):
+                error_response(resp, 404, "User or role not found")
+            elif await associate(User, "roles", user_id, role_id):
+                RightsPool.add_user_role(user_id, role_id)
+                await bump_users(user_id)
+                StatsPool.invalidate(Role)
+                resp.status_code = 200
+            else:
+                resp.status_code = 304
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
@@ -94,22 +101,22 @@ class UserRoleRessource(BasicRessource):
         """
         Remove a role from the list of associated roles for a user
 
+        If the role is not associated to the user, a status code
+        of ``304 - Not Modified`` is returned.
+
         :param int user_id: The user id
         :param int role_id: The id of the role
         """
         try:
-            user = await User.get(id=user_id).prefetch_related("roles")
-            role = await Role.get(id=role_id)
-            for role in user.roles:
-                if role.id is role_id:
-                    await user.roles.remove(role)
-                    return  # TODO What if the user was not associated to the user
-            error_response(resp, 404, "Role not found")  # TODO Not modified
-            return
-
-        except DoesNotExist:
-            error_response(resp, 404, "User. or role not found")
-            return
+            if await dissociate(User, "roles", user_id, role_id):
+                RightsPool.remove_user_role(user_id, role_id)
+                await bump_users(user_id)
+                StatsPool.invalidate(Role)
+                resp.status_code = 200
+            elif not await User.exists(id=user_id) or not await Role.exists(id=role_id):
+                error_response(resp, 404, "User or role not found")
+            else:
+                resp.status_code = 304  # Not Modified
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
@@ -5,7 +5,9 @@ from responder.core import Request, Response
 from tortoise.exceptions import DoesNotExist
 
 from digicubes_rest.model import RoleModel
-from digicubes_rest.storage.models import User
+from digicubes_rest.storage.models import Role, User
+from digicubes_rest.storage.pools import RightsPool, StatsPool
+from digicubes_rest.storage.rights_version import bump_users
 
 from .util import (BasicRessource, BluePrint, error_response,
                    needs_bearer_token, needs_int_parameter)
@@ -46,13 +48,11 @@ class UserRolesRessource(BasicRessource):
         Get the roles of e certain user
         """
         try:
-            user = await User.get(id=user_id).prefetch_related("roles")
-            # filter_fields = self.get_filter_fields(req)
-            RoleModel.list_model([RoleModel.from_orm(role) for role in user.roles]).send_json(
-                resp
-            )
-        except DoesNotExist:
-            error_response(resp, 404, "User not found")
+            if not await User.exists(id=user_id):
+                error_response(resp, 404, "User not found")
+                return
+
+            await self.send_page(req, resp, Role.filter(users=user_id), RoleModel)
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
@@ -81,6 +81,9 @@ class UserRolesRessource(BasicRessource):
         try:
             user = await User.get(id=user_id).prefetch_related("roles")
             await user.roles.clear()
+            RightsPool.clear_user_roles(user_id)
+            await bump_users(user_id)
+            StatsPool.invalidate(Role)
             return
         except DoesNotExist:
             error_response(resp, 404, f"User with id {user_id} not found.")
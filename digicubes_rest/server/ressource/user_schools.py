@@ -13,6 +13,13 @@ logger = logging.getLogger(__name__)  # pylint: disable=C0103
 user_schools_blueprint = BluePrint()
 route = user_schools_blueprint.route
 
+# The relation of the school to the user for every space
+SCHOOL_SPACES = {
+    "student": "students",
+    "headmaster": "principals",
+    "teacher": "teacher",
+}
+
 
 @route("/user/{user_id}/{space}/schools/")
 class UserSchoolsRessource(BasicRessource):
@@ -31,25 +38,13 @@ class UserSchoolsRessource(BasicRessource):
 
         :param int user_id: The id of the user.
         """
-        space_relation = {
-            "student": "student_schools",
-            "headmaster": "principal_schools",
-            "teacher": "teacher_schools",
-        }
         try:
-            user = None
-            relation = space_relation.get(space, None)
-
-            if relation is None:
+            if space not in SCHOOL_SPACES:
                 resp.status_code = 404
                 resp.text = "unknown relation type"
             else:
-                user = await models.User.get_or_none(id=user_id).prefetch_related(relation)
-                SchoolModel.list_model(
-                    [
-                        SchoolModel.from_orm(school) for school in getattr(user, relation, [])
-                    ]
-                ).send_json(resp)
+                query = models.School.filter(**{SCHOOL_SPACES[space]: user_id})
+                await self.send_page(req, resp, query, SchoolModel)
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
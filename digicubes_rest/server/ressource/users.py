@@ -1,14 +1,19 @@
 # pylint: disable=C0111
 import logging
-from typing import Tuple
 
 from responder import Request, Response
+from tortoise.transactions import in_transaction
 
+from digicubes_rest.exceptions import ServerBusy
 from digicubes_rest.model import PagedUserModel, UserModel
+from digicubes_rest.server.ratelimit import RateLimits, too_many_requests
 from digicubes_rest.storage import models
+from digicubes_rest.storage.hashing import HashPool
+from digicubes_rest.storage.pools import CountPool, RightsPool, StatsPool, UserPool
 
 from .util import (BasicRessource, BluePrint, create_bearer_token,
-                   error_response, needs_bearer_token)
+                   error_response, needs_bearer_token, rights_claims,
+                   send_filtered)
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 # logger.setLevel(logging.DEBUG)
@@ -16,6 +21,9 @@ logger = logging.getLogger(__name__)  # pylint: disable=C0103
 users_blueprint = BluePrint()
 route = users_blueprint.route
 
+# Matches the ordering of the user model. The id makes the key unique.
+USER_PAGE_KEYS = ("login", "id")
+
 
 @route("/users/")
 class UsersRessource(BasicRessource):
@@ -61,29 +69,22 @@ class UsersRessource(BasicRessource):
         """
         try:
             user = await UserModel.orm_create_from_obj(await req.media())
+            CountPool.invalidate(models.User)
+            StatsPool.invalidate(models.User)
             user.send_json(resp, status_code=201)
 
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
 
-    def pagination(
-        self, req: Request, count: int
-    ) -> Tuple[int, int]:  # pylint: disable=no-self-use
-        """Utility method to create valid pagination information"""
-        # TODO: Move to base class
-        # TODO: Set the link header
-        settings = req.state.settings
-        limit = min(
-            int(req.params.get("count", settings["default_count"])),
-            int(settings["max_count"]),
-        )
-        offset = int(req.params.get("offset", 0))
-        return (offset, limit)
-
     @needs_bearer_token()
     async def on_get(self, req: Request, resp: Response):
         """
         Requesting all users.
+
+        The users are returned in pages of ``count`` users, ordered by
+        login. ``count`` is limited by the ``max_count`` setting. The
+        ``next`` and ``prev`` links of the response point to the
+        neighbouring pages. They contain an opaque ``cursor``.
         """
 
         # Is the UserModel schema requested?
@@ -98,35 +99,9 @@ class UsersRessource(BasicRessource):
             resp.mimetype = "application/schema+json"
             return
 
-        count_users = await models.User.all().count()
-        limit, offset = self.pagination(req, count_users)
-        query = models.User.all()  # .offset(offset).limit(limit)
-        filter_fields = self.get_filter_fields(req)
-
-        # If filter fields are provided, then only select these fields from
-        # the database.
-        if filter_fields is not None:
-            query = query.only(*filter_fields)
-
-        # Build the url for this ressource
-        url = req.state.api.url_for(self.__class__)
-
-        # Creating the response object
-        content = PagedUserModel()
-        content.pagination.offset = offset
-        content.pagination.limit = limit
-        content.links.anchor_self = f"{url}?offset={offset}&limit={limit}"
-
-        try:
-            content.result = [UserModel.from_orm(user) for user in await query]
-            content.send_json(resp)
-
-        except ValueError as error:  # pylint: disable=W0703
-            logger.exception("Could not retrieve users.", exc_info=error)
-            error_response(resp, 500, str(error))
-        except KeyError as error:
-            logger.exception("Could not filter user attributes.", exc_info=error)
-            error_response(resp, 500, str(error))
+        await self.send_page(
+            req, resp, models.User.all(), UserModel, USER_PAGE_KEYS, paged_model=PagedUserModel
+        )
 
     @needs_bearer_token()
     async def on_put(self, req, resp, current_user=None):
@@ -150,6 +125,10 @@ class UsersRessource(BasicRessource):
         """
         try:
             await models.User.all().delete()
+            CountPool.invalidate(models.User)
+            StatsPool.invalidate(models.User)
+            await RightsPool.reload()
+            UserPool.clear()
         except Exception as error:  # pylint: disable=W0703
             error_response(resp, 500, str(error))
 
@@ -174,7 +153,7 @@ async def filter_user_by_login(req: Request, resp: Response, *, operation, data)
         elif operation == "iendswith":
             users = await models.User.filter(login__iendswith=data)
         elif operation == "iequals":
-            users = await models.User.filter(login__iequals=data)
+            users = await models.User.filter(login__iexact=data)
         else:
             resp.status_code = 400
             resp.text("Unupported filter operation.")
@@ -189,33 +168,50 @@ async def filter_user_by_login(req: Request, resp: Response, *, operation, data)
 @route("/users/filter/")
 async def get_user_by_attr(req: Request, resp: Response):
     try:
-        result = await users_blueprint.build_query_set(models.User, req)
-        if result is None:
-            resp.media = None
-        elif isinstance(result, int):
-            resp.media = result
-        elif isinstance(result, models.User):
-            UserModel.from_orm(result).send_json(resp)
-        else:
-            UserModel.list_model([UserModel.from_orm(user) for user in result]).send_json(resp)
-    except Exception:  # pylint: disable=bare-except
+        await send_filtered(req, resp, models.User, UserModel)
+    except Exception as error:  # pylint: disable=broad-except
         logger.exception("Unable to perform filter")
+        error_response(resp, 500, str(error))
 
 
 @route("/user/register/")
 async def register_new_user(req: Request, resp: Response):
 
     if req.method == "post":
+        if not RateLimits.check_address(req, resp):
+            return
+
         try:
             data = await req.media()
+            if not isinstance(data, dict) or not isinstance(data.get("password", ""), str):
+                error_response(resp, 400, "Bad formatted body content")
+                return
+
+            if not RateLimits.check_login(data.get("login", None), req, resp):
+                return
+
             secret = req.state.api.secret_key
-            user = await UserModel.orm_create_from_obj(data=data)
-            token = create_bearer_token(user.id, secret)
+            # Hash the password first. If the server is too busy,
+            # no half registered user is left behind.
+            password = data.pop("password", None)
+            password_hash = None
+            if password is not None:
+                password_hash = await HashPool.hash_password(password)
+            # Either the user is created with the password or not at all.
+            async with in_transaction():
+                user = await UserModel.orm_create_from_obj(data=data)
+                if password_hash is not None:
+                    await models.User.filter(id=user.id).update(password_hash=password_hash)
+            CountPool.invalidate(models.User)
+            StatsPool.invalidate(models.User)
+            token = create_bearer_token(user.id, secret, **await rights_claims(req, user.id))
             resp.media = {
                 "user": user.json(exclude_none=True, exclude_unset=True),
                 "bearer_token_data": token.json(exclude_none=True, exclude_unset=True),
             }
             resp.status_code = 201
+        except ServerBusy:
+            too_many_requests(resp, 1)
         except Exception as error:  # pylint: disable=W0703
             logger.exception("Could not register new user")
             error_response(resp, 500, str(error))
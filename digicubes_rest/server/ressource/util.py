@@ -1,8 +1,9 @@
 # pylint: disable=C0111
+import base64
 import logging
+import uuid
 from datetime import datetime, timedelta
-from enum import IntEnum
-from typing import List, Optional
+from typing import Any, FrozenSet, Iterable, List, Optional, Sequence, Type
 
 import jwt
 import pydantic as pyd
@@ -12,51 +13,33 @@ from tortoise.models import Model
 from tortoise.queryset import QuerySet
 from werkzeug import http
 
-from digicubes_rest.exceptions import InsufficientRights
-from digicubes_rest.model import BearerTokenData
+from digicubes_rest.exceptions import InsufficientRights, TokenRevoked
+from digicubes_rest.model import BearerTokenData, LinksModel, PaginationModel
+from digicubes_rest.model.abstract_base import ResponseModel
+from digicubes_rest.model.setup import template
 from digicubes_rest.storage import models
-from digicubes_rest.storage.pools import UserPool
+from digicubes_rest.storage.pools import (ApiKeyPool, CountPool, RevocationPool, RightsPool,
+                                          TokenPool, UserPool)
+
+from .filters import FilterError, checked_filter_plan, filter_plan, projection
+from .pagination import (keyset_page, page_link, page_size, self_link, set_link_header,
+                         set_total_count)
+from .sideload import includes, send_included
+from .signing import TokenSigner
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 # logger.setLevel(logging.DEBUG)
 
+# Every right of the base model template gets a fixed bit position.
+# The list of rights in the template must only be appended to, otherwise
+# already issued tokens will be misinterpreted.
+RIGHT_BITS = {name: bit for bit, name in enumerate(template["rights"])}
 
-class FilterFunction(IntEnum):
-
-    EQUAL = 0
-    IEQUAL = 1
-    STARTSWITH = 2
-    ISTARTSWITH = 3
-    ENDWITH = 4
-    IENDSWITH = 5
-    CONTAINS = 6
-    ICONTAINS = 7
-
-    def __str__(self):
-        return FilterFunction.to_name(self.value)
-
-    @staticmethod
-    def to_name(i: int):
-        return [
-            None,
-            "iequals",
-            "startswith",
-            "istartswith",
-            "endswith",
-            "iendswith",
-            "contains",
-            "icontains",
-        ][i]
-
-    def build(self, attribute: str):
-        return (
-            attribute
-            if self == FilterFunction.EQUAL
-            else f"{attribute}__{FilterFunction.to_name(self.value)}"
-        )
+# Header for authentication with an api key
+API_KEY_HEADER = "X-API-Key"
 
 
-def build_query_set(cls: Model, req: Request) -> QuerySet:
+def build_query_set(cls: Type[Model], req: Request) -> Any:
     """
     Creates a query base on the request information.
 
@@ -65,6 +48,7 @@ def build_query_set(cls: Model, req: Request) -> QuerySet:
     einem `und` verbunden sind. Jedes Filterkriterium besteht aus einem Tripel
     aus Attribute, Filterfunktion und Filterwert. Die Werte des Tripel sind
     durch Komma, und die Tripel durch Doppelpunkt voneinander getrennt.
+    Es kann nur nach indizierten Attributen gefiltert werden.
 
     Die Filterfunktionen werden durch ein Nummer angegeben. Folgende
     Funktionscodes sind definiert.
@@ -77,50 +61,50 @@ def build_query_set(cls: Model, req: Request) -> QuerySet:
     IENDSWITH = 5
     CONTAINS = 6
     ICONTAINS = 7
+    GT = 8
+    GTE = 9
+    LT = 10
+    LTE = 11
+    IN = 12
+    ISNULL = 13
+    RANGE = 14
+
+    Die Sortierung wird nicht geprüft, siehe :py:func:`send_filtered`.
 
+    :raises FilterError: If the parameters are invalid.
     """
-    order = req.params.get("o", None)
-    page = req.params.get("p", None)
-    filter_params = req.params.get("f", None)
-    specials = req.params.get("s", "").split(",")
+    return filter_plan(cls, req).apply()
+
 
-    result: QuerySet = None
-    if filter_params:
-        filter_args = {}
-        for filter_entry in filter_params.split(":"):
-            attribute, filter_fn, value = filter_entry.split(",")
-            filter_args[FilterFunction(int(filter_fn)).build(attribute)] = value
-        result = models.User.filter(**filter_args)
+async def send_filtered(
+    req: Request,
+    resp: Response,
+    model: Type[Model],
+    response_model: Type[pyd.BaseModel],
+    query: Optional[QuerySet] = None,
+) -> None:
+    """
+    Applies the filter parameters of the request to the query and
+    sends the result. Depending on the specials, the result is a list,
+    a single instance or a number. Invalid parameters and orderings
+    by columns without an index over too many rows are answered
+    with 400.
+    """
+    try:
+        plan = await checked_filter_plan(model, req)
+        result = await plan.apply(query)
+    except FilterError as error:
+        error_response(resp, 400, str(error))
+        return
+
+    if result is None or isinstance(result, int):
+        resp.media = result
+    elif isinstance(result, Model):
+        response_model.from_orm(result).send_json(resp)
     else:
-        result = models.User.all()
-
-    # Check ordering
-    if order:
-        order_fields = order.split(",")
-        logger.info("Ordering by %r", order_fields)
-        result = result.order_by(*order_fields)
-
-    columns = req.params.get("c", None)
-    if columns:
-        logger.debug("Adding columns filter %s", columns)
-        result = result.only(*columns.split(","))
-
-    if "first" in specials:
-        result = result.first()
-
-    if "count" in specials:
-        result = result.count()
-
-    if page:
-        limit_offset = page.split(":")
-        if len(limit_offset) == 1:
-            result = result.limit(int(limit_offset[0]))
-            logger.debug("Adding limit %d to query.", int(limit_offset[0]))
-        elif len(limit_offset) == 2:
-            result = result.limit(int(limit_offset[0])).offset(int(limit_offset[1]))
-        else:
-            raise ValueError(f"Bad page param {page}")
-    return result
+        response_model.list_model([response_model.from_orm(item) for item in result]).send_json(
+            resp
+        )
 
 
 class BluePrint:
@@ -145,10 +129,68 @@ class BluePrint:
     def __repr__(self):
         return f"Blueprint(prefix='{self._prefix}')"
 
-    def build_query_set(self, cls: Model, req: Request) -> QuerySet:
+    def build_query_set(self, cls: Type[Model], req: Request) -> Any:
         return build_query_set(cls, req)
 
 
+async def send_page(
+    req: Request,
+    resp: Response,
+    query: QuerySet,
+    response_model: Type[pyd.BaseModel],
+    keys: Sequence[str] = ("id",),
+    filter_fields: Optional[List[str]] = None,
+    paged_model: Optional[Type[ResponseModel]] = None,
+) -> None:
+    """
+    Sends one page of the query as a list of ``response_model``
+    items. The size of the page is taken from the ``count``
+    parameter, the position from the ``cursor`` parameter. The
+    links to the next and previous page are sent as ``Link``
+    header, the total number of items as ``X-Total-Count`` header
+    (see :py:class:`CountPool`). The filter criteria (``f``) of the
+    request are applied to the query. Malformed parameters are
+    answered with 400.
+
+    :param keys: The sort keys of the page. The last key
+        has to be unique.
+    :param filter_fields: The columns to select. The keys are
+        always selected.
+    :param paged_model: If given, the items are sent in this
+        envelope, e.g. :py:class:`PagedUserModel`, together with
+        the pagination and the links.
+    """
+    try:
+        limit = page_size(req)
+        query = filter_plan(query.model, req).where(query)
+        total, exact = await CountPool.count(query)
+        if filter_fields is not None:
+            query = query.only(*projection(query.model, set(filter_fields).union(keys)))
+        cursor = req.params.get("cursor", None)
+        items, next_cursor, prev_cursor = await keyset_page(query, keys, limit, cursor)
+    except ValueError as error:
+        error_response(resp, 400, str(error))
+        return
+
+    next_link, prev_link = page_link(req, limit, next_cursor), page_link(req, limit, prev_cursor)
+    set_link_header(resp, next_link, prev_link)
+    set_total_count(resp, total, exact)
+    result = [response_model.from_orm(item) for item in items]
+    # The keys may have been selected in addition to the requested fields.
+    fields = None if filter_fields is None else {"__all__": set(filter_fields)}
+    if paged_model is None:
+        include = None if fields is None else {"__root__": fields}
+        response_model.list_model(result).send_json(resp, include=include)
+        return
+
+    include = None if fields is None else {"pagination": ..., "links": ..., "result": fields}
+    paged_model(
+        pagination=PaginationModel(count=len(result), limit=limit, total=total),
+        links=LinksModel(anchor_self=self_link(req, limit), next=next_link, prev=prev_link),
+        result=result,
+    ).send_json(resp, include=include)
+
+
 class needs_typed_parameter:
     # pylint: disable=C0103
     def __init__(self, name, parameter_type):
@@ -219,12 +261,14 @@ def create_bearer_token(
     payload = {}
     payload.update(**kwargs)
     payload["user_id"] = user_id
+    # Unique id of the token, needed for revocation
+    payload["jti"] = uuid.uuid4().hex
     expiration_date: datetime = datetime.utcnow() + lifetime
 
     payload["exp"] = expiration_date
     payload["iat"] = datetime.utcnow()
     logger.debug("iat = %s", payload["iat"])
-    token = jwt.encode(payload, secret, algorithm="HS256")
+    token = TokenSigner.sign(payload, secret)
     # logger.debug("Generated token is %s", token.decode("UTF-8"))
     return BearerTokenData(
         user_id=user_id,
@@ -234,12 +278,86 @@ def create_bearer_token(
     )
 
 
+def encode_rights(rights: Iterable[str]) -> str:
+    """
+    Encodes the rights as a base64 encoded bitmask. Rights, that
+    are not part of the base model template, can not be encoded and
+    are ignored.
+    """
+    mask = 0
+    for right in rights:
+        bit = RIGHT_BITS.get(right, None)
+        if bit is not None:
+            mask |= 1 << bit
+    raw = mask.to_bytes(max(1, (mask.bit_length() + 7) // 8), "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_rights(encoded: str) -> FrozenSet[str]:
+    """
+    Decodes a bitmask created by :py:func:`encode_rights`.
+    """
+    raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    mask = int.from_bytes(raw, "big")
+    return frozenset(name for name, bit in RIGHT_BITS.items() if mask & (1 << bit))
+
+
+async def rights_claims(req: Request, user_id: int) -> dict:
+    """
+    Returns the additional token claims with the rights of the user,
+    if the ``rights_in_token`` setting is enabled. The rights are stored
+    as bitmask in the claim ``rgt``, together with the ``rights_version``
+    of the user in the claim ``rv``.
+
+    Both are read from the database, as the rights index of this process
+    may miss changes made by other processes. The version is read first,
+    so a concurrent change can only make the claim stale, never wrong.
+    """
+    settings = getattr(req.state, "settings", None) or {}
+    if not settings.get("rights_in_token", False):
+        return {}
+
+    user = await models.User.get(id=user_id).only("id", "rights_version")
+    names = (
+        await models.Right.filter(roles__users__id=user_id)
+        .distinct()
+        .values_list("name", flat=True)
+    )
+    return {"rgt": encode_rights(names), "rv": user.rights_version}
+
+
+def token_rights(payload: dict, rights: List[str], user: models.User) -> Optional[List[str]]:
+    """
+    Returns the subset of ``rights`` granted by the rights claim of the
+    token. Returns ``None``, if the token can not answer the question.
+    This is the case, if the token has no rights claim, if the rights
+    of the user have changed since the token was issued or if one of
+    the requested rights is not part of the bitmask.
+
+    The version is compared with the user, that is loaded for the
+    request anyway. Processes, that did not make the change, see it
+    as soon as their cached user expires (``DIGICUBES_USER_CACHE_TTL``).
+    """
+    encoded = payload.get("rgt", None)
+    if encoded is None or payload.get("rv", None) != user.rights_version:
+        return None
+
+    token_rights_set = decode_rights(encoded)
+    granted = [right for right in rights if right in token_rights_set]
+    if not granted and any(right not in RIGHT_BITS for right in rights):
+        return None
+    return granted
+
+
 def decode_bearer_token(token: str, secret: str) -> str:
     """
     Decode a bearer token
 
     The bearer token is decoded and the payload is returned.
     The secret has to be the same secret used for creating the token.
+    If an asymmetric algorithm is configured, the token is verified
+    with the public key, the ``kid`` header refers to. See
+    :py:class:`~digicubes_rest.server.ressource.signing.TokenSigner`.
 
     :param str token: The token to be decoded.
     :param str secret: The secret used for decoding.
@@ -250,7 +368,7 @@ def decode_bearer_token(token: str, secret: str) -> str:
     :raises jwt.exceptions.ExpiredSignatureError: If the token is not valid
         anymore
     """
-    payload = jwt.decode(token, secret, algorithms=["HS256"])
+    payload = TokenSigner.verify(token, secret)
     return payload
 
 
@@ -258,16 +376,15 @@ async def get_user_rights(user: models.User) -> List[str]:
     """
     Get a flat list of user rights, associated with the ``user``.
 
+    The rights are taken from the in-process rights index. See
+    :py:class:`~digicubes_rest.storage.pools.RightsPool`.
+
     :param digicubes.storage.models.User user: Get the rights for this user.
 
     :return: A list of rights associated with this user.
     :rtype: list(str)
     """
-    return (
-        await models.Right.filter(roles__users__id=user.id)
-        .distinct()
-        .values_list("name", flat=True)
-    )
+    return list(await RightsPool.get_user_rights(user.id))
 
 
 async def check_rights(user: models.User, rights: List[str]) -> List[str]:
@@ -280,27 +397,19 @@ async def check_rights(user: models.User, rights: List[str]) -> List[str]:
     if not rights:
         return []
 
-    rights_list = await get_user_rights(user)
-    logger.debug("The full list of user rights is: %s", rights_list)
+    user_rights = await RightsPool.get_user_rights(user.id)
+    logger.debug("The full set of user rights is: %s", user_rights)
     # Make a pure stringlist from the rightslist, as it may be
     # a mixture of strings and RightEntity entries.
     rights = [right if isinstance(right, str) else right.name for right in rights]
-
-    # if only one right is tested, we can simply do an in test.
-    if len(rights) == 1 and rights[0] in rights_list:
-        return rights
-
-    # No we need the intersection between the user rights
-    # and the test rights
-    return list(set(rights_list) & set(rights))
+    return [right for right in rights if right in user_rights]
 
 
 async def has_right(user: models.User, rights: List[str]) -> bool:
     """
     Test, if the user has at least one of the rights.
     """
-    rights.append("no_limits")
-    return len(await check_rights(user, rights)) > 0
+    return len(await check_rights(user, rights + ["no_limits"])) > 0
 
 
 async def is_root(user: models.User) -> bool:
@@ -311,16 +420,60 @@ async def is_root(user: models.User) -> bool:
 
 
 class needs_bearer_token:
+    """
+    Decorator for ressource methods, that need an authenticated caller.
+
+    Callers authenticate with a bearer token or, if ``api_key`` is true,
+    with an api key in the ``X-API-Key`` header. Api keys map to a
+    :py:class:`~digicubes_rest.storage.pools.ServicePrincipal`, which is
+    no user. Methods, that act on behalf of the current user, have to
+    set ``api_key`` to false.
 
-    __slots__ = ["rights"]
+    A principal only passes, if its key has been granted one of the
+    rights of the method. For methods without rights, that is the
+    ``no_limits`` right. A key without rights is always rejected.
+    """
+
+    __slots__ = ["rights", "api_key"]
 
-    def __init__(self, rights: List[str] = None) -> None:
+    def __init__(self, rights: List[str] = None, api_key: bool = True) -> None:
+        self.api_key = api_key
         if rights is None:
             self.rights = None
         elif isinstance(rights, str):
             self.rights = [rights, "no_limits"]
         else:
-            self.rights = rights + "no_limits"
+            self.rights = rights + ["no_limits"]
+
+    async def authenticate_api_key(self, me, req: Request, resp: Response) -> bool:
+        """
+        Authenticates the caller by the api key. The principal is
+        stored like the user in the bearer token case.
+        """
+        principal = await ApiKeyPool.get_principal(req.headers[API_KEY_HEADER])
+        if principal is None:
+            resp.text = "Invalid api key"
+            return False
+
+        # Unlike users, principals are never granted a method
+        # just by being authenticated.
+        rights = self.rights or ["no_limits"]
+        needed_rights = [right for right in rights if right in principal.rights]
+        if not needed_rights:
+            resp.status_code = 403
+            resp.text = f"Api key has non of the following rights {rights}"
+            return False
+        if self.rights is not None:
+            if hasattr(me, "user_rights"):
+                setattr(me, "user_rights", needed_rights)
+            req.state.user_rights = needed_rights
+
+        if hasattr(me, "current_user"):
+            setattr(me, "current_user", principal)
+        req.state.current_user = principal
+        req.state.principal = principal
+        resp.status_code = 200
+        return True
 
     def __call__(self, f):  # pylint: disable=R0915
         async def wrapped_f(me, req: Request, resp: Response, *args, **kwargs):
@@ -331,6 +484,9 @@ class needs_bearer_token:
                     "No secret key configured for this application. Check your configuration."
                 )
                 resp.text = "No secret key configured"
+            elif self.api_key and API_KEY_HEADER in req.headers:
+                if await self.authenticate_api_key(me, req, resp):
+                    return await f(me, req, resp, *args, **kwargs)
             else:
                 try:
                     # Check the header.
@@ -342,7 +498,10 @@ class needs_bearer_token:
                     if scheme == "Bearer":
                         # Currently only the Bearer scheme
                         try:
-                            payload = decode_bearer_token(token, req.state.api.secret_key)
+                            payload = TokenPool.get_claims(token)
+                            if payload is None:
+                                payload = decode_bearer_token(token, req.state.api.secret_key)
+                                TokenPool.add_claims(token, payload)
                             logger.debug("Payload: %s", payload)
                             user_id = payload.get("user_id", None)
                             logger.debug("Token %s", token)
@@ -353,9 +512,16 @@ class needs_bearer_token:
                             if user_id is None:
                                 raise jwt.DecodeError()
 
+                            jti = payload.get("jti", None)
+                            if jti is not None and await RevocationPool.is_revoked(jti):
+                                raise TokenRevoked()
+
+                            # The verified claims are needed later on, e.g.
+                            # for refreshing the token.
+                            req.state.token_payload = payload
+
                             # Now we need the user
-                            # user = await UserPool.get_user(user_id)
-                            user = await models.User.get(id=user_id)
+                            user = await UserPool.get_user(user_id)
                             logger.debug("We have a user. The login is %s", user.login)
 
                             # Let's see, if we have to check some rights
@@ -364,8 +530,11 @@ class needs_bearer_token:
                                 self.rights,
                             )
                             if self.rights is not None:
-                                # Yes, we have to
-                                needed_rights = await check_rights(user, self.rights)
+                                # Yes, we have to. First ask the token. Only if
+                                # the token can not answer, ask the rights index.
+                                needed_rights = token_rights(payload, self.rights, user)
+                                if needed_rights is None:
+                                    needed_rights = await check_rights(user, self.rights)
                                 logger.debug("Matching rights: %s", needed_rights)
                                 if not needed_rights:
                                     # None of the requierements are fullfilled
@@ -402,6 +571,9 @@ class needs_bearer_token:
                         except jwt.DecodeError:
                             logger.exception("Bad bearer token")
                             resp.text = "Bad bearer token"
+                        except TokenRevoked:
+                            logger.debug("Token revoked")
+                            resp.text = "Token revoked"
                         except DoesNotExist:
                             logger.exception("User does not exist")
                             resp.text = "No such user"
@@ -448,6 +620,76 @@ class needs_right:
         return wrapped_f
 
 
+def get_filter_fields(req: Request) -> Optional[List[str]]:
+    """
+    Returns a list of filtered fields. The basevalue is taken
+    from the header field ``x-filter-fields``
+    """
+    x_filter_fields = req.headers.get(BasicRessource.X_FILTER_FIELDS, None)
+    logger.debug("%s: %s", BasicRessource.X_FILTER_FIELDS, x_filter_fields)
+    if x_filter_fields is not None:
+        fields = [field.strip() for field in x_filter_fields.split(",")]
+        if "id" not in fields:
+            fields.append("id")
+        logger.debug("%s: %s", BasicRessource.X_FILTER_FIELDS, fields)
+        return fields
+
+    return None
+
+
+def only(req: Request, query: QuerySet) -> QuerySet:
+    """
+    Restricts the query to the columns of the ``x-filter-fields``
+    header. Can also be used for prefetch querysets.
+    """
+    filter_fields = get_filter_fields(req)
+    if filter_fields is None:
+        return query
+    return query.only(*projection(query.model, filter_fields))
+
+
+async def send_instance(
+    req: Request, resp: Response, query: QuerySet, response_model: Type[pyd.BaseModel]
+) -> None:
+    """
+    Sends the single instance of the query. The instance is
+    restricted to the fields of the ``x-filter-fields`` header and
+    sent together with the relations of the ``include`` parameter.
+    A bad ``include`` parameter is answered with status 400.
+
+    :raises DoesNotExist: If the query has no result.
+    """
+    try:
+        tree = includes(req, query.model)
+    except ValueError as error:
+        error_response(resp, 400, str(error))
+        return
+
+    if tree:
+        # The relations need the complete row, e.g. the foreign keys.
+        await send_included(resp, await query, tree, get_filter_fields(req))
+    else:
+        response_model.from_orm(await only(req, query)).send_json(resp)
+
+
+def send_etagged(req: Request, resp: Response, content: bytes) -> None:
+    """
+    Sends the json content with an ``ETag`` derived from the content.
+    If the client already has this version (``If-None-Match``),
+    the status 304 is sent without a body.
+    """
+    etag = http.generate_etag(content)
+    resp.headers["ETag"] = http.quote_etag(etag)
+    if http.parse_etags(req.headers.get("if-none-match", None)).contains(etag):
+        resp.status_code = 304
+        resp.content = b""
+        return
+
+    resp.status_code = 200
+    resp.content = content
+    resp.mimetype = "application/json"
+
+
 class BasicRessource:
     """
     A base for all endpoints
@@ -476,25 +718,52 @@ class BasicRessource:
     def get_filter_fields(self, req: Request) -> Optional[List[str]]:
         # pylint: disable=R0201
         """
-        Returns a list of filtered fields. The basevalue is taken
-        from the header field ``x-filter-fields``
+        Returns a list of filtered fields. See :py:func:`get_filter_fields`.
         """
-        x_filter_fields = req.headers.get(BasicRessource.X_FILTER_FIELDS, None)
-        logger.debug("%s: %s", BasicRessource.X_FILTER_FIELDS, x_filter_fields)
-        if x_filter_fields is not None:
-            fields = x_filter_fields.split(",")
-            if "id" not in fields:
-                fields.append("id")
-            logger.debug("%s: %s", BasicRessource.X_FILTER_FIELDS, fields)
-            return [field.strip() for field in fields]
-
-        return None
+        return get_filter_fields(req)
 
     def only(self, req: Request, query: QuerySet) -> QuerySet:
+        # pylint: disable=R0201
+        """
+        Restricts the query to the requested fields. See :py:func:`only`.
+        """
+        return only(req, query)
+
+    def send_json(
+        self, req: Request, resp: Response, model: pyd.BaseModel, status_code: int = 200
+    ) -> None:
+        """
+        Sends the model restricted to the fields of the ``x-filter-fields``
+        header. Use it for instances, that could not be loaded with
+        :py:meth:`only`, e.g. because they have been updated.
+        """
         filter_fields = self.get_filter_fields(req)
-        if filter_fields is None:
-            return query
-        return query.only(*filter_fields)
+        include = None if filter_fields is None else set(filter_fields)
+        model.send_json(resp, status_code=status_code, include=include)
+
+    async def send_instance(
+        self, req: Request, resp: Response, query: QuerySet, response_model: Type[pyd.BaseModel]
+    ) -> None:
+        """
+        Sends a single instance. See :py:func:`send_instance`.
+        """
+        await send_instance(req, resp, query, response_model)
+
+    async def send_page(
+        self,
+        req: Request,
+        resp: Response,
+        query: QuerySet,
+        response_model: Type[pyd.BaseModel],
+        keys: Sequence[str] = ("id",),
+        paged_model: Optional[Type[ResponseModel]] = None,
+    ) -> None:
+        """
+        Sends one page of the query. See :py:func:`send_page`.
+        """
+        await send_page(
+            req, resp, query, response_model, keys, self.get_filter_fields(req), paged_model
+        )
 
     def to_json(self, req: Request, model: pyd.BaseModel) -> str:
         return model.json(
@@ -0,0 +1,73 @@
+"""
+Single row access to the association tables of many to many relations.
+
+Adding or removing a related instance with tortoise requires both
+instances, and checking an association usually means loading the
+whole relation. The functions of this module work on exactly one
+row of the association table, e.g. ``roles_rights``, no matter how
+many instances are related.
+
+The relation is given by the model and the name of the relation,
+e.g. ``(Role, "rights")`` or ``(Right, "roles")``.
+"""
+from typing import Tuple, Type
+
+from pypika import Table
+from pypika.terms import Criterion
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
+
+
+def _association(model: Type[Model], relation: str, pk: int, related_pk: int) -> Tuple:
+    field = model._meta.fields_map[relation]  # pylint: disable=protected-access
+    table = Table(field.through)
+    criterion: Criterion = (table[field.backward_key] == pk) & (
+        table[field.forward_key] == related_pk
+    )
+    return model._meta.db, table, field, criterion  # pylint: disable=protected-access
+
+
+async def is_associated(model: Type[Model], relation: str, pk: int, related_pk: int) -> bool:
+    """
+    Checks, if the instances are associated.
+    """
+    db, table, field, criterion = _association(model, relation, pk, related_pk)
+    query = db.query_class.from_(table).select(table[field.backward_key]).where(criterion)
+    count, _ = await db.execute_query(str(query.limit(1)))
+    return count > 0
+
+
+async def associate(model: Type[Model], relation: str, pk: int, related_pk: int) -> bool:
+    """
+    Associates the instances. Returns ``False``, if they already
+    have been associated. Both instances have to exist.
+
+    The check and the insert run in one transaction. The association
+    tables have no unique constraint on both keys, so with an isolation
+    level below serializable two concurrent calls for the same pair may
+    still both insert a row. The duplicate is harmless for the rights
+    and roles and is removed by :py:func:`dissociate`.
+    """
+    connection_name = model._meta.default_connection  # pylint: disable=protected-access
+    async with in_transaction(connection_name):
+        if await is_associated(model, relation, pk, related_pk):
+            return False
+
+        db, table, field, _ = _association(model, relation, pk, related_pk)
+        query = (
+            db.query_class.into(table)
+            .columns(table[field.backward_key], table[field.forward_key])
+            .insert(pk, related_pk)
+        )
+        await db.execute_insert(str(query), [])
+        return True
+
+
+async def dissociate(model: Type[Model], relation: str, pk: int, related_pk: int) -> bool:
+    """
+    Removes the association of the instances. Returns ``False``,
+    if they have not been associated.
+    """
+    db, table, _, criterion = _association(model, relation, pk, related_pk)
+    count, _ = await db.execute_query(str(db.query_class.from_(table).where(criterion).delete()))
+    return count > 0
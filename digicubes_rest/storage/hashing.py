@@ -0,0 +1,155 @@
+"""
+Password hashing outside of the event loop.
+
+Hashing and verifying passwords is expensive by design. Running it
+directly on the event loop blocks every other request of the worker.
+The :py:class:`HashPool` moves the work into a process pool and limits
+the number of concurrent hash operations.
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from digicubes_rest.exceptions import ServerBusy
+
+logger = logging.getLogger(__name__)
+
+
+class HashPool:
+    """
+    Process pool for password hashing and verification.
+
+    At most ``max_concurrency`` operations are executed at the same time.
+    All other operations wait in a queue. The length of that queue is
+    reported by :py:meth:`queue_depth`. If ``max_queue`` operations are
+    already waiting, further operations are rejected with
+    :py:class:`~digicubes_rest.exceptions.ServerBusy`, so a burst of
+    logins can't pile up. With ``max_workers`` set to ``0``
+    no processes are started and the operations run on the event loop.
+    Daemonic processes are not allowed to have children. In that case
+    threads are used instead.
+    """
+
+    _executor: Optional[Executor] = None
+    _semaphore: Optional[asyncio.Semaphore] = None
+    _max_workers = 2
+    _max_concurrency = 4
+    _max_queue: Optional[int] = None
+    _waiting = 0
+    _running = 0
+    completed = 0
+    rejected = 0
+
+    @classmethod
+    def configure(
+        cls, max_workers: int = 2, max_concurrency: int = 4, max_queue: Optional[int] = None
+    ) -> None:
+        """
+        Sets the number of worker processes, the maximum number of
+        concurrent operations and the maximum number of waiting
+        operations (``None`` means unbounded). A running pool is
+        shut down.
+        """
+        cls.shutdown()
+        cls._max_workers = max_workers
+        cls._max_concurrency = max(1, max_concurrency)
+        cls._max_queue = max_queue
+        cls._semaphore = None
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """
+        Shuts the worker processes down.
+        """
+        if cls._executor is not None:
+            logger.info("Shutting down password hash pool.")
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
+
+    @classmethod
+    def _create_executor(cls) -> Executor:
+        if multiprocessing.current_process().daemon:
+            logger.warning("Running in a daemonic process. Hashing passwords in threads.")
+            return ThreadPoolExecutor(max_workers=cls._max_workers)
+
+        logger.info("Starting password hash pool with %d workers.", cls._max_workers)
+        return ProcessPoolExecutor(max_workers=cls._max_workers)
+
+    @classmethod
+    def queue_depth(cls) -> int:
+        """
+        Returns the number of operations waiting for a free slot.
+        """
+        return cls._waiting
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Returns the pool configuration and the number of running,
+        waiting and completed operations.
+        """
+        return {
+            "workers": cls._max_workers,
+            "max_concurrency": cls._max_concurrency,
+            "max_queue": cls._max_queue,
+            "running": cls._running,
+            "waiting": cls._waiting,
+            "completed": cls.completed,
+            "rejected": cls.rejected,
+        }
+
+    @classmethod
+    async def run(cls, fn: Callable, *args) -> Any:
+        """
+        Runs the function in the pool. The function and its arguments
+        have to be picklable.
+
+        :raises ServerBusy: If too many operations are waiting.
+        """
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(cls._max_concurrency)
+
+        if (
+            cls._max_queue is not None
+            and cls._semaphore.locked()
+            and cls._waiting >= cls._max_queue
+        ):
+            cls.rejected += 1
+            raise ServerBusy("Too many password operations waiting")
+
+        cls._waiting += 1
+        try:
+            await cls._semaphore.acquire()
+        finally:
+            cls._waiting -= 1
+
+        cls._running += 1
+        try:
+            if cls._max_workers <= 0:
+                return fn(*args)
+
+            if cls._executor is None:
+                cls._executor = cls._create_executor()
+            return await asyncio.get_event_loop().run_in_executor(cls._executor, fn, *args)
+        finally:
+            cls._running -= 1
+            cls.completed += 1
+            cls._semaphore.release()
+
+    @classmethod
+    async def hash_password(cls, password: str) -> str:
+        """
+        Returns the hash for the password.
+        """
+        return await cls.run(generate_password_hash, password)
+
+    @classmethod
+    async def verify_password(cls, password_hash: str, password: str) -> bool:
+        """
+        Checks the password against the hash.
+        """
+        return await cls.run(check_password_hash, password_hash, password)
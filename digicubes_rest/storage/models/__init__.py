@@ -3,5 +3,6 @@
 from .apikey import ApiKey
 from .org import Right, Role, User
 from .school import Course, School, Unit
+from .token import RevokedToken
 
-__all__ = [User, Role, Right, School, Course, ApiKey, Unit]
+__all__ = [User, Role, Right, School, Course, ApiKey, Unit, RevokedToken]
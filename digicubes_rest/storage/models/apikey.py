@@ -1,7 +1,7 @@
 """
 API Key Model
 """
-from tortoise.fields import CharField, DateField
+from tortoise.fields import CharField, DateField, ManyToManyField
 
 from .support import BaseModel
 
@@ -11,13 +11,19 @@ class ApiKey(BaseModel):
     """
     Api Key Model
 
-    To use the api, you need a valid API-KEY
+    To use the api, you need a valid API-KEY. A key belongs to
+    a service (like a batch job) and grants an explicit set
+    of rights.
     """
 
     apikey = CharField(24, unique=True, null=False)
+    name = CharField(32, null=True)
     valid_from = DateField(null=True)
     valid_until = DateField(null=True)
 
+    # pylint: disable=missing-docstring
+    rights = ManyToManyField("model.Right", related_name="apikeys", through="apikey_rights")
+
     class Meta:
         # pylint: disable=C0111, R0903
         table = "apikey"
@@ -9,10 +9,11 @@ import hashlib
 import logging
 import os
 
-from tortoise.fields import (BooleanField, CharField, DatetimeField,
+from tortoise.fields import (BooleanField, CharField, DatetimeField, IntField,
                              ManyToManyField)
 from werkzeug.security import check_password_hash, generate_password_hash
 
+from ..hashing import HashPool
 from .support import BaseModel, NamedMixin
 
 # from digicubes_rest.server.ressource.util import has_right
@@ -66,12 +67,14 @@ class User(BaseModel):
 
     first_name = CharField(FIRST_NAME_LENGHT, null=True)
     last_name = CharField(LAST_NAME_LENGHT, null=True)
-    email = CharField(EMAIL_LENGHT, null=True)
+    email = CharField(EMAIL_LENGHT, null=True, index=True)
     is_active = BooleanField(null=True, default=False)
     is_verified = BooleanField(null=True, default=False)
     verified_at = DatetimeField(null=True)
     password_hash = CharField(256, null=True)
     last_login_at = DatetimeField(null=True)
+    # Increased, whenever the rights of the user change
+    rights_version = IntField(default=0)
 
     roles = ManyToManyField("model.Role", related_name="users", through="user_roles")
 
@@ -123,6 +126,24 @@ class User(BaseModel):
             return False
         return check_password_hash(self.password_hash, password)
 
+    async def set_password(self, password: str) -> None:
+        """
+        Hash a password for storing. Other than the ``password``
+        setter, the hash is calculated in the :py:class:`HashPool`.
+        """
+        if password is None:
+            raise ValueError("No password provided to hash")
+        self.password_hash = await HashPool.hash_password(password)
+
+    async def check_password(self, password: str) -> bool:
+        """
+        Compare the password with the stored password hash. Other than
+        :py:meth:`verify_password`, the check runs in the :py:class:`HashPool`.
+        """
+        if not self.is_password_set:
+            return False
+        return await HashPool.verify_password(self.password_hash, password)
+
 
 class Role(NamedMixin, BaseModel):
     """
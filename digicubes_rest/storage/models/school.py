@@ -69,8 +69,8 @@ class Course(BaseModel):
     is_private = fields.BooleanField(default=False)
     description = fields.TextField(default="")
     created_by_id = fields.IntField(null=True)
-    from_date = fields.DateField(null=True)
-    until_date = fields.DateField(null=True)
+    from_date = fields.DateField(null=True, index=True)
+    until_date = fields.DateField(null=True, index=True)
 
     school = fields.ForeignKeyField("model.School", related_name="courses")
 
@@ -88,6 +88,8 @@ class Course(BaseModel):
         # pylint: disable=too-few-public-methods
         # pylint: disable=missing-docstring
         table = "course"
+        # The access path for the running courses of a school
+        indexes = (("school_id", "from_date", "until_date"),)
 
     def __str__(self):
         return str(self.name)
@@ -107,7 +109,7 @@ class Unit(BaseModel):
     )
 
     name = fields.CharField(NAME_LENGTH, null=False)
-    position = fields.IntField(null=False, default="-1")
+    position = fields.IntField(null=False, default="-1", index=True)
 
     is_active = fields.BooleanField(default=False)
     is_visible = fields.BooleanField(default=False)
@@ -0,0 +1,24 @@
+"""
+Revoked Token Model
+"""
+from tortoise.fields import CharField, DatetimeField
+
+from .support import BaseModel
+
+
+class RevokedToken(BaseModel):
+    # pylint: disable=R0903
+    """
+    Revoked Token Model
+
+    A bearer token, that must not be accepted anymore, although
+    it has not expired yet. Tokens are identified by their ``jti``
+    claim. Once the token has expired, the entry can be deleted.
+    """
+
+    jti = CharField(32, unique=True, null=False)
+    expires_at = DatetimeField(null=False, index=True)
+
+    class Meta:
+        # pylint: disable=C0111, R0903
+        table = "revoked_token"
@@ -1,4 +1,21 @@
 """Caching pools"""
+from .active_courses_pool import ActiveCoursesPool
+from .apikey_pool import ApiKeyPool, ServicePrincipal
+from .count_pool import CountPool
+from .revocation_pool import RevocationPool
+from .rights_pool import RightsPool
+from .stats_pool import StatsPool
+from .token_pool import TokenPool
 from .user_pool import UserPool
 
-__all__ = [UserPool]
+__all__ = [
+    ActiveCoursesPool,
+    ApiKeyPool,
+    CountPool,
+    RevocationPool,
+    RightsPool,
+    ServicePrincipal,
+    StatsPool,
+    TokenPool,
+    UserPool,
+]
@@ -0,0 +1,110 @@
+"""
+Cache for the courses, that are running today.
+
+A course is running, if today is between its ``from_date`` and its
+``until_date``. A missing date means, that the course has no start
+or no end. The courses of a school are found with the index on
+``(school_id, from_date, until_date)``. The result only changes with
+the date or when courses are changed, so it is cached until midnight.
+"""
+import logging
+from datetime import date
+from typing import Hashable, List, Optional
+
+from tortoise.query_utils import Q
+from tortoise.queryset import QuerySet
+
+from ..models import Course
+from .lru import LRU
+
+logger = logging.getLogger(__name__)
+
+
+def running(query: QuerySet, day: date) -> QuerySet:
+    """
+    Restricts the course query to the courses running at ``day``.
+    """
+    return query.filter(
+        Q(from_date__lte=day) | Q(from_date__isnull=True),
+        Q(until_date__gte=day) | Q(until_date__isnull=True),
+    )
+
+
+class ActiveCoursesPool:
+    """
+    Caches the running courses of schools and users.
+
+    The entries are valid for the local date, on which they have
+    been computed. Every change of a course or of the course members
+    has to be announced by calling :py:meth:`invalidate`.
+    """
+
+    _cache = LRU(maxsize=1024)
+    _generation = 0
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def configure(cls, maxsize: int = 1024) -> None:
+        cls._cache = LRU(maxsize=maxsize)
+
+    @classmethod
+    async def _get(cls, key: Hashable, query: QuerySet, day: Optional[date]) -> List[Course]:
+        day = day or date.today()
+        try:
+            cached_day, courses = cls._cache[key]
+            if cached_day == day:
+                cls.hits += 1
+                return courses
+        except KeyError:
+            pass
+
+        cls.misses += 1
+        generation = cls._generation
+        courses = await running(query, day).order_by("from_date", "id").distinct()
+        # The entry may have been invalidated, while we
+        # were waiting for the database.
+        if generation == cls._generation:
+            cls._cache[key] = (day, courses)
+        return courses
+
+    @classmethod
+    async def get_school_courses(cls, school_id: int, day: Optional[date] = None) -> List[Course]:
+        """
+        Returns the courses of the school, that are running today.
+        """
+        return await cls._get(("school", school_id), Course.filter(school_id=school_id), day)
+
+    @classmethod
+    async def get_user_courses(cls, user_id: int, day: Optional[date] = None) -> List[Course]:
+        """
+        Returns the courses, that are running today and the
+        user is student or teacher of.
+        """
+        query = Course.filter(Q(students=user_id) | Q(teachers=user_id))
+        return await cls._get(("user", user_id), query, day)
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """
+        Removes all entries. Has to be called after courses have been
+        created, updated or deleted and after the students or the
+        teachers of a course have been changed.
+        """
+        cls._generation += 1
+        cls._cache.clear()
+
+    @classmethod
+    def clear(cls) -> None:
+        cls.invalidate()
+        cls.hits = 0
+        cls.misses = 0
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            "entries": len(cls._cache),
+            "maxsize": cls._cache.maxsize,
+            "hits": cls.hits,
+            "misses": cls.misses,
+        }
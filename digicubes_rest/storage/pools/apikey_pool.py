@@ -0,0 +1,198 @@
+# pylint: disable=C0111
+import hashlib
+import logging
+from datetime import date
+from time import monotonic
+from typing import FrozenSet, Optional
+
+from ..models import ApiKey
+from .lru import LRU
+
+logger = logging.getLogger(__name__)
+
+# logger.setLevel(logging.DEBUG)
+
+
+class ServicePrincipal:
+    """
+    The caller, authenticated by an api key.
+
+    Other than a user, a principal has no roles. The rights are
+    assigned to the api key directly.
+    """
+
+    __slots__ = ["id", "key_id", "login", "rights", "valid_from", "valid_until"]
+
+    def __init__(
+        self,
+        key_id: int,
+        name: str,
+        rights: FrozenSet[str],
+        valid_from: date = None,
+        valid_until: date = None,
+    ):
+        # A principal is no user. Handlers looking up the
+        # current user by id won't find one.
+        self.id = None  # pylint: disable=invalid-name
+        self.key_id = key_id
+        self.login = name
+        self.rights = rights
+        self.valid_from = valid_from
+        self.valid_until = valid_until
+
+    def is_valid(self, today: date = None) -> bool:
+        """
+        Checks, if today is within the validity period of the key.
+        """
+        today = date.today() if today is None else today
+        if self.valid_from is not None and today < self.valid_from:
+            return False
+        if self.valid_until is not None and today > self.valid_until:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"ServicePrincipal({self.login} [key_id={self.key_id}])"
+
+
+class ApiKeyPool:
+    """
+    Cache for validated api keys.
+
+    Valid keys are cached for ``ttl`` seconds. Unknown or invalid
+    keys are cached for ``negative_ttl`` seconds in a cache of their
+    own, so guessing keys can not push valid keys out of the cache.
+
+    The cached principals hold the names of their rights. Renaming or
+    deleting a right has to be announced with :py:meth:`invalidate_right`,
+    changing the rights of a key with :py:meth:`invalidate`. Otherwise
+    the key keeps its former rights until the entry expires.
+    """
+
+    _cache = LRU(maxsize=256)
+    _negative = LRU(maxsize=1024)
+    _ttl = 300.0
+    _negative_ttl = 10.0
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def configure(cls, maxsize: int = 256, ttl: float = 300.0, negative_ttl: float = 10.0):
+        """
+        Sets the maximum number of cached keys and the time
+        to live of positive and negative entries in seconds.
+        Already cached entries are dropped.
+        """
+        cls._cache = LRU(maxsize=maxsize)
+        cls._negative = LRU(maxsize=maxsize * 4)
+        cls._ttl = ttl
+        cls._negative_ttl = negative_ttl
+
+    @staticmethod
+    def digest(apikey: str) -> bytes:
+        """
+        Returns the cache key for an api key.
+        """
+        return hashlib.sha256(apikey.encode("utf-8")).digest()
+
+    @classmethod
+    def _cached(cls, cache: LRU, key: bytes):
+        try:
+            expires_at, principal = cache[key]
+        except KeyError:
+            return False, None
+
+        if expires_at <= monotonic():
+            del cache[key]
+            return False, None
+        return True, principal
+
+    @classmethod
+    async def get_principal(cls, apikey: str) -> Optional[ServicePrincipal]:
+        """
+        Returns the principal for the api key or ``None``, if
+        the key is unknown or not valid today.
+        """
+        key = cls.digest(apikey)
+        for cache in (cls._cache, cls._negative):
+            found, principal = cls._cached(cache, key)
+            if found:
+                if principal is not None and not principal.is_valid():
+                    break
+                cls.hits += 1
+                return principal
+
+        cls.misses += 1
+        db_key = await ApiKey.get_or_none(apikey=apikey).prefetch_related("rights")
+        principal = None
+        if db_key is not None:
+            principal = ServicePrincipal(
+                db_key.id,
+                db_key.name,
+                frozenset(right.name for right in db_key.rights),
+                db_key.valid_from,
+                db_key.valid_until,
+            )
+
+        if principal is None or not principal.is_valid():
+            logger.debug("Invalid api key.")
+            cls._cache.discard(key)
+            cls._negative[key] = (monotonic() + cls._negative_ttl, None)
+            return None
+
+        cls._negative.discard(key)
+        cls._cache[key] = (monotonic() + cls._ttl, principal)
+        return principal
+
+    @classmethod
+    def invalidate(cls, apikey: str) -> None:
+        """
+        Removes the key from the cache. Has to be called
+        whenever the key or its rights are changed.
+        """
+        key = cls.digest(apikey)
+        cls._cache.discard(key)
+        cls._negative.discard(key)
+
+    @classmethod
+    def invalidate_right(cls, name: str) -> None:
+        """
+        Removes the keys, that have the right. Has to be called,
+        whenever a right is renamed or deleted.
+        """
+        for key, (_, principal) in list(cls._cache.items()):
+            if name in principal.rights:
+                cls._cache.discard(key)
+
+    @classmethod
+    def invalidate_all(cls) -> None:
+        """
+        Removes all valid keys, e.g. after all rights have been deleted.
+        """
+        cls._cache.clear()
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Removes all entries and resets the counters.
+        """
+        cls._cache.clear()
+        cls._negative.clear()
+        cls.hits = 0
+        cls.misses = 0
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Returns the hit and miss counters as well as
+        the current and the maximum size of the cache.
+        """
+        return {
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "size": len(cls._cache),
+            "negative_size": len(cls._negative),
+            "maxsize": cls._cache.maxsize,
+            "ttl": cls._ttl,
+            "negative_ttl": cls._negative_ttl,
+        }
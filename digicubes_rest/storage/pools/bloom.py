@@ -0,0 +1,41 @@
+# pylint: disable=C0111
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    A simple bloom filter for strings.
+
+    A filter answers, if an item is definitely not in the set or if it
+    may be in the set. The probability of a wrong "may be" is about
+    ``error_rate``, as long as no more than ``capacity`` items are added.
+    Items can not be removed. To remove items, a new filter has to be
+    built.
+    """
+
+    __slots__ = ["size", "hashes", "count", "_bits"]
+
+    def __init__(self, capacity: int = 1024, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def __len__(self):
+        return self.count
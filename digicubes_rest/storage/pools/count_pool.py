@@ -0,0 +1,136 @@
+"""
+Cache for the total number of items of paginated listings.
+
+Counting is a full scan on most databases. The :py:class:`CountPool`
+keeps the exact counts for a short time. Counts of unfiltered, large
+tables can optionally be taken from the statistics of the query
+planner, which are cheap but only approximate.
+"""
+import logging
+from time import monotonic
+from typing import Dict, Optional, Tuple, Type
+
+from tortoise.models import Model
+from tortoise.queryset import QuerySet
+
+from .lru import LRU
+
+logger = logging.getLogger(__name__)
+
+
+class CountPool:
+    """
+    Caches the counts of queries per model.
+
+    A count is identified by the SQL of the count query, so the
+    same filter always maps to the same entry. Every entry expires
+    after ``ttl`` seconds. Creating or deleting instances of a model
+    invalidates all counts of that model. Changes of relations are
+    only picked up after the entries expired.
+    """
+
+    _counts: Dict[Type[Model], LRU] = {}
+    _maxsize = 256
+    _ttl = 10.0
+    _estimate_threshold = 0
+    hits = 0
+    misses = 0
+    estimates = 0
+
+    @classmethod
+    def configure(cls, ttl: float = 10.0, maxsize: int = 256, estimate_threshold: int = 0):
+        """
+        Sets the lifetime of the entries in seconds and the maximum
+        number of entries per model.
+
+        If ``estimate_threshold`` is greater than zero, unfiltered
+        counts of tables with at least this number of rows are taken
+        from the planner statistics of the database. Only PostgreSQL
+        is supported. Other databases always count exactly.
+        """
+        cls._counts = {}
+        cls._ttl = ttl
+        cls._maxsize = maxsize
+        cls._estimate_threshold = estimate_threshold
+
+    @classmethod
+    async def count(cls, query: QuerySet) -> Tuple[int, bool]:
+        """
+        Returns the number of items of the query and whether
+        the number is exact or estimated.
+        """
+        model = query.model
+        key = query.count().sql()
+        entries = cls._counts.get(model, None)
+        if entries is None:
+            entries = cls._counts[model] = LRU(maxsize=cls._maxsize)
+
+        try:
+            total, exact, expires = entries[key]
+            if expires > monotonic():
+                cls.hits += 1
+                return total, exact
+        except KeyError:
+            pass
+
+        cls.misses += 1
+        total, exact = None, True
+        if cls._estimate_threshold > 0 and key == model.all().count().sql():
+            total = await cls.estimate(model)
+            if total is not None and total >= cls._estimate_threshold:
+                cls.estimates += 1
+                exact = False
+            else:
+                total = None
+
+        if total is None:
+            # A query can not be executed after its sql has been built.
+            total = await query.count()
+
+        entries[key] = (total, exact, monotonic() + cls._ttl)
+        return total, exact
+
+    @staticmethod
+    async def estimate(model: Type[Model]) -> Optional[int]:
+        """
+        Returns the estimated number of rows of the table of the
+        model or ``None``, if no estimate is available.
+        """
+        connection = model._meta.db  # pylint: disable=protected-access
+        if connection.capabilities.dialect != "postgres":
+            return None
+
+        rows = await connection.execute_query_dict(
+            "SELECT reltuples::bigint AS estimate FROM pg_class WHERE relname = $1",
+            [model._meta.db_table],  # pylint: disable=protected-access
+        )
+        # A table, that has never been analyzed, has no estimate.
+        if not rows or rows[0]["estimate"] < 0:
+            return None
+        return int(rows[0]["estimate"])
+
+    @classmethod
+    def invalidate(cls, *models: Type[Model]) -> None:
+        """
+        Removes all counts of the models. Has to be called after
+        instances have been created or deleted.
+        """
+        for model in models:
+            cls._counts.pop(model, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._counts = {}
+        cls.hits = 0
+        cls.misses = 0
+        cls.estimates = 0
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            "entries": sum(len(entries) for entries in cls._counts.values()),
+            "ttl": cls._ttl,
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "estimates": cls.estimates,
+        }
@@ -19,3 +19,15 @@ class LRU(OrderedDict):
         if len(self) > self.maxsize:
             oldest = next(iter(self))
             del self[oldest]
+
+    def discard(self, key):
+        """
+        Removes the key, if present.
+
+        For subclasses, ``OrderedDict.pop()`` unlinks the key first
+        and then reads the value with ``__getitem__``. The overridden
+        ``__getitem__`` then fails in ``move_to_end()`` with a
+        ``KeyError``, so ``pop()`` must not be used on an existing key.
+        """
+        if key in self:
+            del self[key]
@@ -0,0 +1,205 @@
+# pylint: disable=C0111
+import asyncio
+import itertools
+import logging
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+from typing import List, Optional, Set
+
+from tortoise.exceptions import IntegrityError
+
+from ..models import RevokedToken
+from .bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+# logger.setLevel(logging.DEBUG)
+
+
+class RevocationPool:
+    """
+    Revoked bearer tokens.
+
+    The revoked tokens are stored in the database. An in-memory bloom
+    filter in front of the table answers most of the checks. Only if
+    the filter reports a possible hit, the database is asked.
+
+    The filter is built by :py:meth:`load`. Before that, every check
+    goes to the database. Expired entries are deleted and the filter
+    is rebuilt by :py:meth:`prune`, which runs periodically in the
+    background after calling :py:meth:`start`.
+
+    The filter belongs to the process. Tokens revoked by other processes
+    are added by :py:meth:`sync`, which runs every few seconds in the
+    background. Until then, another process still accepts the token.
+    """
+
+    # Tokens revoked up to that long before the last sync are fetched
+    # again, to catch slow transactions and clocks of other hosts.
+    SYNC_OVERLAP = timedelta(seconds=60)
+
+    _filter: Optional[BloomFilter] = None
+    _capacity = 1024
+    _error_rate = 0.01
+    _task: Optional[asyncio.Task] = None
+    _synced_at: Optional[datetime] = None
+    # The tokens revoked while the filter is (re)loaded
+    _loading: List[Set[str]] = []
+    filter_misses = 0
+    db_checks = 0
+    false_positives = 0
+
+    @classmethod
+    def configure(cls, capacity: int = 1024, error_rate: float = 0.01) -> None:
+        """
+        Sets the minimum capacity and the error rate of the filter.
+        Takes effect with the next call to :py:meth:`load`.
+        """
+        cls._capacity = capacity
+        cls._error_rate = error_rate
+
+    @classmethod
+    async def load(cls) -> None:
+        """
+        Builds the filter from all revoked tokens, that have not
+        expired yet.
+        """
+        revoked: Set[str] = set()
+        cls._loading.append(revoked)
+        try:
+            now = datetime.now(timezone.utc)
+            jtis = await RevokedToken.filter(expires_at__gt=now).values_list("jti", flat=True)
+            # Leave room for the tokens, that will be revoked until
+            # the filter is rebuilt.
+            bloom = BloomFilter(max(cls._capacity, 2 * len(jtis)), cls._error_rate)
+            # Tokens revoked after the query would otherwise only be
+            # added to the old filter, which is dropped now.
+            for jti in itertools.chain(jtis, revoked):
+                bloom.add(jti)
+            cls._filter = bloom
+            cls._synced_at = now
+        finally:
+            cls._loading.remove(revoked)
+        logger.info("Loaded %d revoked tokens.", len(jtis))
+
+    @classmethod
+    async def sync(cls) -> int:
+        """
+        Adds the tokens revoked by other processes since the last sync
+        to the filter. Returns the number of tokens fetched.
+        """
+        if cls._filter is None or cls._synced_at is None:
+            return 0
+
+        now = datetime.now(timezone.utc)
+        jtis = await RevokedToken.filter(
+            created_at__gte=cls._synced_at - cls.SYNC_OVERLAP
+        ).values_list("jti", flat=True)
+        for jti in jtis:
+            cls._filter.add(jti)
+        cls._synced_at = now
+        return len(jtis)
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Drops the filter. All checks go to the database
+        until the filter is loaded again.
+        """
+        cls._filter = None
+
+    @classmethod
+    async def is_revoked(cls, jti: str) -> bool:
+        """
+        Checks, if the token with the given id has been revoked.
+        """
+        if cls._filter is not None and jti not in cls._filter:
+            cls.filter_misses += 1
+            return False
+
+        cls.db_checks += 1
+        revoked = await RevokedToken.exists(jti=jti)
+        if not revoked and cls._filter is not None:
+            cls.false_positives += 1
+        return revoked
+
+    @classmethod
+    async def revoke(cls, jti: str, expires_at: datetime) -> None:
+        """
+        Revokes the token with the given id. The entry can be
+        deleted, once the token has expired.
+        """
+        try:
+            await RevokedToken.create(jti=jti, expires_at=expires_at)
+        except IntegrityError:
+            logger.debug("Token %s has already been revoked.", jti)
+
+        if cls._filter is not None:
+            cls._filter.add(jti)
+        for revoked in cls._loading:
+            revoked.add(jti)
+
+    @classmethod
+    async def prune(cls) -> int:
+        """
+        Deletes all expired entries and rebuilds the filter.
+        Returns the number of deleted entries.
+        """
+        deleted = await RevokedToken.filter(expires_at__lte=datetime.now(timezone.utc)).delete()
+        if cls._filter is not None:
+            await cls.load()
+        logger.debug("Pruned %d expired tokens.", deleted)
+        return deleted
+
+    @classmethod
+    async def _run_periodically(cls, interval: float, sync_interval: float) -> None:
+        prune_at = monotonic() + interval
+        while True:
+            await asyncio.sleep(min(interval, sync_interval) if sync_interval > 0 else interval)
+            try:
+                if monotonic() >= prune_at:
+                    prune_at = monotonic() + interval
+                    await cls.prune()
+                elif sync_interval > 0:
+                    await cls.sync()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Could not prune or sync revoked tokens.")
+
+    @classmethod
+    def start(cls, interval: float = 600.0, sync_interval: float = 10.0) -> None:
+        """
+        Starts pruning expired entries every ``interval`` seconds and
+        fetching the tokens revoked by other processes every
+        ``sync_interval`` seconds. A ``sync_interval`` of 0 disables it.
+        """
+        if cls._task is None:
+            cls._task = asyncio.get_event_loop().create_task(
+                cls._run_periodically(interval, sync_interval)
+            )
+
+    @classmethod
+    async def stop(cls) -> None:
+        """
+        Stops the background pruning.
+        """
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Returns the number of checks answered by the filter and by
+        the database as well as the size of the filter.
+        """
+        return {
+            "filter_misses": cls.filter_misses,
+            "db_checks": cls.db_checks,
+            "false_positives": cls.false_positives,
+            "size": len(cls._filter) if cls._filter is not None else 0,
+            "loaded": cls._filter is not None,
+        }
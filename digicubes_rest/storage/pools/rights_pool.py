@@ -0,0 +1,187 @@
+# pylint: disable=C0111
+import logging
+import sys
+from typing import Dict, FrozenSet, Set
+
+from ..models import Right, Role, User
+
+logger = logging.getLogger(__name__)
+
+# logger.setLevel(logging.DEBUG)
+
+NO_RIGHTS: FrozenSet[str] = frozenset()
+
+
+class RightsPool:
+    """
+    In-process index of the effective rights of all users.
+
+    The index maps user ids to role ids and role ids to the
+    names of their rights. It is loaded once during startup
+    and kept up to date by the ressources and model helpers,
+    that change the memberships. Right names are interned, so
+    every name is held exactly once, no matter how many roles
+    refer to it.
+
+    As long as the index is not loaded, all requests are
+    answered directly by the database.
+    """
+
+    _loaded = False
+    _user_roles: Dict[int, Set[int]] = {}
+    _role_rights: Dict[int, FrozenSet[str]] = {}
+    _user_rights: Dict[int, FrozenSet[str]] = {}
+
+    @classmethod
+    async def load(cls) -> None:
+        """
+        (Re)loads the complete index from the database.
+        """
+        user_roles: Dict[int, Set[int]] = {}
+        for user_id, role_id in await User.filter(roles__id__isnull=False).values_list(
+            "id", "roles__id"
+        ):
+            user_roles.setdefault(user_id, set()).add(role_id)
+
+        role_rights: Dict[int, Set[str]] = {}
+        for role_id, right_name in await Role.filter(rights__id__isnull=False).values_list(
+            "id", "rights__name"
+        ):
+            role_rights.setdefault(role_id, set()).add(sys.intern(right_name))
+
+        cls._user_roles = user_roles
+        cls._role_rights = {role_id: frozenset(names) for role_id, names in role_rights.items()}
+        cls._user_rights = {}
+        cls._loaded = True
+        logger.info(
+            "Rights index loaded. %d users with roles, %d roles with rights.",
+            len(cls._user_roles),
+            len(cls._role_rights),
+        )
+
+    @classmethod
+    async def reload(cls) -> None:
+        """
+        Reloads the index, if it has been loaded before. Used
+        after bulk operations, that are hard to track.
+        """
+        if cls._loaded:
+            await cls.load()
+
+    @classmethod
+    def is_loaded(cls) -> bool:
+        return cls._loaded
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Drops the index. Until the next call of :py:meth:`load`
+        all requests are answered by the database.
+        """
+        cls._loaded = False
+        cls._user_roles = {}
+        cls._role_rights = {}
+        cls._user_rights = {}
+
+    @classmethod
+    async def get_user_rights(cls, user_id: int) -> FrozenSet[str]:
+        """
+        Returns the names of all rights the user has via his roles.
+        """
+        if not cls._loaded:
+            logger.debug("Rights index not loaded. Asking the database.")
+            names = (
+                await Right.filter(roles__users__id=user_id)
+                .distinct()
+                .values_list("name", flat=True)
+            )
+            return frozenset(names)
+
+        try:
+            return cls._user_rights[user_id]
+        except KeyError:
+            rights = NO_RIGHTS
+            for role_id in cls._user_roles.get(user_id, ()):
+                rights = rights | cls._role_rights.get(role_id, NO_RIGHTS)
+            cls._user_rights[user_id] = rights
+            return rights
+
+    # ------------------------------------------------------------------
+    # User <-> Role
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def add_user_role(cls, user_id: int, role_id: int) -> None:
+        if cls._loaded:
+            cls._user_roles.setdefault(user_id, set()).add(role_id)
+            cls._user_rights.pop(user_id, None)
+
+    @classmethod
+    def remove_user_role(cls, user_id: int, role_id: int) -> None:
+        if cls._loaded:
+            cls._user_roles.get(user_id, set()).discard(role_id)
+            cls._user_rights.pop(user_id, None)
+
+    @classmethod
+    def clear_user_roles(cls, user_id: int) -> None:
+        if cls._loaded:
+            cls._user_roles.pop(user_id, None)
+            cls._user_rights.pop(user_id, None)
+
+    @classmethod
+    def remove_user(cls, user_id: int) -> None:
+        cls.clear_user_roles(user_id)
+
+    @classmethod
+    def clear_role_users(cls, role_id: int) -> None:
+        if cls._loaded:
+            for role_ids in cls._user_roles.values():
+                role_ids.discard(role_id)
+            cls._user_rights = {}
+
+    # ------------------------------------------------------------------
+    # Role <-> Right
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def add_role_right(cls, role_id: int, right_name: str) -> None:
+        if cls._loaded:
+            rights = cls._role_rights.get(role_id, NO_RIGHTS)
+            cls._role_rights[role_id] = rights | {sys.intern(right_name)}
+            cls._user_rights = {}
+
+    @classmethod
+    def remove_role_right(cls, role_id: int, right_name: str) -> None:
+        if cls._loaded:
+            rights = cls._role_rights.get(role_id, NO_RIGHTS)
+            cls._role_rights[role_id] = rights - {right_name}
+            cls._user_rights = {}
+
+    @classmethod
+    def clear_role_rights(cls, role_id: int) -> None:
+        if cls._loaded:
+            cls._role_rights.pop(role_id, None)
+            cls._user_rights = {}
+
+    @classmethod
+    def remove_role(cls, role_id: int) -> None:
+        cls.clear_role_users(role_id)
+        cls.clear_role_rights(role_id)
+
+    @classmethod
+    def remove_right(cls, right_name: str) -> None:
+        if cls._loaded:
+            cls._role_rights = {
+                role_id: rights - {right_name} for role_id, rights in cls._role_rights.items()
+            }
+            cls._user_rights = {}
+
+    @classmethod
+    def rename_right(cls, old_name: str, new_name: str) -> None:
+        if cls._loaded and old_name != new_name:
+            new_name = sys.intern(new_name)
+            cls._role_rights = {
+                role_id: (rights - {old_name}) | {new_name} if old_name in rights else rights
+                for role_id, rights in cls._role_rights.items()
+            }
+            cls._user_rights = {}
@@ -0,0 +1,144 @@
+"""
+Cache for aggregated statistics.
+
+Dashboards need numbers like the students per school, but not the
+students themselves. Every statistic of the :py:class:`StatsPool`
+counts the related instances of all instances of a model with one
+``GROUP BY`` query, e.g. over the association table ``school_student``.
+"""
+import logging
+from time import monotonic
+from typing import Dict, NamedTuple, Tuple, Type
+
+from pypika import Table, functions
+from tortoise.fields.relational import BackwardFKRelation, ManyToManyFieldInstance
+from tortoise.models import Model
+
+from ..models import Course, Role, School
+
+logger = logging.getLogger(__name__)
+
+
+class Aggregate(NamedTuple):
+    """
+    Counts the instances of ``relation`` for every instance of ``model``.
+    """
+
+    model: Type[Model]
+    relation: str
+
+    @property
+    def related_model(self) -> Type[Model]:
+        meta = self.model._meta  # pylint: disable=protected-access
+        return meta.fields_map[self.relation].related_model
+
+    def query(self) -> str:
+        """
+        Returns the query, that selects the ``id`` of the instance
+        and the ``count`` of the related instances.
+        """
+        field = self.model._meta.fields_map[self.relation]  # pylint: disable=protected-access
+        if isinstance(field, ManyToManyFieldInstance):
+            table, column = Table(field.through), field.backward_key
+        elif isinstance(field, BackwardFKRelation):
+            meta = field.related_model._meta  # pylint: disable=protected-access
+            table = Table(meta.db_table)
+            column = meta.fields_db_projection[field.relation_field]
+        else:
+            raise TypeError(f"{self.model.__name__}.{self.relation} can not be aggregated")
+
+        db = self.model._meta.db  # pylint: disable=protected-access
+        query = (
+            db.query_class.from_(table)
+            .select(table[column].as_("id"), functions.Count("*").as_("count"))
+            .groupby(table[column])
+        )
+        return str(query)
+
+
+class StatsPool:
+    """
+    Computes and caches the statistics.
+
+    Every statistic expires after ``ttl`` seconds. Changes of a
+    relation invalidate all statistics of the models involved, see
+    :py:meth:`invalidate`.
+    """
+
+    AGGREGATES: Dict[str, Aggregate] = {
+        "school_students": Aggregate(School, "students"),
+        "school_teachers": Aggregate(School, "teacher"),
+        "school_courses": Aggregate(School, "courses"),
+        "course_units": Aggregate(Course, "units"),
+        "role_users": Aggregate(Role, "users"),
+    }
+
+    _stats: Dict[str, Tuple[float, Dict[int, int]]] = {}
+    _ttl = 60.0
+    _generation = 0
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def configure(cls, ttl: float = 60.0) -> None:
+        """
+        Sets the lifetime of a statistic in seconds.
+        """
+        cls._stats = {}
+        cls._ttl = ttl
+
+    @classmethod
+    async def get(cls, name: str) -> Dict[int, int]:
+        """
+        Returns the statistic ``name`` as dict of the instance ids
+        and the numbers of related instances. Instances without
+        related instances are missing.
+
+        :raises KeyError: If there is no such statistic.
+        """
+        aggregate = cls.AGGREGATES[name]
+        try:
+            expires, counts = cls._stats[name]
+            if expires > monotonic():
+                cls.hits += 1
+                return counts
+        except KeyError:
+            pass
+
+        cls.misses += 1
+        generation = cls._generation
+        db = aggregate.model._meta.db  # pylint: disable=protected-access
+        rows = await db.execute_query_dict(aggregate.query())
+        counts = {row["id"]: row["count"] for row in rows}
+        # The statistic may have been invalidated, while we
+        # were waiting for the database.
+        if generation == cls._generation:
+            cls._stats[name] = (monotonic() + cls._ttl, counts)
+        return counts
+
+    @classmethod
+    def invalidate(cls, *models: Type[Model]) -> None:
+        """
+        Removes all statistics, that involve one of the models. Has
+        to be called after the relations of an instance have been
+        changed or an instance has been created or deleted.
+        """
+        cls._generation += 1
+        for name, aggregate in cls.AGGREGATES.items():
+            if aggregate.model in models or aggregate.related_model in models:
+                cls._stats.pop(name, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._stats = {}
+        cls.hits = 0
+        cls.misses = 0
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            "entries": len(cls._stats),
+            "ttl": cls._ttl,
+            "hits": cls.hits,
+            "misses": cls.misses,
+        }
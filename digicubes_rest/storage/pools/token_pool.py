@@ -0,0 +1,104 @@
+# pylint: disable=C0111
+import hashlib
+import logging
+from time import time
+from typing import Optional
+
+from .lru import LRU
+
+logger = logging.getLogger(__name__)
+
+# logger.setLevel(logging.DEBUG)
+
+
+class TokenPool:
+    """
+    Cache for the claims of already verified bearer tokens.
+
+    The key is a digest of the token, so the raw token is never
+    held in memory longer than the request. Every entry expires
+    at the ``exp`` claim of its token. After that, the entry is
+    dropped and the token has to be verified again, which leads
+    to the usual :py:class:`~jwt.ExpiredSignatureError`.
+    """
+
+    _cache = LRU(maxsize=1024)
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def configure(cls, maxsize: int) -> None:
+        """
+        Sets the maximum number of cached tokens. Already
+        cached entries are dropped.
+        """
+        cls._cache = LRU(maxsize=maxsize)
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        """
+        Returns the cache key for a token.
+        """
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    @classmethod
+    def get_claims(cls, token: str) -> Optional[dict]:
+        """
+        Returns the verified claims of the token or ``None``, if
+        the token is not cached or the cached entry has expired.
+        """
+        key = cls.digest(token)
+        try:
+            expires_at, claims = cls._cache[key]
+        except KeyError:
+            cls.misses += 1
+            return None
+
+        if expires_at <= time():
+            logger.debug("Cached token has expired.")
+            del cls._cache[key]
+            cls.misses += 1
+            return None
+
+        cls.hits += 1
+        return claims
+
+    @classmethod
+    def add_claims(cls, token: str, claims: dict) -> None:
+        """
+        Stores the claims of a verified token. Tokens without
+        an ``exp`` claim are never cached.
+        """
+        expires_at = claims.get("exp", None)
+        if expires_at is None:
+            return
+        cls._cache[cls.digest(token)] = (expires_at, claims)
+
+    @classmethod
+    def remove(cls, token: str) -> None:
+        """
+        Removes the token from the cache.
+        """
+        cls._cache.discard(cls.digest(token))
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Removes all entries and resets the counters.
+        """
+        cls._cache.clear()
+        cls.hits = 0
+        cls.misses = 0
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Returns the hit and miss counters as well as
+        the current and the maximum size of the cache.
+        """
+        return {
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "size": len(cls._cache),
+            "maxsize": cls._cache.maxsize,
+        }
@@ -1,5 +1,8 @@
 # pylint: disable=C0111
+import asyncio
 import logging
+from time import monotonic
+from typing import Dict
 
 from ..models import User
 from .lru import LRU
@@ -10,20 +13,104 @@ logger = logging.getLogger(__name__)
 
 
 class UserPool:
+    """
+    Cache for user objects, used to authenticate requests.
+
+    Every entry lives at most ``ttl`` seconds. Changes to a user
+    have to be announced by calling :py:meth:`invalidate`.
+    Concurrent requests for the same, uncached user share one
+    database query.
+    """
 
     _cache = LRU(maxsize=512)
+    _ttl = 60.0
+    _pending: Dict[int, asyncio.Future] = {}
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def configure(cls, maxsize: int = 512, ttl: float = 60.0) -> None:
+        """
+        Sets the maximum number of cached users and the time to
+        live of an entry in seconds. Already cached entries are dropped.
+        """
+        cls._cache = LRU(maxsize=maxsize)
+        cls._ttl = ttl
 
     @classmethod
     async def get_user(cls, user_id: int) -> User:
         """
         Returns a User for the given id
         """
+        logger.debug("Requesting cache with id %d", user_id)
         try:
-            logger.debug("Requesting cache with id %d", user_id)
-            return cls._cache[user_id]
+            expires_at, user = cls._cache[user_id]
+            if expires_at > monotonic():
+                cls.hits += 1
+                return user
+            del cls._cache[user_id]
         except KeyError:
-            logger.debug("Didn't work requat user from database")
+            pass
+
+        cls.misses += 1
+        pending = cls._pending.get(user_id, None)
+        if pending is not None:
+            logger.debug("Waiting for pending request for user %d", user_id)
+            return await asyncio.shield(pending)
+
+        pending = asyncio.get_event_loop().create_future()
+        cls._pending[user_id] = pending
+        try:
+            logger.debug("Didn't work request user from database")
             user = await User.get(id=user_id)
+            # The entry may have been invalidated, while we
+            # were waiting for the database.
+            if cls._pending.get(user_id, None) is pending:
+                cls._cache[user_id] = (monotonic() + cls._ttl, user)
+            pending.set_result(user)
             logger.debug("Returning user %s", user)
-            cls._cache[user.id] = user
             return user
+        except Exception as error:
+            pending.set_exception(error)
+            # Mark the exception as retrieved, if no one else
+            # is waiting for it.
+            pending.exception()
+            raise
+        finally:
+            if not pending.done():
+                pending.cancel()
+            if cls._pending.get(user_id, None) is pending:
+                del cls._pending[user_id]
+
+    @classmethod
+    def invalidate(cls, user_id: int) -> None:
+        """
+        Removes the user from the cache. Has to be called
+        whenever the user is updated or deleted.
+        """
+        cls._cache.discard(user_id)
+        cls._pending.pop(user_id, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Removes all entries and resets the counters.
+        """
+        cls._cache.clear()
+        cls._pending.clear()
+        cls.hits = 0
+        cls.misses = 0
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Returns the hit and miss counters as well as
+        the current and the maximum size of the cache.
+        """
+        return {
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "size": len(cls._cache),
+            "maxsize": cls._cache.maxsize,
+            "ttl": cls._ttl,
+        }
@@ -0,0 +1,53 @@
+"""
+Persisted versions of the user rights.
+
+Every user has a ``rights_version``, that is increased whenever the
+rights of the user change. Tokens, that carry the rights of the user,
+also carry the version they were issued for. As the user is loaded for
+every authenticated request anyway, comparing the versions needs
+neither the rights index nor an additional query.
+
+Changes of a role or a right affect all users of the role. For
+deletions, the versions have to be increased *before* the role or the
+right is deleted, as the memberships are deleted along with them.
+"""
+from typing import Iterable
+
+from tortoise.expressions import F
+
+from .models import User
+from .pools import UserPool
+
+
+async def _bump(user_ids: Iterable[int]) -> None:
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    await User.filter(id__in=user_ids).update(rights_version=F("rights_version") + 1)
+    for user_id in user_ids:
+        UserPool.invalidate(user_id)
+
+
+async def bump_users(*user_ids: int) -> None:
+    """
+    Increases the rights version of the users.
+    """
+    await _bump(user_ids)
+
+
+async def bump_role(role_id: int) -> None:
+    """
+    Increases the rights version of all users of the role.
+    """
+    await _bump(await User.filter(roles__id=role_id).distinct().values_list("id", flat=True))
+
+
+async def bump_right(name: str) -> None:
+    """
+    Increases the rights version of all users, that have
+    the right via one of their roles.
+    """
+    await _bump(
+        await User.filter(roles__rights__name=name).distinct().values_list("id", flat=True)
+    )
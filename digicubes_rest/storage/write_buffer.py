@@ -0,0 +1,209 @@
+"""
+Write-behind buffer for bookkeeping columns.
+
+Some columns, like the time of the last login, are written on hot
+paths but are never used to make a decision. Writing them directly
+costs a full ``save()`` on every request. The :py:class:`WriteBuffer`
+collects these writes and flushes them in batches.
+
+Only use the buffer for columns, that may lag behind for a few
+seconds. Everything that is checked by a query (like ``is_active``)
+has to be written directly.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from itertools import islice
+from typing import Any, Dict, Optional, Tuple, Type
+
+from pypika.functions import Cast
+from pypika.terms import Case
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBuffer:
+    """
+    Collects single column updates and writes them in batches.
+
+    Several writes to the same column of the same row are coalesced,
+    only the last value is written. All rows of a column are written
+    with one ``UPDATE ... SET column = CASE pk WHEN ...`` statement per
+    ``BATCH_SIZE`` rows. The buffer is flushed every
+    ``interval`` seconds, as soon as ``flush_size`` rows are pending
+    and on shutdown. If ``max_size`` rows are pending, writers wait
+    for the flush to complete.
+    """
+
+    BATCH_SIZE = 500
+
+    _pending: Dict[Tuple[Type[Model], str], Dict[Any, Any]] = defaultdict(dict)
+    _size = 0
+    _interval = 5.0
+    _flush_size = 100
+    _max_size = 1000
+    _lock: Optional[asyncio.Lock] = None
+    _task: Optional[asyncio.Task] = None
+    _flush_task: Optional[asyncio.Task] = None
+    flushed = 0
+    batches = 0
+
+    @classmethod
+    def configure(cls, interval: float = 5.0, flush_size: int = 100, max_size: int = 1000):
+        """
+        Sets the flush interval in seconds and the number of pending
+        rows, that trigger a flush or block writers.
+        """
+        cls._interval = interval
+        cls._flush_size = max(1, flush_size)
+        cls._max_size = max(cls._flush_size, max_size)
+
+    @classmethod
+    def pending(cls) -> int:
+        """
+        Returns the number of pending writes.
+        """
+        return cls._size
+
+    @classmethod
+    async def record(cls, model: Type[Model], pk: Any, field: str, value: Any) -> None:
+        """
+        Schedules the write of ``value`` to the column ``field``
+        of the row with the primary key ``pk``.
+        """
+        rows = cls._pending[(model, field)]
+        if pk not in rows:
+            cls._size += 1
+        rows[pk] = value
+
+        if cls._size >= cls._max_size:
+            logger.debug("Write buffer is full. Flushing now.")
+            await cls.flush()
+        elif cls._size >= cls._flush_size and cls._flush_task is None:
+            cls._flush_task = asyncio.get_event_loop().create_task(cls._flush_in_background())
+
+    @classmethod
+    async def _flush_in_background(cls) -> None:
+        try:
+            await cls.flush()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Could not flush the write buffer.")
+        finally:
+            cls._flush_task = None
+
+    @classmethod
+    async def _update(
+        cls, connection: BaseDBAsyncClient, model: Type[Model], field: str, rows: Dict[Any, Any]
+    ) -> None:
+        """
+        Writes the values of one column with a single statement.
+        """
+        meta = model._meta  # pylint: disable=protected-access
+        table = meta.basetable
+        pk = table[meta.db_pk_column]
+        # Convert the values like tortoise does for a regular update
+        to_db_value = connection.executor_class(model=model, db=connection).column_map[field]
+        values = Case()
+        for key, value in rows.items():
+            values = values.when(pk == key, to_db_value(value, None))
+        dialect = connection.capabilities.dialect
+        if dialect == "postgres":
+            # Postgres types a CASE of literals as text, which can't
+            # be assigned to other columns without a cast.
+            values = Cast(values, meta.fields_map[field].get_for_dialect(dialect, "SQL_TYPE"))
+        query = (
+            connection.query_class.update(table)
+            .set(meta.fields_db_projection[field], values)
+            .where(pk.isin(list(rows)))
+        )
+        await connection.execute_query(str(query))
+
+    @classmethod
+    async def flush(cls) -> int:
+        """
+        Writes all pending values. Returns the number of
+        written rows.
+        """
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+
+        async with cls._lock:
+            if cls._size == 0:
+                return 0
+
+            pending, size = cls._pending, cls._size
+            cls._pending, cls._size = defaultdict(dict), 0
+            try:
+                async with in_transaction() as connection:
+                    for (model, field), rows in pending.items():
+                        items = iter(rows.items())
+                        batch = dict(islice(items, cls.BATCH_SIZE))
+                        while batch:
+                            await cls._update(connection, model, field, batch)
+                            cls.batches += 1
+                            batch = dict(islice(items, cls.BATCH_SIZE))
+            except Exception:
+                # Put the values back, unless they have been
+                # overwritten in the meantime.
+                for key, rows in pending.items():
+                    for pk, value in rows.items():
+                        if pk not in cls._pending[key]:
+                            cls._pending[key][pk] = value
+                            cls._size += 1
+                raise
+
+            cls.flushed += size
+            logger.debug("Flushed %d bookkeeping writes.", size)
+            return size
+
+    @classmethod
+    async def _flush_periodically(cls) -> None:
+        while True:
+            await asyncio.sleep(cls._interval)
+            try:
+                await cls.flush()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Could not flush the write buffer.")
+
+    @classmethod
+    def start(cls) -> None:
+        """
+        Starts flushing the buffer periodically.
+        """
+        if cls._task is None:
+            cls._task = asyncio.get_event_loop().create_task(cls._flush_periodically())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """
+        Stops the periodic flush and writes all pending values.
+        """
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+
+        if cls._flush_task is not None:
+            await cls._flush_task
+        await cls.flush()
+        # The lock belongs to the current event loop
+        cls._lock = None
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Returns the number of pending and flushed writes as well
+        as the number of executed update statements.
+        """
+        return {
+            "pending": cls._size,
+            "flushed": cls.flushed,
+            "batches": cls.batches,
+            "max_size": cls._max_size,
+        }
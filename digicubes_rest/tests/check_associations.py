@@ -0,0 +1,40 @@
+# pylint: disable=redefined-outer-name
+#
+import os
+from typing import Generator
+
+import pytest
+
+from digicubes_rest.storage import create_schema, init_orm, shutdown_orm
+from digicubes_rest.storage.associations import associate, dissociate, is_associated
+from digicubes_rest.storage.models import Right, Role
+
+
+@pytest.fixture
+async def orm() -> Generator:
+    os.environ["DIGICUBES_DATABASE_URL"] = "sqlite://:memory:"
+
+    await init_orm()
+    await create_schema()
+    yield
+    await shutdown_orm()
+
+
+@pytest.mark.asyncio
+async def test_associations(orm):
+    role = await Role.create(name="role")
+    right = await Right.create(name="right")
+    other = await Right.create(name="other")
+
+    assert not await is_associated(Role, "rights", role.id, right.id)
+    assert await associate(Role, "rights", role.id, right.id)
+    assert not await associate(Role, "rights", role.id, right.id)
+    # Both sides of the relation use the same table
+    assert await is_associated(Right, "roles", right.id, role.id)
+    assert not await is_associated(Right, "roles", other.id, role.id)
+    assert [r.name for r in await Right.filter(roles=role.id)] == ["right"]
+
+    assert not await dissociate(Role, "rights", role.id, other.id)
+    assert await dissociate(Right, "roles", right.id, role.id)
+    assert not await dissociate(Role, "rights", role.id, right.id)
+    assert await Right.filter(roles=role.id).count() == 0
@@ -0,0 +1,85 @@
+# pylint: disable=redefined-outer-name
+#
+import json
+import os
+from types import SimpleNamespace
+from typing import Generator
+
+import pytest
+
+from digicubes_rest.server.ressource.me_bootstrap import MeBootstrapRessource
+from digicubes_rest.server.ressource.util import create_bearer_token, send_etagged
+from digicubes_rest.storage import create_schema, init_orm, shutdown_orm
+from digicubes_rest.storage.models import Right, Role, School, User
+from digicubes_rest.storage.pools import TokenPool, UserPool
+
+SECRET = "secret"
+
+
+@pytest.fixture
+async def orm() -> Generator:
+    os.environ["DIGICUBES_DATABASE_URL"] = "sqlite://:memory:"
+
+    await init_orm()
+    await create_schema()
+    yield
+    await shutdown_orm()
+
+
+def request(headers: dict) -> SimpleNamespace:
+    state = SimpleNamespace(
+        api=SimpleNamespace(secret_key=SECRET), settings={"default_count": 10, "max_count": 2}
+    )
+    return SimpleNamespace(headers=headers, state=state)
+
+
+def test_send_etagged():
+    resp = SimpleNamespace(headers={})
+    send_etagged(request({}), resp, b'{"a":1}')
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/json"
+    assert resp.content == b'{"a":1}'
+    etag = resp.headers["ETag"]
+
+    resp = SimpleNamespace(headers={})
+    send_etagged(request({"if-none-match": etag}), resp, b'{"a":1}')
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["ETag"] == etag
+
+    # A changed content is sent again
+    resp = SimpleNamespace(headers={})
+    send_etagged(request({"if-none-match": etag}), resp, b'{"a":2}')
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_bootstrap(orm):
+    TokenPool.clear()
+    UserPool.clear()
+    user = await User.create(login="teacher", is_active=True, is_verified=True)
+    role = await Role.create(name="teacher", home_route="teacher.index")
+    await Role.create(name="student", home_route="student.index")
+    await role.rights.add(await Right.create(name="course_read"))
+    await user.roles.add(role)
+    schools = [await School.create(name=f"School {i}") for i in range(3)]
+    for school in schools:
+        await school.teacher.add(user)
+
+    token = create_bearer_token(user.id, SECRET).bearer_token
+    resp = SimpleNamespace(headers={})
+    await MeBootstrapRessource().on_get(request({"Authorization": f"Bearer {token}"}), resp)
+    assert resp.status_code == 200
+    data = json.loads(resp.content)
+
+    assert data["user"]["login"] == "teacher"
+    assert [entry["name"] for entry in data["roles"]] == ["teacher"]
+    assert data["rights"] == ["course_read"]
+    assert data["schools"]["student"] == []
+    assert data["schools"]["headmaster"] == []
+    # Not more schools per space than a page of /me/{space}/schools/
+    assert [entry["id"] for entry in data["schools"]["teacher"]] == [s.id for s in schools[:2]]
+    assert list(data["schools_next"]) == ["teacher"]
+    assert data["schools_next"]["teacher"].startswith("/me/teacher/schools/?count=2&cursor=")
+    assert data["home_routes"] == {"teacher": "teacher.index", "student": "student.index"}
@@ -80,3 +80,18 @@ def test_users(headers):
     user = UserModel.parse_obj(result[0])
     assert user.login == "root"
     assert resp.status_code == 200
+
+
+def test_bootstrap(headers):
+    resp = requests.get("http://127.0.0.1:3548/me/bootstrap/", headers=headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["user"]["login"] == "root"
+    assert set(data["schools"]) == {"student", "headmaster", "teacher"}
+
+    etag = resp.headers["ETag"]
+    resp = requests.get(
+        "http://127.0.0.1:3548/me/bootstrap/", headers={**headers, "If-None-Match": etag}
+    )
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
@@ -0,0 +1,179 @@
+# pylint: disable=redefined-outer-name
+#
+import os
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Generator
+
+import pytest
+
+from digicubes_rest.exceptions import ConstraintViolation
+from digicubes_rest.model import RightModel, RoleModel, UnitModel, UserModel
+from digicubes_rest.server.ressource.filters import (FilterError, FilterPlans, check_order,
+                                                     compile_plan, indexed_fields)
+from digicubes_rest.server.ressource.util import only
+from digicubes_rest.storage import create_schema, init_orm, shutdown_orm
+from digicubes_rest.storage.models import Course, RevokedToken, Right, Role, School, Unit, User
+from digicubes_rest.storage.pools import CountPool
+
+
+@pytest.fixture
+async def orm() -> Generator:
+    os.environ["DIGICUBES_DATABASE_URL"] = "sqlite://:memory:"
+
+    await init_orm()
+    await create_schema()
+    yield
+    await shutdown_orm()
+
+
+@pytest.mark.asyncio
+async def test_indexed_fields(orm):
+    assert {"id", "login", "email"} <= indexed_fields(User)
+    assert "first_name" not in indexed_fields(User)
+    assert {"id", "school_id"} <= indexed_fields(Course)
+    assert "name" in indexed_fields(School)
+
+
+@pytest.mark.asyncio
+async def test_compile_plan(orm):
+    plan = compile_plan(User, f="login,1,Root:id,0,1", o="-login,id", s="first", p="5:10")
+    assert plan.filters == {"login__iexact": "Root", "id": 1}
+    assert plan.order == ("-login", "id")
+    assert plan.first and not plan.count
+    assert (plan.limit, plan.offset) == (5, 10)
+
+    for params in (
+        {"f": "first_name,0,Klaas"},
+        {"f": "login,99,x"},
+        {"f": "login"},
+        {"o": "password"},
+        {"c": "login,nothing"},
+        {"s": "last"},
+        {"p": "1:2:3"},
+        {"f": "id,8,one"},
+        {"f": "id,14,1"},
+        {"f": "email,13,maybe"},
+    ):
+        with pytest.raises(FilterError):
+            compile_plan(User, **params)
+
+
+@pytest.mark.asyncio
+async def test_filter_plans(orm):
+    FilterPlans.clear()
+    school = await School.create(name="School")
+    other = await School.create(name="Other")
+    await Course.create(name="A", school=school)
+    await Course.create(name="B", school=school)
+    await Course.create(name="C", school=other)
+
+    params = (f"school_id,0,{school.id}", "-name", None, None, None)
+    plan = FilterPlans.get(Course, *params)
+    assert FilterPlans.get(Course, *params) is plan
+    assert FilterPlans.stats()["hits"] == 1
+    assert [course.name for course in await plan.apply()] == ["B", "A"]
+
+    # The model is part of the key
+    with pytest.raises(FilterError):
+        FilterPlans.get(School, *params)
+    assert await FilterPlans.get(Course, *params[:3], "count", None).apply() == 2
+
+
+@pytest.mark.asyncio
+async def test_check_order(orm):
+    CountPool.clear()
+    school = await School.create(name="School")
+    for name in "CAB":
+        await Course.create(name=name, school=school)
+
+    # The id is appended in the direction of the last key
+    assert compile_plan(Course, o="-from_date").order == ("-from_date", "-id")
+    assert compile_plan(Course, p="10").order == ("id",)
+    assert compile_plan(Course, o="-id,name").order == ("-id", "name")
+
+    plan = compile_plan(Course, f=f"school_id,0,{school.id}", o="name")
+    assert plan.unindexed == ("name",)
+    assert await check_order(plan, max_rows=3) is plan
+    with pytest.raises(FilterError):
+        await check_order(plan, max_rows=2)
+    degraded = await check_order(plan, max_rows=2, degrade=True)
+    assert degraded.order == ("id",) and plan.order == ("name", "id")
+    assert [course.name for course in await degraded.apply()] == ["C", "A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_operators(orm):
+    plan = compile_plan(Course, f="id,12,1,3:from_date,14,2021-01-01,2021-06-30:until_date,13,no")
+    assert plan.filters == {
+        "id__in": [1, 3],
+        "from_date__range": [date(2021, 1, 1), date(2021, 6, 30)],
+        "until_date__isnull": False,
+    }
+    # Times contain colons
+    plan = compile_plan(RevokedToken, f="expires_at,9,2021-01-01T10:30:00:id,10,5")
+    assert plan.filters == {"expires_at__gte": datetime(2021, 1, 1, 10, 30), "id__lt": 5}
+
+    school = await School.create(name="School")
+    for month in range(1, 7):
+        await Course.create(
+            name=f"{month}", school=school, from_date=date(2021, month, 1), until_date=None
+        )
+    running = compile_plan(Course, f="from_date,9,2021-02-01:from_date,11,2021-04-01", o="id")
+    assert [course.name for course in await running.apply()] == ["2", "3", "4"]
+    assert await compile_plan(Course, f="id,12,1,2,9", s="count").apply() == 2
+    assert await compile_plan(Course, f="until_date,13,true", s="count").apply() == 6
+
+
+def selected_columns(sql: str) -> int:
+    columns = sql[: sql.index(" FROM ")].replace("SELECT ", "", 1)
+    return len(columns.split(","))
+
+
+@pytest.mark.asyncio
+async def test_projection(orm):
+    school = await School.create(name="School")
+    course = await Course.create(name="Course", school=school)
+    await Unit.create(name="Unit", course=course, long_description="x" * 1000)
+
+    req = SimpleNamespace(headers={"x-filter-fields": "name, position, nope"})
+    assert selected_columns(Unit.all().sql()) == 10
+    # id, name and position, unknown fields are ignored
+    assert selected_columns(only(req, Unit.filter(course=course)).sql()) == 3
+    unit = UnitModel.from_orm(await only(req, Unit.filter(course=course)).first())
+    assert unit.json(exclude_unset=True) == '{"name": "Unit", "position": -1, "id": 1}'
+
+    # Relations are queried through the association table
+    req = SimpleNamespace(headers={"x-filter-fields": "login"})
+    user = await User.create(login="student")
+    await school.students.add(user)
+    query = only(req, User.filter(student_schools=school.id))
+    assert selected_columns(query.sql()) == 2
+    # Building the sql changes the query, so a new one is needed
+    query = only(req, User.filter(student_schools=school.id))
+    assert UserModel.from_orm(await query.first()).dict(exclude_unset=True) == {
+        "id": user.id,
+        "login": "student",
+    }
+
+    assert only(SimpleNamespace(headers={}), User.all()).sql() == User.all().sql()
+
+
+@pytest.mark.asyncio
+async def test_projection_needs_no_name(orm):
+    # A projected role or right validates without a name
+    role = await Role.create(name="teacher")
+    req = SimpleNamespace(headers={"x-filter-fields": "id"})
+    assert RoleModel.from_orm(await only(req, Role.all()).first()).dict(exclude_unset=True) == {
+        "id": role.id
+    }
+
+    # But a role or right can not be created without it
+    with pytest.raises(ConstraintViolation):
+        await RoleModel.orm_create_from_obj({"description": "No name"})
+    with pytest.raises(ConstraintViolation):
+        await RightModel.create_from_obj({"name": " "})
+    with pytest.raises(ConstraintViolation):
+        await RightModel.create(description="No name")
+    assert await Role.all().count() == 1
+    assert await Right.all().count() == 0
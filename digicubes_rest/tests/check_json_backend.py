@@ -0,0 +1,83 @@
+# pylint: disable=redefined-outer-name
+#
+import json
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from digicubes_rest.model import (CourseModel, LinksModel, PagedUserModel, PaginationModel,
+                                  UserListModel, UserModel)
+from digicubes_rest.model.json_backend import BACKENDS, JsonBackend
+
+
+@pytest.fixture
+def users() -> UserListModel:
+    now = datetime(2020, 5, 17, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    return UserListModel(
+        __root__=[
+            UserModel(id=1, login="ömer", created_at=now, is_active=True),
+            UserModel(id=2, login="zoë", created_at=now.replace(microsecond=0, tzinfo=None)),
+            UserModel(
+                id=3,
+                login="ted",
+                created_at=now.astimezone(timezone(timedelta(hours=2))),
+                first_name=None,
+            ),
+        ]
+    )
+
+
+@pytest.fixture
+def page(users) -> PagedUserModel:
+    return PagedUserModel(
+        pagination=PaginationModel(count=2, limit=2, offset=0),
+        links=LinksModel(anchor_self="/users/?count=2", next="/users/?count=2&cursor=x"),
+        result=users.__root__[:2],
+    )
+
+
+def test_default_backend_is_compatible(users, page):
+    # Byte for byte the same body as before the json backends
+    assert JsonBackend.name == "json"
+    for model in (users, users[0], page):
+        resp = SimpleNamespace()
+        model.send_json(resp)
+        assert resp.content == model.json(exclude_none=True, exclude_unset=True).encode("utf-8")
+
+    assert b'"login": "\\u00f6mer"' in users.dumps()
+    assert b'"anchor_self": "/users/?count=2"' in page.dumps()
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_send_json(users, backend):
+    JsonBackend.configure(backend)
+    try:
+        resp = SimpleNamespace()
+        users.send_json(resp, status_code=201)
+        assert resp.status_code == 201
+        assert resp.mimetype == "application/json"
+        assert isinstance(resp.content, bytes)
+        # The same document as before, without unset or empty fields
+        assert json.loads(resp.content) == json.loads(
+            users.json(exclude_none=True, exclude_unset=True)
+        )
+
+        users[0].send_json(resp, include={"id", "login"})
+        assert json.loads(resp.content) == {"id": 1, "login": "ömer"}
+
+        course = CourseModel(id=4, name="Course", from_date=date(2020, 5, 17))
+        assert json.loads(course.dumps()) == {"name": "Course", "from_date": "2020-05-17", "id": 4}
+    finally:
+        JsonBackend.configure()
+
+
+def test_backends_are_compatible(users):
+    pytest.importorskip("orjson")
+    data = users.dict(exclude_none=True, exclude_unset=True)["__root__"]
+    data.append({1: set(), "nested": {"day": date(2020, 5, 17)}})
+    documents = [json.loads(dumps(data, users.__json_encoder__)) for dumps in BACKENDS.values()]
+    assert documents[0] == documents[1]
+
+    with pytest.raises(ValueError):
+        JsonBackend.configure("simplejson")
@@ -0,0 +1,104 @@
+# pylint: disable=redefined-outer-name
+#
+import json
+import os
+from types import SimpleNamespace
+from typing import Generator
+
+import pytest
+from starlette.datastructures import URL, QueryParams
+
+from digicubes_rest.model import PagedUserModel, UserModel
+from digicubes_rest.server.ressource.pagination import (decode_cursor, encode_cursor,
+                                                        keyset_page, set_link_header)
+from digicubes_rest.server.ressource.util import send_page
+from digicubes_rest.storage import create_schema, init_orm, shutdown_orm
+from digicubes_rest.storage.pools import CountPool
+from digicubes_rest.storage.models import User
+
+KEYS = ("login", "id")
+
+
+@pytest.fixture
+async def users() -> Generator:
+    os.environ["DIGICUBES_DATABASE_URL"] = "sqlite://:memory:"
+
+    await init_orm()
+    await create_schema()
+    for i in range(7):
+        await User.create(login=f"user{6 - i}")
+    yield
+    await shutdown_orm()
+
+
+def test_cursor():
+    cursor = encode_cursor("n", ["klaas", 12])
+    assert decode_cursor(cursor, 2) == ("n", ["klaas", 12])
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 3)
+    with pytest.raises(ValueError):
+        decode_cursor("no cursor", 2)
+
+
+@pytest.mark.asyncio
+async def test_keyset_page(users):
+    page, next_cursor, prev_cursor = await keyset_page(User.all(), KEYS, 3)
+    assert [u.login for u in page] == ["user0", "user1", "user2"]
+    assert prev_cursor is None
+
+    page, next_cursor, prev_cursor = await keyset_page(User.all(), KEYS, 3, next_cursor)
+    assert [u.login for u in page] == ["user3", "user4", "user5"]
+
+    last, last_next, _ = await keyset_page(User.all(), KEYS, 3, next_cursor)
+    assert [u.login for u in last] == ["user6"]
+    assert last_next is None
+
+    page, _, prev_cursor = await keyset_page(User.all(), KEYS, 3, prev_cursor)
+    assert [u.login for u in page] == ["user0", "user1", "user2"]
+    assert prev_cursor is None
+
+
+def test_link_header():
+    resp = SimpleNamespace(headers={})
+    set_link_header(resp, None, None)
+    assert "Link" not in resp.headers
+
+    set_link_header(resp, "/rights/?count=2&cursor=a", "/rights/?count=2&cursor=b")
+    assert resp.headers["Link"] == (
+        '</rights/?count=2&cursor=a>; rel="next", </rights/?count=2&cursor=b>; rel="prev"'
+    )
+
+
+def request(url: str) -> SimpleNamespace:
+    url = URL(url)
+    return SimpleNamespace(
+        params=dict(QueryParams(url.query)),
+        state=SimpleNamespace(settings={"default_count": 10, "max_count": 3}),
+        _starlette=SimpleNamespace(url=url),
+    )
+
+
+@pytest.mark.asyncio
+async def test_paged_model(users):
+    CountPool.clear()
+    resp = SimpleNamespace(headers={})
+    req = request("http://localhost/users/?count=5&f=login,2,user&lang=de")
+    await send_page(req, resp, User.all(), UserModel, KEYS, paged_model=PagedUserModel)
+    data = json.loads(resp.content)
+
+    assert [user["login"] for user in data["result"]] == ["user0", "user1", "user2"]
+    assert data["pagination"] == {"count": 3, "limit": 3, "total": 7}
+    # The links keep all parameters of the request
+    links = data["links"]
+    assert links["anchor_self"] == "/users/?f=login%2C2%2Cuser&lang=de&count=3"
+    assert links["next"].startswith(links["anchor_self"] + "&cursor=")
+    assert "prev" not in links
+    assert resp.headers["X-Total-Count"] == "7"
+
+    # A projection keeps the envelope
+    resp = SimpleNamespace(headers={})
+    req = request(links["next"])
+    await send_page(req, resp, User.all(), UserModel, KEYS, ["login"], PagedUserModel)
+    data = json.loads(resp.content)
+    assert data["result"] == [{"login": "user3"}, {"login": "user4"}, {"login": "user5"}]
+    assert data["links"]["prev"] is not None
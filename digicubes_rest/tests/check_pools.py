@@ -0,0 +1,448 @@
+# pylint: disable=redefined-outer-name
+#
+import asyncio
+import os
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Generator
+
+import jwt
+import pytest
+from tortoise.exceptions import DoesNotExist
+
+from digicubes_rest.model import RightModel, RoleModel, UserModel
+from digicubes_rest.server.ressource.users import UsersRessource
+from digicubes_rest.server.ressource.util import (API_KEY_HEADER, create_bearer_token,
+                                                  decode_bearer_token, decode_rights,
+                                                  rights_claims)
+from digicubes_rest.storage import create_schema, init_orm, shutdown_orm
+from digicubes_rest.storage.hashing import HashPool
+from digicubes_rest.storage.models import (ApiKey, Course, RevokedToken, Right, Role, School,
+                                           Unit, User)
+from digicubes_rest.storage.pools import (ActiveCoursesPool, ApiKeyPool, CountPool,
+                                          RevocationPool, RightsPool, StatsPool, TokenPool,
+                                          UserPool)
+from digicubes_rest.storage.pools.bloom import BloomFilter
+from digicubes_rest.storage.rights_version import bump_right, bump_role, bump_users
+from digicubes_rest.storage.write_buffer import WriteBuffer
+
+SECRET = "secret"
+
+
+@pytest.fixture(autouse=True)
+def token_pool():
+    TokenPool.configure(maxsize=2)
+    TokenPool.clear()
+    yield TokenPool
+    TokenPool.clear()
+
+
+def test_token_pool_hit_and_miss():
+    token = create_bearer_token(1, SECRET).bearer_token
+    assert TokenPool.get_claims(token) is None
+    TokenPool.add_claims(token, decode_bearer_token(token, SECRET))
+    claims = TokenPool.get_claims(token)
+    assert claims["user_id"] == 1
+    stats = TokenPool.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_token_pool_expiration():
+    token = create_bearer_token(1, SECRET, lifetime=timedelta(seconds=-1)).bearer_token
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode_bearer_token(token, SECRET)
+
+    # Even if someone manages to put an expired token into the cache,
+    # it must never be returned.
+    TokenPool.add_claims(token, jwt.decode(token, options={"verify_signature": False}))
+    assert TokenPool.get_claims(token) is None
+    assert TokenPool.stats()["size"] == 0
+
+
+def test_token_pool_size_limit():
+    tokens = [create_bearer_token(user_id, SECRET).bearer_token for user_id in (1, 2, 3)]
+    for token in tokens:
+        TokenPool.add_claims(token, decode_bearer_token(token, SECRET))
+
+    assert TokenPool.stats()["size"] == 2
+    assert TokenPool.get_claims(tokens[0]) is None
+    assert TokenPool.get_claims(tokens[2])["user_id"] == 3
+
+
+def test_token_pool_remove():
+    token = create_bearer_token(1, SECRET).bearer_token
+    TokenPool.add_claims(token, decode_bearer_token(token, SECRET))
+    TokenPool.remove(token)
+    assert TokenPool.get_claims(token) is None
+    # Removing an unknown token is fine
+    TokenPool.remove(token)
+
+
+@pytest.fixture
+async def orm() -> Generator:
+    os.environ["DIGICUBES_DATABASE_URL"] = "sqlite://:memory:"
+
+    await init_orm()
+    await create_schema()
+    yield
+    RightsPool.reset()
+    await shutdown_orm()
+
+
+@pytest.mark.asyncio
+async def test_rights_pool(orm):
+    user = await UserModel.create(login="teacher")
+    role = await RoleModel.create(name="teacher")
+    right = await RightModel.create(name="course_read")
+    await role.add_right(right)
+    await user.add_role(role)
+
+    # Not loaded, the database answers
+    assert await RightsPool.get_user_rights(user.id) == {"course_read"}
+
+    await RightsPool.load()
+    assert await RightsPool.get_user_rights(user.id) == {"course_read"}
+
+    other_right = await RightModel.create(name="unit_read")
+    await role.add_right(other_right)
+    assert await RightsPool.get_user_rights(user.id) == {"course_read", "unit_read"}
+
+    await other_right.update(name="unit_all")
+    assert await RightsPool.get_user_rights(user.id) == {"course_read", "unit_all"}
+
+    await role.remove_right(right)
+    assert await RightsPool.get_user_rights(user.id) == {"unit_all"}
+
+    await user.remove_role(role)
+    assert await RightsPool.get_user_rights(user.id) == set()
+
+    # The index and the database still agree
+    await RightsPool.load()
+    assert await RightsPool.get_user_rights(user.id) == set()
+
+
+@pytest.mark.asyncio
+async def test_user_pool(orm):
+    UserPool.clear()
+    user = await UserModel.create(login="klaas")
+
+    users = await asyncio.gather(*[UserPool.get_user(user.id) for _ in range(5)])
+    # All concurrent requests share the same database result
+    assert all(u is users[0] for u in users)
+    assert UserPool.stats()["size"] == 1
+
+    assert (await UserPool.get_user(user.id)) is users[0]
+    assert UserPool.stats()["hits"] == 1
+
+    user.first_name = "Klaas"
+    await user.update()
+    assert UserPool.stats()["size"] == 0
+    assert (await UserPool.get_user(user.id)).first_name == "Klaas"
+
+    await user.delete()
+    with pytest.raises(DoesNotExist):
+        await UserPool.get_user(user.id)
+    UserPool.clear()
+
+
+@pytest.mark.asyncio
+async def test_apikey_pool(orm):
+    ApiKeyPool.configure(ttl=60, negative_ttl=60)
+    right = await Right.create(name="course_read")
+    key = await ApiKey.create(apikey="a" * 24, name="batch")
+    await key.rights.add(right)
+    await ApiKey.create(apikey="b" * 24, name="expired", valid_until=date.today() - timedelta(1))
+
+    principal = await ApiKeyPool.get_principal("a" * 24)
+    assert principal.login == "batch"
+    assert principal.id is None
+    assert principal.rights == {"course_read"}
+    assert (await ApiKeyPool.get_principal("a" * 24)) is principal
+
+    assert await ApiKeyPool.get_principal("b" * 24) is None
+    assert await ApiKeyPool.get_principal("unknown") is None
+    # Negative results are cached as well
+    assert await ApiKeyPool.get_principal("unknown") is None
+    stats = ApiKeyPool.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+    assert stats["negative_size"] == 2
+
+    await key.delete()
+    assert (await ApiKeyPool.get_principal("a" * 24)) is principal
+    ApiKeyPool.invalidate("a" * 24)
+    assert await ApiKeyPool.get_principal("a" * 24) is None
+    ApiKeyPool.clear()
+
+
+@pytest.mark.asyncio
+async def test_apikey_right_changes(orm):
+    ApiKeyPool.configure(ttl=60, negative_ttl=60)
+    right = await Right.create(name="course_read")
+    await ApiKey.create(apikey="b" * 24, name="other")
+    await (await ApiKey.create(apikey="a" * 24, name="batch")).rights.add(right)
+    assert (await ApiKeyPool.get_principal("a" * 24)).rights == {"course_read"}
+    other = await ApiKeyPool.get_principal("b" * 24)
+
+    await RightModel.from_orm(right).update(name="course_view")
+    assert (await ApiKeyPool.get_principal("a" * 24)).rights == {"course_view"}
+    # Keys without the right stay in the cache
+    assert (await ApiKeyPool.get_principal("b" * 24)) is other
+
+    await RightModel.from_orm(right).delete()
+    assert (await ApiKeyPool.get_principal("a" * 24)).rights == frozenset()
+    ApiKeyPool.clear()
+
+
+@pytest.mark.asyncio
+async def test_apikey_needs_rights(orm):
+    ApiKeyPool.clear()
+    await User.create(login="user")
+    await ApiKey.create(apikey="a" * 24, name="nothing")
+    key = await ApiKey.create(apikey="b" * 24, name="root")
+    await key.rights.add(await Right.create(name="no_limits"))
+
+    def request(apikey):
+        state = SimpleNamespace(api=SimpleNamespace(secret_key=SECRET))
+        return SimpleNamespace(headers={API_KEY_HEADER: apikey}, state=state)
+
+    # Deleting all users names no rights, so only root keys may do it
+    resp = SimpleNamespace()
+    await UsersRessource().on_delete(request("a" * 24), resp)
+    assert resp.status_code == 403
+    assert await User.all().count() == 1
+
+    await UsersRessource().on_delete(request("b" * 24), resp)
+    assert resp.status_code == 200
+    assert await User.all().count() == 0
+    ApiKeyPool.clear()
+
+
+@pytest.mark.asyncio
+async def test_rights_version(orm):
+    user, other = await User.create(login="user"), await User.create(login="other")
+    role = await Role.create(name="teacher")
+    right = await Right.create(name="course_read")
+    await user.roles.add(role)
+
+    async def versions():
+        return await User.all().order_by("id").values_list("rights_version", flat=True)
+
+    await role.rights.add(right)
+    await bump_role(role.id)
+    assert await versions() == [1, 0]
+    await bump_users(user.id, other.id)
+    await bump_right("course_read")
+    assert await versions() == [3, 1]
+
+    req = SimpleNamespace(state=SimpleNamespace(settings={"rights_in_token": True}))
+    claims = await rights_claims(req, user.id)
+    assert claims["rv"] == 3
+    assert decode_rights(claims["rgt"]) == {"course_read"}
+    req.state.settings = {}
+    assert await rights_claims(req, user.id) == {}
+
+    # Tokens with the former name of a right have to be renewed
+    await RightModel.from_orm(right).update(name="course_view")
+    assert await versions() == [4, 1]
+    await RightModel.from_orm(right).update(description="Same name")
+    assert await versions() == [4, 1]
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"token-{i}")
+    assert all(f"token-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+@pytest.mark.asyncio
+async def test_revocation_pool(orm, monkeypatch):
+    RevocationPool.reset()
+    now = datetime.now(timezone.utc)
+    await RevocationPool.revoke("expired", now - timedelta(minutes=1))
+    await RevocationPool.revoke("revoked", now + timedelta(minutes=30))
+
+    await RevocationPool.load()
+    db_checks = RevocationPool.stats()["db_checks"]
+    assert await RevocationPool.is_revoked("revoked")
+    assert not await RevocationPool.is_revoked("valid")
+    # Only the filter hit needs the database
+    assert RevocationPool.stats()["db_checks"] - db_checks == 1
+
+    await RevocationPool.revoke("later", now + timedelta(minutes=30))
+    assert await RevocationPool.is_revoked("later")
+
+    assert await RevocationPool.prune() == 1
+    assert RevocationPool.stats()["size"] == 2
+    assert await RevocationPool.is_revoked("revoked")
+
+    # Revoked after the filter has been queried, but before it is replaced
+    queried, revoked = asyncio.Event(), asyncio.Event()
+    select = RevokedToken.filter
+
+    def blocking_filter(*args, **kwargs):
+        async def values_list(*fields, **options):
+            result = await select(*args, **kwargs).values_list(*fields, **options)
+            queried.set()
+            await revoked.wait()
+            return result
+
+        return SimpleNamespace(values_list=values_list)
+
+    monkeypatch.setattr(RevokedToken, "filter", blocking_filter)
+    reload = asyncio.ensure_future(RevocationPool.load())
+    await queried.wait()
+    monkeypatch.undo()
+    await RevocationPool.revoke("during", now + timedelta(minutes=30))
+    revoked.set()
+    await reload
+    assert await RevocationPool.is_revoked("during")
+
+    # Revoked by another process
+    await RevokedToken.create(jti="elsewhere", expires_at=now + timedelta(minutes=30))
+    assert not await RevocationPool.is_revoked("elsewhere")
+    assert await RevocationPool.sync() >= 1
+    assert await RevocationPool.is_revoked("elsewhere")
+    RevocationPool.reset()
+
+
+@pytest.mark.asyncio
+async def test_write_buffer(orm):
+    WriteBuffer.configure(interval=60, flush_size=3, max_size=3)
+    users = [await UserModel.create(login=f"user{i}") for i in range(3)]
+    login_at = datetime(2020, 1, 1, 12, 30, 15, 123456)
+    batches = WriteBuffer.stats()["batches"]
+
+    await WriteBuffer.record(User, users[0].id, "last_login_at", datetime(2019, 1, 1))
+    # Writes to the same row are coalesced
+    await WriteBuffer.record(User, users[0].id, "last_login_at", login_at)
+    await WriteBuffer.record(User, users[1].id, "last_login_at", login_at + timedelta(seconds=1))
+    assert WriteBuffer.pending() == 2
+    assert (await User.get(id=users[0].id)).last_login_at is None
+
+    # The buffer is full, the values are written right away
+    await WriteBuffer.record(User, users[2].id, "verified_at", login_at)
+    assert WriteBuffer.pending() == 0
+    # One statement per column, although the values differ
+    assert WriteBuffer.stats()["batches"] - batches == 2
+    for i, user in enumerate(users[:2]):
+        last_login_at = (await User.get(id=user.id)).last_login_at.replace(tzinfo=None)
+        assert last_login_at == login_at + timedelta(seconds=i)
+    assert (await User.get(id=users[2].id)).verified_at.replace(tzinfo=None) == login_at
+
+    await WriteBuffer.record(User, users[2].id, "last_login_at", login_at)
+    await WriteBuffer.stop()
+    assert WriteBuffer.pending() == 0
+    assert (await User.get(id=users[2].id)).last_login_at is not None
+
+
+@pytest.mark.asyncio
+async def test_hash_pool():
+    HashPool.configure(max_workers=1, max_concurrency=1)
+    try:
+        hashes = await asyncio.gather(*[HashPool.hash_password("digicubes") for _ in range(3)])
+        assert all(hashes)
+        assert await HashPool.verify_password(hashes[0], "digicubes")
+        assert not await HashPool.verify_password(hashes[0], "wrong")
+        stats = HashPool.stats()
+        assert stats["completed"] >= 5
+        assert stats["running"] == 0
+        assert HashPool.queue_depth() == 0
+    finally:
+        HashPool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_count_pool(orm, monkeypatch):
+    CountPool.clear()
+    CountPool.configure(ttl=60)
+    for login in ("a", "b", "c"):
+        await User.create(login=login)
+
+    assert await CountPool.count(User.all()) == (3, True)
+    assert await CountPool.count(User.filter(login__in=["a", "b"])) == (2, True)
+    await User.create(login="d")
+    # Served from the cache until invalidated
+    assert await CountPool.count(User.all()) == (3, True)
+    assert CountPool.stats()["hits"] == 1
+
+    CountPool.invalidate(User)
+    assert await CountPool.count(User.all()) == (4, True)
+
+    # Large unfiltered tables are estimated
+    async def estimate(model):
+        return 5000
+
+    monkeypatch.setattr(CountPool, "estimate", estimate)
+    CountPool.configure(ttl=60, estimate_threshold=1000)
+    assert await CountPool.count(User.all()) == (5000, False)
+    assert await CountPool.count(User.filter(login="a")) == (1, True)
+    CountPool.clear()
+
+
+@pytest.mark.asyncio
+async def test_stats_pool(orm):
+    StatsPool.clear()
+    StatsPool.configure(ttl=60)
+    school, other = await School.create(name="School"), await School.create(name="Other")
+    users = [await User.create(login=login) for login in ("a", "b", "c")]
+    await school.students.add(*users)
+    await other.students.add(users[0])
+    course = await Course.create(name="Course", school=school)
+    await Unit.create(name="Unit", course=course)
+
+    assert await StatsPool.get("school_students") == {school.id: 3, other.id: 1}
+    assert await StatsPool.get("school_courses") == {school.id: 1}
+    assert await StatsPool.get("course_units") == {course.id: 1}
+    assert await StatsPool.get("role_users") == {}
+
+    await other.students.remove(users[0])
+    # Served from the cache until invalidated
+    assert await StatsPool.get("school_students") == {school.id: 3, other.id: 1}
+    assert StatsPool.stats()["hits"] == 1
+    StatsPool.invalidate(User)
+    assert await StatsPool.get("school_students") == {school.id: 3}
+    # Statistics without users are kept
+    assert await StatsPool.get("course_units") == {course.id: 1}
+    assert StatsPool.stats()["hits"] == 2
+
+    with pytest.raises(KeyError):
+        await StatsPool.get("nothing")
+
+
+@pytest.mark.asyncio
+async def test_active_courses_pool(orm):
+    ActiveCoursesPool.clear()
+    today = date.today()
+    school = await School.create(name="School")
+    user = await User.create(login="user")
+    running = await Course.create(name="Running", school=school, from_date=today)
+    unlimited = await Course.create(
+        name="Unlimited", school=school, until_date=today + timedelta(days=1)
+    )
+    await Course.create(name="Over", school=school, until_date=today - timedelta(days=1))
+    await Course.create(name="Future", school=school, from_date=today + timedelta(days=1))
+    await running.students.add(user)
+    await running.teachers.add(user)
+    await unlimited.teachers.add(user)
+
+    courses = await ActiveCoursesPool.get_school_courses(school.id)
+    assert [course.name for course in courses] == ["Unlimited", "Running"]
+    # The user is student and teacher of the running course
+    courses = await ActiveCoursesPool.get_user_courses(user.id)
+    assert [course.id for course in courses] == [unlimited.id, running.id]
+
+    await running.delete()
+    # Served from the cache until invalidated or the day changes
+    assert len(await ActiveCoursesPool.get_school_courses(school.id)) == 2
+    assert ActiveCoursesPool.stats()["hits"] == 1
+    tomorrow = today + timedelta(days=1)
+    assert len(await ActiveCoursesPool.get_school_courses(school.id, tomorrow)) == 2
+    ActiveCoursesPool.invalidate()
+    assert len(await ActiveCoursesPool.get_user_courses(user.id)) == 1
+    ActiveCoursesPool.clear()
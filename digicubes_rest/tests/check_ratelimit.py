@@ -0,0 +1,94 @@
+import asyncio
+from time import sleep
+from types import SimpleNamespace
+
+import pytest
+
+from digicubes_rest.exceptions import ServerBusy
+from digicubes_rest.server.ratelimit import RateLimiter, RateLimits
+from digicubes_rest.server.ressource.users import register_new_user
+from digicubes_rest.storage.hashing import HashPool
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(rate=20.0, burst=2)
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    retry_after = limiter.acquire("a")
+    assert 0 < retry_after <= 0.05
+    # Other keys have their own bucket
+    assert limiter.acquire("b") == 0
+
+    sleep(retry_after)
+    assert limiter.acquire("a") == 0
+    assert limiter.stats()["limited"] == 1
+    assert limiter.stats()["allowed"] == 4
+
+
+def request(address, forwarded=None):
+    headers = {} if forwarded is None else {"x-forwarded-for": forwarded}
+    client = SimpleNamespace(host=address)
+    return SimpleNamespace(_starlette=SimpleNamespace(client=client), headers=headers)
+
+
+def test_client_address():
+    RateLimits.configure()
+    assert RateLimits.address(request("10.0.0.1", "1.2.3.4")) == "10.0.0.1"
+
+    RateLimits.configure(trusted_proxies=["10.0.0.0/8", " ::1", ""])
+    assert RateLimits.address(request("10.0.0.1", "1.2.3.4")) == "1.2.3.4"
+    # The client may send its own header, only the last hops count
+    assert RateLimits.address(request("10.0.0.1", "6.6.6.6, 1.2.3.4, 10.0.0.2")) == "1.2.3.4"
+    assert RateLimits.address(request("10.0.0.1")) == "10.0.0.1"
+    assert RateLimits.address(request("5.6.7.8", "1.2.3.4")) == "5.6.7.8"
+    RateLimits.configure()
+
+
+def test_failed_logins():
+    RateLimits.configure(login_rate=0.001, login_burst=2)
+    resp = SimpleNamespace(headers={})
+    attacker, victim = request("6.6.6.6"), request("1.2.3.4")
+    for _ in range(3):
+        assert RateLimits.check_login("Root", attacker, resp, charge=False)
+    RateLimits.failed_login("root", attacker)
+    RateLimits.failed_login("root", attacker)
+    assert not RateLimits.check_login("root", attacker, resp, charge=False)
+    assert resp.status_code == 429
+    # The failed logins of others don't lock the user out
+    assert RateLimits.check_login("root", victim, resp, charge=False)
+    RateLimits.configure()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [["neu"], "neu", 3, {"login": "neu", "password": 3}])
+async def test_register_bad_body(body):
+    RateLimits.configure()
+    req = request("10.0.0.1")
+    req.method = "post"
+
+    async def media():
+        return body
+
+    req.media = media
+    resp = SimpleNamespace(headers={})
+    await register_new_user(req, resp)
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_hash_pool_admission():
+    HashPool.configure(max_workers=1, max_concurrency=1, max_queue=1)
+    rejected = HashPool.stats()["rejected"]
+    try:
+        running = asyncio.ensure_future(HashPool.run(sleep, 0.5))
+        waiting = asyncio.ensure_future(HashPool.run(sleep, 0))
+        await asyncio.sleep(0.1)
+        assert HashPool.queue_depth() == 1
+
+        with pytest.raises(ServerBusy):
+            await HashPool.run(sleep, 0)
+
+        await asyncio.gather(running, waiting)
+        assert HashPool.stats()["rejected"] == rejected + 1
+    finally:
+        HashPool.shutdown()
@@ -0,0 +1,63 @@
+# pylint: disable=redefined-outer-name
+#
+import json
+import os
+from types import SimpleNamespace
+from typing import Generator
+
+import pytest
+
+from digicubes_rest.server.ressource.sideload import parse_includes, send_included
+from digicubes_rest.storage import create_schema, init_orm, shutdown_orm
+from digicubes_rest.storage.models import Course, Right, Role, School, Unit, User
+
+
+@pytest.fixture
+async def orm() -> Generator:
+    os.environ["DIGICUBES_DATABASE_URL"] = "sqlite://:memory:"
+
+    await init_orm()
+    await create_schema()
+    yield
+    await shutdown_orm()
+
+
+def test_parse_includes():
+    assert parse_includes(User, None) == {}
+    assert parse_includes(User, "roles, schools.teacher,schools.courses.units") == {
+        "roles": {},
+        "schools": {"teacher": {}, "courses": {"units": {}}},
+    }
+    for value in ("password", "roles.users", "schools.teacher.schools.teacher"):
+        with pytest.raises(ValueError):
+            parse_includes(User, value)
+
+
+@pytest.mark.asyncio
+async def test_send_included(orm):
+    user = await User.create(login="teacher")
+    role = await Role.create(name="teacher")
+    read, write = await Right.create(name="read"), await Right.create(name="write")
+    await role.rights.add(read, write)
+    await user.roles.add(role)
+
+    school = await School.create(name="School")
+    await school.teacher.add(user)
+    await school.students.add(user)
+    course = await Course.create(name="Course", school=school)
+    await Unit.create(name="Unit", course=course)
+
+    resp = SimpleNamespace()
+    tree = parse_includes(User, "rights,schools.teacher,schools.courses.units")
+    await send_included(resp, await User.get(id=user.id), tree, ["id", "login"])
+    data = json.loads(resp.content)
+
+    assert set(data) == {"id", "login", "rights", "schools"}
+    assert sorted(right["name"] for right in data["rights"]) == ["read", "write"]
+    # The user is student and teacher of the school
+    assert len(data["schools"]) == 1
+    assert [teacher["login"] for teacher in data["schools"][0]["teacher"]] == ["teacher"]
+    assert data["schools"][0]["courses"][0]["units"][0]["name"] == "Unit"
+
+    await send_included(resp, await Course.get(id=course.id), parse_includes(Course, "school"))
+    assert json.loads(resp.content)["school"]["name"] == "School"
@@ -0,0 +1,125 @@
+# pylint: disable=redefined-outer-name
+#
+from datetime import timedelta
+from types import SimpleNamespace
+
+import jwt
+import pytest
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.testclient import TestClient
+
+from digicubes_rest.server.middleware import SettingsMiddleware, UpdateTokenMiddleware
+from digicubes_rest.server.ressource.signing import TokenSigner
+from digicubes_rest.server.ressource.util import (RIGHT_BITS, create_bearer_token,
+                                                  decode_bearer_token, decode_rights,
+                                                  encode_rights, token_rights)
+
+SECRET = "secret"
+
+
+def test_encode_rights():
+    assert decode_rights(encode_rights([])) == set()
+    assert decode_rights(encode_rights(["no_limits"])) == {"no_limits"}
+    all_rights = list(RIGHT_BITS)
+    assert decode_rights(encode_rights(all_rights)) == set(all_rights)
+    # Unknown rights can not be encoded
+    assert decode_rights(encode_rights(["unknown", "unit_read"])) == {"unit_read"}
+
+
+def test_token_rights():
+    user = SimpleNamespace(id=1, rights_version=3)
+    claims = {"rgt": encode_rights(["school_read", "course_read"]), "rv": 3}
+    token = create_bearer_token(1, SECRET, **claims).bearer_token
+    payload = decode_bearer_token(token, SECRET)
+
+    assert token_rights(payload, ["school_read", "no_limits"], user) == ["school_read"]
+    assert token_rights(payload, ["unit_read", "no_limits"], user) == []
+    # Rights, the token doesn't know about
+    assert token_rights(payload, ["custom_right", "no_limits"], user) is None
+    # Tokens without rights
+    token = create_bearer_token(1, SECRET).bearer_token
+    assert token_rights(decode_bearer_token(token, SECRET), ["school_read"], user) is None
+
+    # Changing the rights of the user makes the claim stale
+    user.rights_version = 4
+    assert token_rights(payload, ["school_read", "no_limits"], user) is None
+
+
+def test_refresh_policy():
+    middleware = UpdateTokenMiddleware(
+        None, {"token_refresh_threshold": 300}, api=SimpleNamespace(secret_key=SECRET)
+    )
+    issued, skipped = UpdateTokenMiddleware.issued, UpdateTokenMiddleware.skipped
+
+    fresh = create_bearer_token(1, SECRET, rgt="AQ").bearer_token
+    assert middleware.refresh_token(decode_bearer_token(fresh, SECRET)) is None
+
+    old = create_bearer_token(1, SECRET, lifetime=timedelta(seconds=60), rgt="AQ").bearer_token
+    new_token = middleware.refresh_token(decode_bearer_token(old, SECRET))
+    payload = decode_bearer_token(new_token, SECRET)
+    assert payload["user_id"] == 1
+    assert payload["rgt"] == "AQ"
+
+    assert UpdateTokenMiddleware.issued == issued + 1
+    assert UpdateTokenMiddleware.skipped == skipped + 1
+
+
+def test_middleware_stack():
+    settings = {"token_refresh_threshold": 300}
+    api = SimpleNamespace(secret_key=SECRET)
+    old = create_bearer_token(1, SECRET, lifetime=timedelta(seconds=60)).bearer_token
+
+    async def endpoint(scope, receive, send):
+        request = Request(scope, receive)
+        assert request.state.settings is settings
+        request.state.token_payload = decode_bearer_token(old, SECRET)
+        await PlainTextResponse("Hello World")(scope, receive, send)
+
+    app = UpdateTokenMiddleware(
+        SettingsMiddleware(endpoint, settings=settings, api=api), settings=settings, api=api
+    )
+    resp = TestClient(app).get("/")
+    assert resp.text == "Hello World"
+    assert decode_bearer_token(resp.headers["x-digicubes-token"], SECRET)["user_id"] == 1
+
+
+@pytest.mark.parametrize("algorithm", ["EdDSA", "ES256"])
+def test_asymmetric_signing(algorithm):
+    pytest.importorskip("cryptography")
+    # pylint: disable=import-outside-toplevel
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    if algorithm == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        key = ec.generate_private_key(ec.SECP256R1())
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+    TokenSigner.configure(algorithm, pem)
+    try:
+        token = create_bearer_token(1, SECRET).bearer_token
+        kid = jwt.get_unverified_header(token)["kid"]
+        jwk = TokenSigner.jwks()["keys"][0]
+        assert jwk["kid"] == kid
+        assert jwk["alg"] == algorithm
+
+        # Anyone with the public key can verify the token
+        assert decode_bearer_token(token, None)["user_id"] == 1
+        public_key = jwt.algorithms.get_default_algorithms()[algorithm].prepare_key(
+            key.public_key()
+        )
+        assert jwt.decode(token, public_key, algorithms=[algorithm])["user_id"] == 1
+
+        # Tokens signed with the secret are not accepted anymore
+        with pytest.raises(jwt.DecodeError):
+            decode_bearer_token(jwt.encode({"user_id": 1}, SECRET, algorithm="HS256"), SECRET)
+    finally:
+        TokenSigner.reset()
+
+    assert TokenSigner.jwks() == {"keys": []}
@@ -61,4 +61,11 @@ setup(
     ),
     # Dependent packages (distributions)
     install_requires=requirements(),
+    # Optional packages
+    extras_require={
+        # Signing tokens with EdDSA or ES256
+        "signing": ["cryptography"],
+        # Faster serialization of the responses
+        "json": ["orjson"],
+    },
 )